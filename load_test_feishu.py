@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书通知压测
+启动本地飞书机器人模拟服务，用多个线程通过 FeishuNotifier 发送大量文章通知，
+统计送达吞吐量、请求耗时、限流排队和重试情况，不会向真实的飞书群发送消息
+
+使用方法：
+    python load_test_feishu.py --messages 2000 --threads 8
+    python load_test_feishu.py --messages 1000 --stub-rate-per-second 50 --rate-per-second 60 --error-rate 0.01
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.feishu_notifier import FeishuNotifier
+from toutiao.feishu_stub import FeishuWebhookStub
+
+
+def make_article(index: int) -> dict:
+    """生成压测用的文章"""
+    return {
+        'article_id': f'load{index:06d}',
+        'title': f'压测文章{index}：WTT美国大满贯战报，混双8强出炉',
+        'author': '压测作者',
+        'publish_time': '2025-07-09 11:39:17',
+        'summary': '北京时间7月9日上午，乒乓球WTT美国大满贯继续进行，混双1/4决赛全部结束。',
+        'url': f'https://www.toutiao.com/article/{7524937913248006694 + index}/',
+        'read_count': 59000 + index,
+        'comment_count': 33
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='飞书通知压测（本地模拟服务）')
+    parser.add_argument('--messages', type=int, default=2000, help='发送的通知数量 (默认: 2000)')
+    parser.add_argument('--threads', type=int, default=8, help='并发发送的线程数 (默认: 8)')
+    parser.add_argument('--secret', default='load-test-secret', help='机器人密钥，模拟服务校验签名，空串表示不签名')
+    parser.add_argument('--latency', type=float, default=0.005, help='模拟服务响应延迟秒数 (默认: 0.005)')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='模拟服务随机附加延迟上限秒数')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟服务随机返回500的比例 (0-1)')
+    parser.add_argument('--stub-rate-per-second', type=float, help='模拟服务每秒最多接受的请求数（默认不限）')
+    parser.add_argument('--stub-rate-per-minute', type=float, help='模拟服务每分钟最多接受的请求数（默认不限）')
+    parser.add_argument('--retry-after', type=float, help='模拟服务限流响应带的 Retry-After 秒数')
+    parser.add_argument('--rate-per-second', type=float, default=1000, help='通知器每秒请求上限 (默认: 1000)')
+    parser.add_argument('--rate-per-minute', type=float, default=1000000, help='通知器每分钟请求上限 (默认: 1000000)')
+    parser.add_argument('--rate-limit-retries', type=int, default=3, help='通知器被限流时的重试次数 (默认: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='错误注入的随机数种子 (默认: 1)')
+    parser.add_argument('--verbose', action='store_true', help='输出通知器每次失败和限流的日志')
+    return parser.parse_args()
+
+
+def main():
+    """运行压测"""
+    args = parse_args()
+    # 注入错误和限流时通知器会逐条记录日志，默认只看汇总结果
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    secret = args.secret or None
+
+    stub = FeishuWebhookStub(
+        secret=secret, latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+        rate_per_second=args.stub_rate_per_second, rate_per_minute=args.stub_rate_per_minute,
+        retry_after=args.retry_after, seed=args.seed
+    ).start()
+    notifier = FeishuNotifier(
+        stub.url, secret, pool_maxsize=args.threads,
+        rate_per_second=args.rate_per_second, rate_per_minute=args.rate_per_minute,
+        rate_limit_retries=args.rate_limit_retries
+    )
+    # 模拟服务的限流窗口很短，降速后的暂停时间相应缩短
+    notifier.rate_limiter.cooldown = 0.5
+
+    print(f"🚀 发送 {args.messages} 条通知，{args.threads} 个线程，模拟服务 {stub.url}")
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            results = list(executor.map(
+                lambda index: notifier.send_article_notification(make_article(index)), range(args.messages)
+            ))
+        elapsed = time.perf_counter() - start
+
+        delivered = sum(results)
+        stub_stats = stub.get_stats()
+        latency = notifier.get_latency_stats()
+        rate = notifier.rate_limiter.get_stats()
+
+        print(f"\n送达 {delivered}/{args.messages}，耗时 {elapsed:.2f} 秒，吞吐量 {delivered / elapsed:.1f} 条/秒")
+        if latency.get('requests'):
+            print(f"请求耗时: p50 {latency['p50_ms']:.1f}ms / p95 {latency['p95_ms']:.1f}ms / 最大 {latency['max_ms']:.1f}ms"
+                  f"（请求 {latency['requests']} 次，失败 {latency['errors']} 次）")
+        print(f"限流排队: {rate['waited']} 次，平均等待 {rate['avg_wait_ms']:.1f}ms，最长 {rate['max_wait_ms']:.1f}ms；"
+              f"被限流 {rate['rate_limited']} 次，当前速率系数 {rate['rate_factor']:.2f}")
+        print(f"模拟服务: 请求 {stub_stats['requests']}，接受 {stub_stats['accepted']}，限流 {stub_stats['rate_limited']}，"
+              f"注入错误 {stub_stats['errors']}，签名失败 {stub_stats['sign_failed']}，请求无效 {stub_stats['bad_request']}")
+        print(f"重试请求: {stub_stats['requests'] - args.messages}")
+
+        # 通知器报告的送达数应与模拟服务接受的消息数一致
+        if stub_stats['accepted'] != delivered:
+            print(f"❌ 送达数不一致: 通知器 {delivered}，模拟服务 {stub_stats['accepted']}")
+            return 1
+        if stub_stats['sign_failed']:
+            print("❌ 存在签名校验失败的请求")
+            return 1
+        print("✅ 压测完成")
+        return 0
+    finally:
+        notifier.close()
+        stub.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,9 +10,28 @@
     test        测试系统组件
     status      查看监控状态
     check       手动执行一次检查
+    trending    检测阅读量快速上涨的文章
+    db migrate  升级数据库结构并分批回填历史数据
+    db retention  清理测试文章、归档过期文章并回收空闲页
+    db vacuum   为旧数据库启用增量回收并整理数据库文件（需先停止监控服务）
+    db backup   在线备份数据库（监控服务运行时也可执行）
+    db outbox   查看通知发件箱积压和死信（db outbox-retry 重新投递死信）
+    search      全文搜索已保存的文章，如: search "关键词"
+    export      流式导出文章到 JSONL/CSV/Parquet，如: export articles.csv
+    notify-replay  补发发送失败或遗留的未通知文章
 
 选项：
     --config    指定配置文件路径（默认：config.json）
+    --limit     trending/search 显示的文章数量（默认：20）
+    --page      search 的页码（默认：1）
+    --notify    trending 时向飞书发送热门提醒
+    --batch-size  db migrate 回填数据、export 导出、notify-replay 补发时每批处理的行数（默认：1000）
+    --format    export 的导出格式 jsonl/csv/parquet（默认按扩展名推断）
+    --blogger   export/notify-replay 只处理指定博主（博主ID、token或名称）
+    --since     export/notify-replay 入库时间下限，如 2024-01-01
+    --until     export/notify-replay 入库时间上限（不含）
+    --max-age   notify-replay 只补发最近多少小时内入库的文章
+    --digest    notify-replay 把每批文章合并为摘要消息发送
     --help      显示帮助信息
 """
 
@@ -20,9 +39,12 @@ import sys
 import argparse
 import json
 import logging
+import sqlite3
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from toutiao.monitor import ArticleMonitor
+from toutiao.database import ArticleDatabase
 
 
 def setup_basic_logging():
@@ -54,7 +76,7 @@ def check_config_file(config_path: str) -> bool:
         
         # 检查必要的配置项
         required_keys = [
-            'toutiao.blogger_url',
+            'toutiao',
             'feishu.webhook_url',
             'database.path'
         ]
@@ -68,6 +90,12 @@ def check_config_file(config_path: str) -> bool:
                     return False
                 value = value[k]
         
+        # 至少配置一种博主来源
+        blogger_keys = ['blogger_url', 'bloggers', 'bloggers_file', 'bloggers_from_database']
+        if not any(config['toutiao'].get(key) for key in blogger_keys):
+            print(f"❌ 配置文件缺少博主，请设置 toutiao 下的 {' / '.join(blogger_keys)} 之一")
+            return False
+
         # 检查飞书Webhook URL
         if not config['feishu']['webhook_url'] or config['feishu']['webhook_url'] == 'YOUR_FEISHU_WEBHOOK_URL_HERE':
             print("❌ 请在配置文件中设置正确的飞书Webhook URL")
@@ -131,14 +159,56 @@ def cmd_status(args):
         return 1
     
     try:
-        monitor = ArticleMonitor(args.config)
+        # 只读打开数据库，结构版本落后时直接报错，不做迁移和博主登记
+        monitor = ArticleMonitor(args.config, read_only=True)
+        monitor.database
         status = monitor.get_status()
         
-        print(f"博主URL: {status.get('blogger_url', 'N/A')}")
+        bloggers = status.get('bloggers', [])
+        if status.get('blogger_count', 1) > 1:
+            print(f"监控博主: {status['blogger_count']} 位")
+            for blogger in bloggers:
+                print(f"  [{blogger['blogger_id']}] {blogger['name'] or 'N/A'}: 文章 {blogger['total']}，"
+                      f"未通知 {blogger['unnotified']}，抓取 {blogger['crawl_count'] or 0} 次，"
+                      f"失败 {blogger['fail_count'] or 0} 次，最后抓取 {blogger['last_crawl_time'] or 'N/A'}")
+        else:
+            print(f"博主URL: {status.get('blogger_url', 'N/A')}")
+        print(f"文章总数: {status.get('total_count', 0)}")
         print(f"最新文章数量: {status.get('latest_articles_count', 0)}")
         print(f"未通知文章数量: {status.get('unnotified_count', 0)}")
+        print(f"最后抓取时间: {status.get('last_crawl_time') or 'N/A'}")
+        print(f"最后新文章时间: {status.get('last_article_time') or 'N/A'}")
         print(f"最后检查时间: {status.get('last_check_time', 'N/A')}")
+
+        cycles = status.get('check_cycles', {})
+        if cycles.get('count'):
+            interval = f"，检查间隔 {cycles['interval_seconds']:.0f}s" if cycles['interval_seconds'] else ""
+            print(f"检查耗时(最近 {cycles['count']} 轮): 平均 {cycles['avg_ms'] / 1000:.1f}s / "
+                  f"最大 {cycles['max_ms'] / 1000:.1f}s / 最近 {cycles['last_ms'] / 1000:.1f}s{interval}，"
+                  f"超时 {cycles['overruns']} 轮")
         
+        outbox = status.get('outbox', {})
+        if outbox:
+            print(f"发件箱: 待发送 {outbox['pending']}，投递中 {outbox['sending']}，死信 {outbox['dead']}"
+                  f"（最早待发送: {outbox['oldest_pending'] or 'N/A'}）")
+
+        routing_stats = status.get('routing_stats', {})
+        if routing_stats:
+            print("\n路由规则命中次数:")
+            for name, stats in routing_stats.items():
+                print(f"  {name}: {stats['matches']}" +
+                      (f"（最近命中: {stats['last_matched_at']}）" if stats['last_matched_at'] else ""))
+
+        deliveries = status.get('deliveries', {})
+        if deliveries:
+            print("\n通知目标投递结果（最近24小时）:")
+            for name, stats in deliveries.items():
+                avg_ms = f"{stats['avg_ms']:.0f}ms" if stats['avg_ms'] is not None else 'N/A'
+                alert = (f"，发现到送达平均 {stats['avg_alert_ms'] / 1000:.1f}s / 最大 {stats['max_alert_ms'] / 1000:.1f}s"
+                         if stats['avg_alert_ms'] is not None else "")
+                print(f"  {name}: 成功 {stats['succeeded']}，失败 {stats['failed']}，平均耗时 {avg_ms}{alert}" +
+                      (f"（最近失败: {stats['last_error']}）" if stats['last_error'] else ""))
+
         latest_articles = status.get('latest_articles', [])
         if latest_articles:
             print("\n最新文章:")
@@ -163,6 +233,12 @@ def cmd_check(args):
     try:
         monitor = ArticleMonitor(args.config)
         monitor.run_check_cycle()
+        # 先通知模式下等后台补全详情和更新发送完成再退出
+        monitor.wait_for_enrichment()
+        if monitor.outbox_enabled:
+            # 单次检查没有后台投递线程，当场投递发件箱中到期的通知
+            delivered = monitor.outbox.run_once()
+            print(f"✅ 投递发件箱通知 {delivered} 条")
         print("✅ 检查完成")
         return 0
     except Exception as e:
@@ -170,6 +246,390 @@ def cmd_check(args):
         return 1
 
 
+def cmd_trending(args):
+    """检测阅读量快速上涨的文章"""
+    print("🔥 检测热门文章...")
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        from toutiao.trending import TrendingDetector
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        trending_config = config.get('trending', {})
+
+        database = ArticleDatabase(config['database']['path'])
+        detector = TrendingDetector(
+            database,
+            velocity_threshold=trending_config.get('velocity_threshold', 5000),
+            window_hours=trending_config.get('window_hours', 24)
+        )
+        trending = detector.detect(limit=args.limit, only_new=args.notify)
+
+        if not trending:
+            print("没有超过阈值的热门文章")
+            return 0
+
+        for i, article in enumerate(trending, 1):
+            acceleration = article['acceleration']
+            acceleration_text = f"{acceleration:+.0f}" if acceleration is not None else "N/A"
+            print(f"  {i}. {article['title']}")
+            print(f"     阅读: {article['read_count']}  速度: {article['velocity']:.0f}/小时  加速度: {acceleration_text}/小时²")
+
+        if args.notify:
+            # 经监控服务的通知目标发送，遵循路由规则和各目标的频率限制
+            monitor = ArticleMonitor(args.config)
+            try:
+                alerted = monitor.notify_trending(trending)
+            finally:
+                monitor.notifiers.close()
+                monitor.database.close()
+            print(f"✅ 已发送 {len(alerted)} 条热门提醒")
+
+        return 0
+    except Exception as e:
+        print(f"❌ 热门文章检测失败: {e}")
+        return 1
+
+
+def cmd_db(args):
+    """数据库维护命令"""
+    actions = {
+        'migrate': cmd_db_migrate,
+        'retention': cmd_db_retention,
+        'vacuum': cmd_db_vacuum,
+        'backup': cmd_db_backup,
+        'outbox': cmd_db_outbox,
+        'outbox-retry': cmd_db_outbox_retry
+    }
+    if args.argument not in actions:
+        print(f"❌ 请指定数据库子命令: {', '.join(actions)}")
+        return 1
+    return actions[args.argument](args)
+
+
+def cmd_db_migrate(args):
+    """升级数据库结构并分批回填历史数据"""
+    print("🗄️  升级数据库结构...")
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        from toutiao import migrations
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        db_path = config['database']['path']
+
+        conn = sqlite3.connect(db_path)
+        try:
+            version = migrations.get_schema_version(conn)
+            pending = migrations.pending_migrations(conn)
+        finally:
+            conn.close()
+
+        print(f"当前版本: {version}，最新版本: {migrations.LATEST_VERSION}")
+        for number, description in pending:
+            print(f"  待执行迁移 {number}: {description}")
+
+        applied = migrations.migrate(db_path)
+        if applied:
+            print(f"✅ 已执行迁移: {', '.join(str(number) for number in applied)}")
+        else:
+            print("✅ 数据库结构已是最新")
+
+        # 结构迁移之外的数据回填分批进行，每批一个短事务，监控服务运行期间也可以执行
+        database = ArticleDatabase(db_path)
+        bloggers = ArticleMonitor.load_blogger_configs(config['toutiao'])
+        if bloggers:
+            blogger_id = database.upsert_blogger(bloggers[0]['url'], bloggers[0]['name'])
+            if blogger_id is None:
+                print("❌ 登记博主失败，未回填文章博主归属")
+                return 1
+            backfilled = database.assign_orphan_articles(blogger_id, batch_size=args.batch_size)
+            print(f"✅ 回填文章博主归属 {backfilled} 篇")
+        return 0
+    except Exception as e:
+        print(f"❌ 数据库迁移失败: {e}")
+        return 1
+
+
+def cmd_db_retention(args):
+    """清理测试文章、归档过期文章并回收空闲页"""
+    print("🧹 执行数据保留策略...")
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        from toutiao.retention import RetentionManager
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        retention_config = config.get('retention', {})
+
+        database = ArticleDatabase(config['database']['path'])
+        before = database.get_storage_info()
+        manager = RetentionManager.from_config(database, retention_config)
+        # 手动执行时不限制回收时长
+        manager.vacuum_time_budget = float('inf')
+        report = manager.run(purge_test_articles=retention_config.get('purge_test_articles', True))
+        after = database.get_storage_info()
+
+        print(f"✅ 清理测试文章 {report['purged']} 篇，归档 {report['archived']} 篇到 {manager.archive_dir}")
+        print(f"✅ 回收 {report['reclaimed_bytes'] / 1024:.1f} KB，"
+              f"数据库 {before['page_count'] * before['page_size'] / 1024 / 1024:.1f} MB → "
+              f"{after['page_count'] * after['page_size'] / 1024 / 1024:.1f} MB")
+        if after['auto_vacuum'] != 2 and after['freelist_count']:
+            print(f"⚠️  数据库未启用增量回收，有 {after['freelist_count']} 个空闲页，执行 db vacuum 后可回收")
+        return 0
+    except Exception as e:
+        print(f"❌ 数据保留策略执行失败: {e}")
+        return 1
+
+
+def cmd_db_vacuum(args):
+    """为旧数据库启用增量回收并整理数据库文件"""
+    print("🗜️  整理数据库文件...")
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        db_path = config['database']['path']
+
+        database = ArticleDatabase(db_path)
+        before = database.get_storage_info()
+
+        # auto_vacuum 模式只有在 VACUUM 重建数据库后才对已有数据库生效
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+        after = database.get_storage_info()
+        print(f"✅ 数据库 {before['page_count'] * before['page_size'] / 1024 / 1024:.1f} MB → "
+              f"{after['page_count'] * after['page_size'] / 1024 / 1024:.1f} MB，"
+              f"增量回收{'已启用' if after['auto_vacuum'] == 2 else '未启用'}")
+        return 0
+    except Exception as e:
+        print(f"❌ 整理数据库失败: {e}")
+        return 1
+
+
+def cmd_db_backup(args):
+    """在线备份数据库"""
+    print("💾 备份数据库...")
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        from toutiao.backup import DatabaseBackup
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        backup = DatabaseBackup.from_config(config['database']['path'], config.get('backup', {}))
+        report = backup.run()
+        if not report:
+            print("❌ 数据库备份失败，详见日志")
+            return 1
+
+        print(f"✅ 已备份到 {report['path']}（{report['size'] / 1024:.1f} KB，"
+              f"{report['steps']} 步，耗时 {report['elapsed']:.2f} 秒）")
+        if report['removed']:
+            print(f"✅ 清理旧备份 {len(report['removed'])} 个，保留最近 {backup.keep} 个")
+        return 0
+    except Exception as e:
+        print(f"❌ 数据库备份失败: {e}")
+        return 1
+
+
+def cmd_db_outbox(args):
+    """查看通知发件箱积压和死信"""
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        database = ArticleDatabase(config['database']['path'])
+        stats = database.get_outbox_stats()
+        print(f"📮 待发送 {stats['pending']}，投递中 {stats['sending']}，死信 {stats['dead']}")
+        if stats['oldest_pending']:
+            print(f"最早待发送: {stats['oldest_pending']}")
+
+        dead_letters = database.get_dead_letters(args.limit)
+        if dead_letters:
+            print("\n死信:")
+            for letter in dead_letters:
+                print(f"  [{letter['id']}] {letter['title'] or letter['idempotency_key']}")
+                print(f"     投递 {letter['attempts']} 次，最后失败: {letter['last_error']}（{letter['updated_at']}）")
+            print("\n执行 python main.py db outbox-retry 重新投递死信")
+        return 0
+    except Exception as e:
+        print(f"❌ 查看发件箱失败: {e}")
+        return 1
+
+
+def cmd_db_outbox_retry(args):
+    """把死信重新放回发件箱"""
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        requeued = ArticleDatabase(config['database']['path']).requeue_dead_letters()
+        print(f"✅ {requeued} 条死信已重新排队，将由监控服务投递")
+        return 0
+    except Exception as e:
+        print(f"❌ 死信重新排队失败: {e}")
+        return 1
+
+
+def find_blogger_id(database: ArticleDatabase, blogger: str):
+    """按博主ID、token、名称或URL查找博主ID，找不到返回None"""
+    matched = [row for row in database.get_bloggers()
+               if blogger in (str(row['id']), row['token'], row['name'], row['url'])]
+    return matched[0]['id'] if matched else None
+
+
+def cmd_notify_replay(args):
+    """补发未通知的文章"""
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        monitor = ArticleMonitor(args.config)
+        database = monitor.database
+
+        blogger_id = None
+        if args.blogger:
+            blogger_id = find_blogger_id(database, args.blogger)
+            if blogger_id is None:
+                print(f"❌ 未找到博主: {args.blogger}")
+                return 1
+
+        since = args.since
+        if args.max_age is not None:
+            cutoff = (datetime.now() - timedelta(hours=args.max_age)).isoformat()
+            since = max(since, cutoff) if since else cutoff
+
+        def show_progress(articles, sent, failed, elapsed):
+            rate = articles / elapsed if elapsed > 0 else 0
+            print(f"\r  已处理 {articles} 篇，送达 {sent}，失败 {failed}  {rate:.1f} 篇/秒", end='', flush=True)
+
+        print("📨 补发未通知的文章" + (f"（入库时间不早于 {since}）" if since else "") + "...")
+        try:
+            report = monitor.replay_unnotified(
+                blogger_id=blogger_id, since=since, until=args.until,
+                batch_size=args.batch_size, digest=args.digest, progress=show_progress
+            )
+        finally:
+            database.close()
+            monitor.notifiers.close()
+        if report['articles']:
+            print()
+
+        print(f"✅ 处理 {report['articles']} 篇文章：送达 {report['sent']} 条通知，失败 {report['failed']} 条，"
+              f"合并到已通知首发文章 {report['suppressed']} 篇；"
+              f"耗时 {report['elapsed']:.2f} 秒，{report['articles_per_second']:.1f} 篇/秒")
+        for name, stats in monitor.notifiers.get_stats().items():
+            latency, rate = stats['latency'], stats['rate_limit']
+            if latency.get('requests'):
+                print(f"  {name}: 请求 {latency['requests']} 次，p50 {latency['p50_ms']:.0f}ms / p95 {latency['p95_ms']:.0f}ms，"
+                      f"限流排队 {rate['waited']} 次（平均 {rate['avg_wait_ms']:.0f}ms），被限流 {rate['rate_limited']} 次")
+        return 0 if report['failed'] == 0 else 1
+    except Exception as e:
+        print(f"❌ 补发通知失败: {e}")
+        return 1
+
+
+def cmd_search(args):
+    """全文搜索已保存的文章"""
+    if not args.argument:
+        print("❌ 请指定搜索关键词，如: python main.py search \"关键词\"")
+        return 1
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        database = ArticleDatabase(config['database']['path'], read_only=True)
+        page = max(args.page, 1)
+        result = database.search_articles(args.argument, limit=args.limit, offset=(page - 1) * args.limit)
+
+        total = result['total']
+        total_pages = (total + args.limit - 1) // args.limit
+        print(f"🔍 \"{args.argument}\" 共找到 {total} 篇文章（第 {page}/{max(total_pages, 1)} 页）")
+
+        for i, article in enumerate(result['results'], (page - 1) * args.limit + 1):
+            print(f"  {i}. {article['title']}")
+            print(f"     作者: {article.get('author') or 'N/A'}  发布时间: {article.get('publish_time') or 'N/A'}  阅读: {article.get('read_count', 0)}")
+            print(f"     链接: {article['url']}")
+
+        return 0
+    except Exception as e:
+        print(f"❌ 搜索失败: {e}")
+        return 1
+
+
+def cmd_export(args):
+    """流式导出文章"""
+    if not args.argument:
+        print("❌ 请指定导出文件路径，如: python main.py export articles.jsonl")
+        return 1
+
+    if not check_config_file(args.config):
+        return 1
+
+    try:
+        from toutiao.export import export_articles
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        database = ArticleDatabase(config['database']['path'], read_only=True)
+
+        blogger_id = None
+        if args.blogger:
+            blogger_id = find_blogger_id(database, args.blogger)
+            if blogger_id is None:
+                print(f"❌ 未找到博主: {args.blogger}")
+                return 1
+
+        def show_progress(exported, total, elapsed):
+            rate = exported / elapsed if elapsed > 0 else 0
+            percent = exported * 100 / total if total else 100
+            print(f"\r  已导出 {exported}/{total} ({percent:.0f}%)  {rate:.0f} 行/秒", end='', flush=True)
+
+        print(f"📤 导出文章到 {args.argument}...")
+        report = export_articles(
+            database, args.argument, fmt=args.format, blogger_id=blogger_id,
+            since=args.since, until=args.until, batch_size=args.batch_size, progress=show_progress
+        )
+        print()
+        print(f"✅ 导出 {report['rows']} 篇文章（{report['format']}），"
+              f"耗时 {report['elapsed']:.2f} 秒，{report['rows_per_second']:.0f} 行/秒")
+        return 0
+    except Exception as e:
+        print(f"❌ 导出失败: {e}")
+        return 1
+
+
 def main():
     """主函数"""
     setup_basic_logging()
@@ -183,21 +643,94 @@ def main():
   python main.py test                     # 测试系统组件
   python main.py status                   # 查看监控状态
   python main.py check                    # 手动执行一次检查
+  python main.py trending --notify        # 检测热门文章并发送提醒
+  python main.py db migrate               # 升级数据库结构
+  python main.py db retention             # 清理、归档并回收空间
+  python main.py db backup                # 在线备份数据库
+  python main.py search "关键词" --page 2  # 全文搜索文章
+  python main.py export out.csv --since 2024-01-01  # 导出文章
+  python main.py notify-replay --max-age 24         # 补发最近24小时的未通知文章
   python main.py start --config my.json  # 使用指定配置文件启动
         """
     )
     
     parser.add_argument(
         'command',
-        choices=['start', 'test', 'status', 'check'],
+        choices=['start', 'test', 'status', 'check', 'trending', 'db', 'search', 'export', 'notify-replay'],
         help='要执行的命令'
     )
+
+    parser.add_argument(
+        'argument',
+        nargs='?',
+        help='命令参数，如 db 的子命令 migrate/retention/vacuum/backup/outbox/outbox-retry、search 的关键词、export 的文件路径'
+    )
     
     parser.add_argument(
         '--config',
         default='config.json',
         help='配置文件路径 (默认: config.json)'
     )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='trending/search 显示的文章数量 (默认: 20)'
+    )
+
+    parser.add_argument(
+        '--page',
+        type=int,
+        default=1,
+        help='search 的页码 (默认: 1)'
+    )
+
+    parser.add_argument(
+        '--notify',
+        action='store_true',
+        help='trending 时向飞书发送热门提醒'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1000,
+        help='db migrate 回填数据、export 导出、notify-replay 补发时每批处理的行数 (默认: 1000)'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=['jsonl', 'csv', 'parquet'],
+        help='export 的导出格式 (默认按扩展名推断)'
+    )
+
+    parser.add_argument(
+        '--blogger',
+        help='export/notify-replay 只处理指定博主（博主ID、token或名称）'
+    )
+
+    parser.add_argument(
+        '--since',
+        help='export/notify-replay 入库时间下限，如 2024-01-01'
+    )
+
+    parser.add_argument(
+        '--until',
+        help='export/notify-replay 入库时间上限（不含），如 2024-02-01'
+    )
+
+    parser.add_argument(
+        '--max-age',
+        type=float,
+        help='notify-replay 只补发最近多少小时内入库的文章'
+    )
+
+    parser.add_argument(
+        '--digest',
+        action='store_true',
+        help='notify-replay 把每批文章合并为摘要消息发送'
+    )
     
     args = parser.parse_args()
     
@@ -206,7 +739,12 @@ def main():
         'start': cmd_start,
         'test': cmd_test,
         'status': cmd_status,
-        'check': cmd_check
+        'check': cmd_check,
+        'trending': cmd_trending,
+        'db': cmd_db,
+        'search': cmd_search,
+        'export': cmd_export,
+        'notify-replay': cmd_notify_replay
     }
     
     try:
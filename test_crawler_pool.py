@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫池与多博主并发抓取测试
+使用模拟爬虫和本地飞书机器人模拟服务，验证浏览器数量上限、失效重建、多博主配置和故障隔离，无需浏览器和网络
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.crawler_pool import CrawlerPool
+from toutiao.feishu_stub import FeishuWebhookStub
+from toutiao.monitor import ArticleMonitor
+from test_database import make_article
+from test_lazy_components import make_config
+
+
+def blogger_url(token: str) -> str:
+    return f"https://www.toutiao.com/c/user/token/{token}/"
+
+
+class FakeCrawler:
+    """按博主返回固定文章的模拟爬虫，记录同时在用的浏览器数"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, articles_by_token, delays=None, failing=()):
+        self.articles_by_token = articles_by_token
+        self.delays = delays or {}
+        self.failing = failing
+        self.closed = False
+        self.alive = True
+
+    def get_latest_articles(self, url, limit=10):
+        token = url.rstrip('/').rsplit('/', 1)[-1]
+        with FakeCrawler.lock:
+            FakeCrawler.active += 1
+            FakeCrawler.max_active = max(FakeCrawler.max_active, FakeCrawler.active)
+        try:
+            time.sleep(self.delays.get(token, 0.2))
+            if token in self.failing:
+                raise RuntimeError(f"页面结构异常: {token}")
+            return [dict(article) for article in self.articles_by_token.get(token, [])[:limit]]
+        finally:
+            with FakeCrawler.lock:
+                FakeCrawler.active -= 1
+
+    def is_alive(self):
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_bounds_and_replacement():
+    """测试爬虫池限制浏览器数量，失效的浏览器被丢弃并重建"""
+    created = []
+
+    def factory():
+        crawler = FakeCrawler({})
+        created.append(crawler)
+        return crawler
+
+    pool = CrawlerPool(factory, size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "浏览器都被借出时应等待"
+    except TimeoutError:
+        pass
+
+    # 归还后其他线程可以借到
+    threading.Timer(0.1, pool.release, args=(first,)).start()
+    assert pool.acquire(timeout=2) is first
+    pool.release(first)
+
+    try:
+        with pool.lease() as crawler:
+            raise RuntimeError('no such window: target window already closed')
+    except RuntimeError:
+        pass
+    assert crawler.closed and pool.get_stats()['replaced'] == 1
+
+    # 其他异常不丢弃浏览器
+    try:
+        with pool.lease() as crawler:
+            raise ValueError('解析失败')
+    except ValueError:
+        pass
+    assert not crawler.closed
+
+    pool.release(second)
+    stats = pool.get_stats()
+    assert stats['created'] == 2 and len(created) == 3
+    assert stats['waited'] >= 1
+    pool.close()
+    assert all(crawler.closed for crawler in created)
+
+
+def test_load_blogger_configs():
+    """测试从单个URL、列表和文件读取博主，并按token去重"""
+    directory = tempfile.mkdtemp()
+    text_file = os.path.join(directory, 'bloggers.txt')
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write(f"# 博主列表\n{blogger_url('T3')} 体育博主\n\n{blogger_url('T1')}?source=profile\n")
+    json_file = os.path.join(directory, 'bloggers.json')
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump([{'url': blogger_url('T4'), 'name': '财经博主'}], f)
+
+    bloggers = ArticleMonitor.load_blogger_configs({
+        'blogger_url': blogger_url('T1'), 'blogger_name': '主博主',
+        'bloggers': [blogger_url('T2'), {'url': blogger_url('T2'), 'name': '重复'}],
+        'bloggers_file': text_file
+    })
+    assert [blogger['url'] for blogger in bloggers] == [blogger_url(token) for token in ('T1', 'T2', 'T3')]
+    assert [blogger['name'] for blogger in bloggers] == ['主博主', None, '体育博主']
+
+    bloggers = ArticleMonitor.load_blogger_configs({'bloggers_file': json_file})
+    assert bloggers == [{'url': blogger_url('T4'), 'name': '财经博主'}]
+
+
+def test_concurrent_bloggers():
+    """测试多位博主并发抓取：耗时按浏览器数缩短，一位博主失败不影响其他博主"""
+    tokens = ['B1', 'B2', 'B3', 'B4', 'B5']
+    articles = {token: [make_article(f'{token}-{i}', title=f'{token} 的文章{i}') for i in range(2)]
+                for token in tokens}
+
+    with FeishuWebhookStub() as stub:
+        config_path = make_config(
+            toutiao={'bloggers': [{'url': blogger_url(token), 'name': f'博主{token}'} for token in tokens],
+                     'crawl_workers': 3, 'check_interval_minutes': 10},
+            feishu={'webhook_url': stub.url, 'secret': ''}
+        )
+        monitor = ArticleMonitor(config_path)
+        crawlers = []
+
+        def factory():
+            crawler = FakeCrawler(articles, delays={'B5': 0.6}, failing={'B3'})
+            crawlers.append(crawler)
+            return crawler
+
+        monitor._create_crawler = factory
+        FakeCrawler.max_active = 0
+
+        start = time.perf_counter()
+        monitor.run_check_cycle()
+        elapsed = time.perf_counter() - start
+
+        # 3个浏览器并发：B5 最慢（0.6秒），总耗时远小于逐个抓取的 1.4 秒
+        assert len(crawlers) == 3 and FakeCrawler.max_active == 3
+        assert elapsed < 1.1, f"检查周期耗时 {elapsed:.2f}s"
+
+        # B3 抓取失败，其他博主的文章照常入库并通知
+        assert len(stub.messages()) == 8
+        assert not any('B3' in message['content']['text'] for message in stub.messages())
+
+        bloggers = {blogger['name']: blogger for blogger in monitor.database.get_bloggers()}
+        assert len(bloggers) == 5
+        assert bloggers['博主B3']['fail_count'] == 1 and bloggers['博主B3']['article_count'] == 0
+        assert bloggers['博主B1']['article_count'] == 2
+        for token in ('B1', 'B5'):
+            stored = monitor.database.get_latest_articles(10, blogger_id=bloggers[f'博主{token}']['id'])
+            assert sorted(article['article_id'] for article in stored) == [f'{token}-0', f'{token}-1']
+
+        status = monitor.get_status()
+        assert status['total_count'] == 8 and len(status['bloggers']) == 4
+
+        # 第二轮没有新文章，浏览器复用
+        monitor.run_check_cycle()
+        assert len(crawlers) == 3 and len(stub.messages()) == 8
+        assert monitor.crawler_pool.get_stats()['leases'] == 10
+
+
+def test_sends_off_ingest_path():
+    """测试通知在发送线程中发送，不推迟其他博主入库；同一轮中稍后入库的转载不重复通知；失效的浏览器被丢弃"""
+    content = {'title': '国乒男团三比零完胜对手晋级决赛，队员状态出色', 'summary': '比赛详情与技术统计摘要'}
+    articles = {'C1': [make_article('C1-0', **content)],
+                'C2': [make_article('C2-0', **content)],
+                'C3': [make_article('C3-0', title='另一篇完全不同的新闻标题')]}
+
+    with FeishuWebhookStub(latency=0.5) as stub:
+        config_path = make_config(
+            toutiao={'bloggers': [{'url': blogger_url(token)} for token in ('C1', 'C2', 'C3', 'EMPTY')],
+                     'check_interval_minutes': 10},
+            feishu={'webhook_url': stub.url, 'secret': ''}
+        )
+        monitor = ArticleMonitor(config_path)
+        crawler = FakeCrawler(articles, delays={'C1': 0.05, 'C2': 0.1, 'C3': 0.1, 'EMPTY': 0.05})
+        crawler.alive = False
+        monitor.crawler = crawler
+
+        added_at = {}
+        add_article = monitor.database.add_article
+
+        def record_add(article, *args, **kwargs):
+            added_at[article['article_id']] = time.perf_counter()
+            return add_article(article, *args, **kwargs)
+
+        monitor.database.add_article = record_add
+        start = time.perf_counter()
+        monitor.run_check_cycle()
+
+        # 第一条通知需要0.5秒送达，其他博主的文章在此之前已经入库
+        assert sorted(added_at) == ['C1-0', 'C2-0', 'C3-0']
+        assert max(added_at.values()) - start < 0.5
+        texts = [message['content']['text'] for message in stub.messages()]
+        assert len(texts) == 2, "同一轮中首发已通知的转载不应再单独通知"
+
+        # EMPTY 没有抓到文章，浏览器失效被丢弃
+        assert crawler.closed and monitor.crawler_pool.get_stats()['replaced'] == 1
+
+
+def test_check_new_articles():
+    """测试 check_new_articles 抓取第一位博主并入库新文章，不发送通知"""
+    articles = {'D1': [make_article(f'D1-{i}', title=f'第{i}篇完全不同的文章标题') for i in range(2)]}
+    with FeishuWebhookStub() as stub:
+        config_path = make_config(
+            toutiao={'bloggers': [{'url': blogger_url('D1')}, {'url': blogger_url('D2')}],
+                     'check_interval_minutes': 10},
+            feishu={'webhook_url': stub.url, 'secret': ''}
+        )
+        monitor = ArticleMonitor(config_path)
+        monitor.crawler = FakeCrawler(articles, delays={'D1': 0})
+
+        new_articles = monitor.check_new_articles()
+        assert sorted(article['article_id'] for article in new_articles) == ['D1-0', 'D1-1']
+        assert monitor.check_new_articles() == []
+        assert monitor.database.get_article_summary()['total'] == 2
+        assert stub.messages() == []
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("爬虫池上限与重建", test_pool_bounds_and_replacement),
+        ("读取博主配置", test_load_blogger_configs),
+        ("多博主并发抓取", test_concurrent_bloggers),
+        ("发送不阻塞入库", test_sends_off_ingest_path),
+        ("检查第一位博主的新文章", test_check_new_articles),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库功能测试
+使用临时数据库验证多博主数据模型，无需网络和浏览器
+"""
+
+import os
+import sys
+import gzip
+import csv
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao import migrations
+from toutiao.backup import DatabaseBackup
+from toutiao.database import ArticleDatabase, extract_blogger_token
+from toutiao.db_writer import DatabaseWriter
+from toutiao.export import export_articles, PYARROW_AVAILABLE
+from toutiao.retention import RetentionManager
+
+BLOGGER_URL_A = "https://www.toutiao.com/c/user/token/TOKEN_A/?source=profile&tab=article"
+BLOGGER_URL_B = "https://www.toutiao.com/c/user/token/TOKEN_B/"
+
+
+def make_article(article_id: str, title: str = '测试文章标题', **kwargs) -> dict:
+    """构造测试文章"""
+    article = {
+        'article_id': article_id,
+        'title': title,
+        'url': f'https://www.toutiao.com/article/{article_id}/',
+        'author': '测试作者',
+        'summary': '测试摘要',
+        'read_count': 100,
+        'comment_count': 1
+    }
+    article.update(kwargs)
+    return article
+
+
+def make_database(**kwargs) -> ArticleDatabase:
+    """创建临时数据库"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return ArticleDatabase(path, **kwargs)
+
+
+def test_extract_blogger_token():
+    """测试博主token提取"""
+    assert extract_blogger_token(BLOGGER_URL_A) == 'TOKEN_A'
+    assert extract_blogger_token(BLOGGER_URL_B) == 'TOKEN_B'
+    # 无法识别的URL得到稳定的摘要标识
+    assert extract_blogger_token('https://example.com/x') == extract_blogger_token('https://example.com/x/')
+
+
+def test_per_blogger_queries():
+    """测试按博主查询最新文章和未通知文章"""
+    db = make_database()
+    blogger_a = db.upsert_blogger(BLOGGER_URL_A, '博主A')
+    blogger_b = db.upsert_blogger(BLOGGER_URL_B)
+    assert blogger_a != blogger_b
+    # 重复登记返回同一ID
+    assert db.upsert_blogger(BLOGGER_URL_A) == blogger_a
+
+    assert db.add_article(make_article('1001'), blogger_a)
+    assert db.add_article(make_article('1002'), blogger_a)
+    assert db.add_article(make_article('2001'), blogger_b)
+    assert not db.add_article(make_article('1001'), blogger_a)
+
+    db.mark_as_notified('1001')
+
+    latest_a = db.get_latest_articles(10, blogger_id=blogger_a)
+    assert {a['article_id'] for a in latest_a} == {'1001', '1002'}
+    unnotified_a = db.get_unnotified_articles(blogger_id=blogger_a)
+    assert [a['article_id'] for a in unnotified_a] == ['1002']
+    assert len(db.get_unnotified_articles()) == 2
+
+    assert db.record_blogger_crawl(blogger_a, 'fp1', new_article_count=2)
+    assert db.record_blogger_crawl(blogger_a, None, success=False)
+    blogger = db.get_blogger(blogger_a)
+    assert blogger['name'] == '博主A'
+    assert blogger['last_fingerprint'] == 'fp1'
+    assert blogger['crawl_count'] == 2
+    assert blogger['fail_count'] == 1
+    assert blogger['article_count'] == 2
+
+
+def test_assign_orphan_articles():
+    """测试历史文章归属"""
+    db = make_database()
+    assert db.add_article(make_article('3001'))
+    blogger_id = db.upsert_blogger(BLOGGER_URL_A)
+    assert db.assign_orphan_articles(blogger_id) == 1
+    assert db.get_latest_articles(10, blogger_id=blogger_id)[0]['article_id'] == '3001'
+
+
+def test_article_stats_dedup():
+    """测试统计快照去重"""
+    db = make_database()
+    db.add_article(make_article('4001', read_count=100))
+    db.add_article(make_article('4002', read_count=0, comment_count=0))
+
+    articles = [make_article('4001', read_count=100), make_article('4002', read_count=0, comment_count=0)]
+    assert db.record_article_stats(articles, ts=1000) == 1
+    # 数值不变不写入
+    assert db.record_article_stats(articles, ts=1300) == 0
+    articles[0]['read_count'] = 250
+    assert db.record_article_stats(articles, ts=1600) == 1
+
+    series = db.get_article_stats('4001')
+    assert [(s['ts'], s['reads']) for s in series] == [(1000, 100), (1600, 250)]
+    latest = {a['article_id']: a for a in db.get_latest_articles(10)}
+    assert latest['4001']['read_count'] == 250
+
+
+def test_article_stats_compaction():
+    """测试统计快照降采样"""
+    db = make_database()
+    db.add_article(make_article('5001'))
+    now = int(time.time())
+    old_hour = (now - 30 * 86400) // 3600 * 3600
+    # 30天前同一小时内的4个快照只保留最后一个；最近的快照全部保留
+    for i, minute in enumerate([0, 10, 20, 30]):
+        db.record_article_stats([make_article('5001', read_count=100 + i)], ts=old_hour + minute * 60)
+    for i in range(3):
+        db.record_article_stats([make_article('5001', read_count=200 + i)], ts=now - 600 + i * 60)
+
+    assert db.compact_article_stats(raw_retention_days=7, hourly_retention_days=90) == 3
+    series = db.get_article_stats('5001')
+    assert [s['reads'] for s in series] == [103, 200, 201, 202]
+
+
+def test_async_writer():
+    """测试后台单写线程：并发写入、失败隔离和关闭时落盘"""
+    db = make_database(async_writes=True, writer_options={'max_batch_delay': 0.01})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda i: db.add_article(make_article(str(7000 + i))), range(200)))
+    assert all(results)
+    assert not db.add_article(make_article('7000'))
+
+    # 单个写操作失败不影响同一事务中的其他写操作
+    bad = db.add_article_async({'article_id': '7999'})
+    good = db.add_article_async(make_article('7998'))
+    assert good.result() is True
+    assert bad.exception() is not None
+
+    futures = [db.mark_as_notified_async(str(7000 + i)) for i in range(100)]
+    db.close()
+    assert all(future.result() for future in futures)
+    assert len(db.get_unnotified_articles()) == 101
+
+    # 与关闭并发的提交要么被拒绝，要么一定会完成
+    writer = DatabaseWriter(db.db_path)
+    accepted = []
+
+    def submit_many():
+        for _ in range(200):
+            try:
+                accepted.append(writer.submit(lambda conn: 1))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=submit_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    writer.close()
+    for thread in threads:
+        thread.join()
+    assert all(future.result(timeout=5) == 1 for future in accepted)
+
+    # 写线程无法打开数据库时，排队的写操作失败而不是一直等待
+    writer = DatabaseWriter(os.path.join(tempfile.mkdtemp(), 'missing', 'x.db'))
+    writer._thread.join(5)
+    try:
+        writer.submit(lambda conn: 1).result(timeout=5)
+        assert False, "写线程退出后提交应失败"
+    except RuntimeError:
+        pass
+
+
+def test_migrate_legacy_database():
+    """测试旧版本数据库（无版本号、缺少字段）的迁移"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                publish_time TEXT,
+                author TEXT,
+                summary TEXT,
+                created_at TEXT NOT NULL,
+                notified BOOLEAN DEFAULT FALSE
+            )
+        ''')
+        conn.execute("INSERT INTO articles (article_id, title, url, created_at) VALUES ('8001', '旧文章', 'u', 'x')")
+
+    db = ArticleDatabase(path)
+    with sqlite3.connect(path) as conn:
+        assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+        assert migrations.pending_migrations(conn) == []
+    assert db.get_latest_articles(1)[0]['read_count'] == 0
+
+    # 已是最新版本时不再执行迁移
+    assert migrations.migrate(path) == []
+
+
+def test_search_articles():
+    """测试全文搜索：中文关键词、短关键词、分页和触发器同步"""
+    db = make_database()
+    db.add_article(make_article('9001', title='WTT美国大满贯战报：国乒6战全胜', summary='混双8强出炉'))
+    db.add_article(make_article('9002', title='新能源汽车销量创新高', summary='国乒队员代言'))
+    db.add_article(make_article('9003', title='大满贯赛程公布', summary='乒乓球赛事'))
+
+    result = db.search_articles('大满贯')
+    assert result['total'] == 2
+    assert result['results'][0]['article_id'] in ('9001', '9003')
+
+    # 一两个字的关键词走短关键词索引，ASCII不区分大小写
+    assert {a['article_id'] for a in db.search_articles('国乒')['results']} == {'9001', '9002'}
+    assert [a['article_id'] for a in db.search_articles('大满贯 国乒')['results']] == ['9001']
+    assert [a['article_id'] for a in db.search_articles('wt')['results']] == ['9001']
+    assert {a['article_id'] for a in db.search_articles('球')['results']} == {'9003'}
+    assert {a['article_id'] for a in db.search_articles('出')['results']} == {'9001'}
+
+    page = db.search_articles('大满贯', limit=1, offset=1)
+    assert page['total'] == 2 and len(page['results']) == 1
+
+    # 标题更新后索引同步
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE articles SET title = '赛程调整' WHERE article_id = '9003'")
+    assert db.search_articles('大满贯')['total'] == 1
+    assert db.search_articles('赛程调整')['total'] == 1
+    assert db.search_articles('调整')['total'] == 1
+    assert db.search_articles('公布')['total'] == 0
+
+    db.delete_articles(['9002'])
+    assert {a['article_id'] for a in db.search_articles('国乒')['results']} == {'9001'}
+
+
+def test_short_term_search_timing():
+    """测试两个字的关键词走索引，不扫描全部文章"""
+    db = make_database()
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany(
+            'INSERT INTO articles (article_id, title, url, summary, created_at) VALUES (?, ?, ?, ?, ?)',
+            [(f'p{i}', f'第{i}篇新能源汽车行业观察', 'u', '销量与价格走势分析，产业链上下游动态汇总', '2024-01-01')
+             for i in range(5000)] +
+            [(f'q{i}', f'国乒第{i}站', 'u', '', '2024-01-02') for i in range(20)]
+        )
+
+    start = time.perf_counter()
+    result = db.search_articles('国乒')
+    elapsed = time.perf_counter() - start
+    assert result['total'] == 20 and len(result['results']) == 20
+    assert elapsed < 0.02, f"两个字的关键词搜索耗时 {elapsed * 1000:.1f}ms"
+
+    with sqlite3.connect(db.db_path) as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM articles a '
+            'WHERE a.id IN (SELECT article_id FROM article_grams WHERE gram = ?)', ('国乒',)))
+    assert 'SEARCH article_grams' in plan and 'SCAN a' not in plan, plan
+
+
+def make_legacy_database(count: int) -> str:
+    """创建没有版本号的旧数据库，包含 count 篇文章"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                publish_time TEXT,
+                author TEXT,
+                summary TEXT,
+                created_at TEXT NOT NULL,
+                notified BOOLEAN DEFAULT FALSE
+            )
+        ''')
+        conn.executemany(
+            "INSERT INTO articles (article_id, title, url, summary, created_at, notified) VALUES (?, ?, 'u', ?, ?, ?)",
+            [(f'{80000 + i}', f'历史文章{i}号', None if i % 2 else '旧摘要', f'2024-01-{i % 28 + 1:02d}', i % 3 == 0)
+             for i in range(count)]
+        )
+    return path
+
+
+def test_batched_backfill():
+    """测试迁移提交后分批回填全文索引和文章计数，回填前文章的增删改不会破坏索引或重复计数"""
+    path = make_legacy_database(250)
+
+    # 只执行结构迁移，暂不回填
+    run_backfills, migrations.run_backfills = migrations.run_backfills, lambda db_path: {}
+    try:
+        migrations.migrate(path)
+    finally:
+        migrations.run_backfills = run_backfills
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT last_id, max_id FROM schema_backfills WHERE name = 'articles_fts'").fetchone() == (0, 250)
+        assert conn.execute('SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ?', ('历史文章',)).fetchone()[0] == 0
+
+        # 回填完成前修改、删除尚未回填的文章，并写入新文章
+        conn.execute("UPDATE articles SET title = '改过的标题' WHERE article_id = '80005'")
+        conn.execute("DELETE FROM articles WHERE article_id = '80006'")
+        conn.execute("INSERT INTO articles (article_id, title, url, created_at) VALUES ('89999', '回填期间的新文章', 'u', 'x')")
+        # 尚未计入汇总的文章改为已通知
+        conn.execute("UPDATE articles SET notified = TRUE WHERE article_id = '80001'")
+
+    assert migrations.run_backfills(path, batch_size=100) == {'articles_fts': 249, 'article_summary': 249,
+                                                              'article_grams': 249}
+    assert migrations.run_backfills(path) == {}
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('integrity-check')")
+        assert conn.execute('SELECT COUNT(*) FROM schema_backfills').fetchone()[0] == 0
+
+    db = ArticleDatabase(path)
+    assert db.search_articles('历史文章')['total'] == 248
+    assert db.search_articles('改过的标题')['total'] == 1
+    assert db.search_articles('回填期间')['total'] == 1
+    assert db.search_articles('号')['total'] == 248
+    assert db.search_articles('改过')['total'] == 1
+    assert db.search_articles('回填')['total'] == 1
+
+    summary = db.get_article_summary()
+    with sqlite3.connect(path) as conn:
+        expected = conn.execute('SELECT COUNT(*), SUM(notified = FALSE) FROM articles').fetchone()
+    assert (summary['total'], summary['unnotified']) == expected == (250, 166)
+
+
+def test_near_duplicate_detection():
+    """测试近似重复文章检测"""
+    db = make_database()
+    summary = '北京时间7月9日上午，乒乓球WTT美国大满贯继续进行，混双1/4决赛全部结束，国乒6战全胜。'
+    original = make_article('10001', title='WTT美国大满贯9日战报：混双8强出炉！栋曼横扫晋级', summary=summary)
+    repost = make_article('10002', title='WTT美国大满贯9日战报：混双8强出炉，栋曼横扫晋级！', summary=summary)
+    other = make_article('10003', title='新能源汽车销量创新高', summary='今年上半年新能源汽车销量持续增长。')
+
+    assert db.add_article(original) and 'duplicate_of' not in original
+    assert db.add_article(repost)
+    assert repost['duplicate_of'] == '10001'
+    assert repost['duplicate_notified'] is False
+    assert db.add_article(other) and 'duplicate_of' not in other
+
+    db.mark_as_notified('10001')
+    second_repost = make_article('10004', title='WTT美国大满贯9日战报 混双8强出炉 栋曼横扫晋级', summary=summary)
+    db.add_article(second_repost)
+    assert second_repost['duplicate_of'] == '10001'
+    assert second_repost['duplicate_notified'] is True
+
+    assert [d['article_id'] for d in db.get_duplicate_sources('10001')] == ['10002', '10004']
+
+
+def test_retention():
+    """测试清理测试文章、归档过期文章和增量回收"""
+    db = make_database(async_writes=True)
+    for i in range(300):
+        db.add_article_async(make_article(f'old_{i}', summary='过期文章摘要' * 100))
+    db.add_article(make_article('new_1'))
+    db.add_article(make_article('test_1700000000'))
+    db.record_article_stats([make_article('old_0', read_count=500)], ts=1700000000)
+    db.flush()
+
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE articles SET created_at = '2020-01-15T08:00:00' WHERE article_id LIKE 'old%'")
+    assert db.get_storage_info()['auto_vacuum'] == 2
+
+    archive_dir = tempfile.mkdtemp()
+    manager = RetentionManager(db, archive_dir=archive_dir, max_age_days=30, batch_size=100)
+    report = manager.run()
+    assert report['purged'] == 1
+    assert report['archived'] == 300
+    assert report['reclaimed_bytes'] > 0
+    assert report['freelist_count'] == 0
+
+    assert [a['article_id'] for a in db.get_latest_articles(10)] == ['new_1']
+    with gzip.open(os.path.join(archive_dir, 'articles-2020-01.jsonl.gz'), 'rt', encoding='utf-8') as f:
+        archived = [json.loads(line) for line in f]
+    assert len(archived) == 300
+    assert archived[0]['article_id'] == 'old_0'
+    assert archived[0]['stats'][-1] == [1700000000, 500, 1]
+
+    # 归档的文章再次出现在列表页时仍视为已有文章，测试文章不保留
+    assert db.article_exists('old_0') and db.article_exists('new_1')
+    assert not db.article_exists('test_1700000000')
+
+    # 抓取周期开始时立即停止
+    assert manager.run(should_stop=lambda: True)['archived'] == 0
+    db.close()
+
+
+def test_backup():
+    """测试写入进行中的在线备份、压缩和按数量轮转"""
+    db = make_database(async_writes=True)
+    for i in range(200):
+        db.add_article_async(make_article(f'{20000 + i}', summary='备份测试摘要' * 50))
+    db.flush()
+
+    backup_dir = tempfile.mkdtemp()
+    backup = DatabaseBackup(db.db_path, backup_dir=backup_dir, keep=2, pages_per_step=5, step_sleep=0.001)
+    # 备份期间写线程继续写入
+    futures = [db.add_article_async(make_article(f'{30000 + i}')) for i in range(50)]
+    report = backup.run()
+    assert all(future.result() for future in futures)
+    assert report['path'].endswith('.db.gz') and report['steps'] > 1
+
+    restored = os.path.join(backup_dir, 'restored.db')
+    with gzip.open(report['path'], 'rb') as src, open(restored, 'wb') as dst:
+        dst.write(src.read())
+    with sqlite3.connect(restored) as conn:
+        assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        assert conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0] >= 200
+    os.remove(restored)
+
+    backup.run()
+    third = backup.run()
+    assert len(third['removed']) == 1
+    assert backup.list_backups()[-1] == third['path'] and len(backup.list_backups()) == 2
+    db.close()
+
+
+def test_export():
+    """测试按博主和时间过滤的分批流式导出"""
+    db = make_database()
+    blogger_a = db.upsert_blogger(BLOGGER_URL_A, '博主A')
+    blogger_b = db.upsert_blogger(BLOGGER_URL_B, '博主B')
+    for i in range(25):
+        db.add_article(make_article(f'{40000 + i}', title=f'导出文章{i}'), blogger_a)
+    db.add_article(make_article('49999', title='博主B的文章'), blogger_b)
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute("UPDATE articles SET created_at = '2020-01-01T00:00:00' WHERE article_id = '40000'")
+
+    output_dir = tempfile.mkdtemp()
+    batches = []
+    report = export_articles(db, os.path.join(output_dir, 'a.jsonl'), blogger_id=blogger_a,
+                             since='2021-01-01', batch_size=10,
+                             progress=lambda exported, total, elapsed: batches.append((exported, total)))
+    assert report['rows'] == 24 and report['format'] == 'jsonl'
+    assert batches == [(10, 24), (20, 24), (24, 24)]
+    with open(report['path'], encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[0]['article_id'] == '40001' and rows[0]['title'] == '导出文章1'
+
+    report = export_articles(db, os.path.join(output_dir, 'all.csv'))
+    with open(report['path'], encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 26 and rows[-1]['title'] == '博主B的文章'
+    assert not os.path.exists(report['path'] + '.partial')
+
+    if PYARROW_AVAILABLE:
+        import pyarrow.parquet as pq
+        report = export_articles(db, os.path.join(output_dir, 'all.parquet'), batch_size=10)
+        table = pq.read_table(report['path'])
+        assert table.num_rows == 26 and table.column('read_count')[0].as_py() == 100
+
+
+def test_article_summary():
+    """测试触发器维护的文章计数汇总与实际计数一致"""
+    db = make_database(async_writes=True)
+    blogger_a = db.upsert_blogger(BLOGGER_URL_A, '博主A')
+    blogger_b = db.upsert_blogger(BLOGGER_URL_B, '博主B')
+    for i in range(10):
+        db.add_article(make_article(f'{50000 + i}'), blogger_a)
+    for i in range(3):
+        db.add_article(make_article(f'{51000 + i}'))
+    db.add_article(make_article('52000'), blogger_b)
+
+    db.mark_as_notified('50000')
+    db.mark_as_notified('50001')
+    db.assign_orphan_articles(blogger_b)
+    db.delete_articles(['50009', '52000'])
+    db.record_blogger_crawl(blogger_a, 'fingerprint', 1, success=True)
+
+    summary = db.get_article_summary()
+    with sqlite3.connect(db.db_path) as conn:
+        expected = dict(conn.execute(
+            'SELECT blogger_id, COUNT(*) FROM articles WHERE notified = FALSE GROUP BY blogger_id'
+        ).fetchall())
+    assert summary['total'] == 12 and summary['unnotified'] == 10
+    assert {row['blogger_id']: row['unnotified'] for row in summary['bloggers'] if row['total']} == expected
+    assert summary['last_crawl_time'] is not None
+
+    blogger_summary = db.get_article_summary(blogger_id=blogger_b)
+    assert blogger_summary['total'] == 3 and blogger_summary['unnotified'] == 3
+    assert blogger_summary['last_article_at'] is not None and blogger_summary['last_crawl_time'] is None
+    assert [row['name'] for row in blogger_summary['bloggers']] == ['博主B']
+    db.close()
+
+
+def test_large_id_lists():
+    """测试超过SQLite参数个数上限的ID列表分块查询和删除"""
+    database = make_database()
+    article_ids = [f'big{i}' for i in range(1200)]
+    for article_id in article_ids:
+        database.add_article(make_article(article_id))
+
+    with sqlite3.connect(database.db_path) as conn:
+        row_ids = [row[0] for row in conn.execute('SELECT id FROM articles')]
+    assert len(database.get_articles_by_row_ids(row_ids)) == 1200
+    assert database.mark_trending_alerted(article_ids) == 1200
+    assert database.get_articles_by_row_ids(row_ids, only_not_trending_alerted=True) == {}
+
+    observed = [make_article(article_id, read_count=1000 + i) for i, article_id in enumerate(article_ids)]
+    assert database.record_article_stats(observed, ts=1000) == 1200
+    # 与最近快照相同的不重复写入
+    assert database.record_article_stats(observed, ts=1300) == 0
+
+    assert database.delete_articles(article_ids[:1100]) == 1100
+    assert database.get_article_summary()['total'] == 100
+
+
+def test_delivery_stats_window():
+    """测试投递统计默认只覆盖最近24小时，按时间索引查询，写入时删除过期记录"""
+    database = make_database()
+    now = datetime.now()
+    with sqlite3.connect(database.db_path) as conn:
+        conn.executemany('''
+            INSERT INTO notification_deliveries (article_id, target, success, error, elapsed_ms, created_at)
+            VALUES (?, 'default', ?, ?, 10, ?)
+        ''', [
+            ('old', False, '很久以前', (now - timedelta(days=40)).isoformat()),
+            ('yesterday', False, '两天前', (now - timedelta(days=2)).isoformat()),
+            ('recent', True, None, (now - timedelta(hours=1)).isoformat()),
+        ])
+
+    stats = database.get_delivery_stats()['default']
+    assert stats['total'] == 1 and stats['succeeded'] == 1 and stats['last_error'] is None
+    stats = database.get_delivery_stats(since=(now - timedelta(days=3)).isoformat())['default']
+    assert stats['total'] == 2 and stats['last_error'] == '两天前'
+
+    with sqlite3.connect(database.db_path) as conn:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM notification_deliveries WHERE created_at >= ?', ('',)))
+    assert 'idx_deliveries_created' in plan, plan
+
+    database.record_deliveries_async([('new', 'default', True, None, 5, None)]).result()
+    with sqlite3.connect(database.db_path) as conn:
+        article_ids = {row[0] for row in conn.execute('SELECT article_id FROM notification_deliveries')}
+    assert article_ids == {'yesterday', 'recent', 'new'}, "超过保留天数的记录应删除"
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("博主token提取", test_extract_blogger_token),
+        ("按博主查询", test_per_blogger_queries),
+        ("历史文章归属", test_assign_orphan_articles),
+        ("统计快照去重", test_article_stats_dedup),
+        ("统计快照降采样", test_article_stats_compaction),
+        ("后台单写线程", test_async_writer),
+        ("旧数据库迁移", test_migrate_legacy_database),
+        ("全文搜索", test_search_articles),
+        ("短关键词搜索走索引", test_short_term_search_timing),
+        ("分批回填", test_batched_backfill),
+        ("近似重复检测", test_near_duplicate_detection),
+        ("数据保留与空间回收", test_retention),
+        ("在线备份", test_backup),
+        ("流式导出", test_export),
+        ("文章计数汇总", test_article_summary),
+        ("大ID列表分块", test_large_id_lists),
+        ("投递统计时间窗口", test_delivery_stats_window),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书应用机器人通知器测试
+使用本地HTTP服务模拟飞书开放平台的令牌和消息接口，验证令牌缓存、主动刷新、多群发送和消息编辑，无需网络
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.feishu_app_notifier import FeishuAppNotifier
+from toutiao.notifier_registry import NotifierRegistry
+from test_database import make_article
+
+APP_ID = 'cli_test_app'
+APP_SECRET = 'test_app_secret'
+CHAT_IDS = ['oc_chat_a', 'oc_chat_b', 'oc_chat_c']
+
+
+class OpenApiStubHandler(BaseHTTPRequestHandler):
+    """模拟飞书开放平台的 tenant_access_token、发送消息和编辑消息接口"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status: int, result: dict):
+        response = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def _read_body(self) -> dict:
+        return json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+    def _authorized(self) -> bool:
+        token = self.headers.get('Authorization', '')[len('Bearer '):]
+        return token in self.server.valid_tokens
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._read_body()
+        server = self.server
+
+        if url.path == '/open-apis/auth/v3/tenant_access_token/internal':
+            if (body.get('app_id'), body.get('app_secret')) != (APP_ID, APP_SECRET):
+                return self._reply(400, {'code': 10014, 'msg': 'app secret invalid'})
+            with server.lock:
+                server.token_requests += 1
+                token = f't-{server.token_requests}'
+                server.valid_tokens.add(token)
+            return self._reply(200, {'code': 0, 'msg': 'ok', 'tenant_access_token': token, 'expire': server.expire})
+
+        if url.path == '/open-apis/im/v1/messages':
+            if not self._authorized():
+                return self._reply(400, {'code': 99991663, 'msg': 'Invalid access token for authorization.'})
+            assert parse_qs(url.query)['receive_id_type'] == ['chat_id']
+            if body['receive_id'] in server.failing_chats:
+                return self._reply(400, {'code': 230002, 'msg': 'bot is not in the chat'})
+            time.sleep(server.delay)
+            with server.lock:
+                message_id = f'om_{len(server.messages) + 1}'
+                server.messages[message_id] = {
+                    'chat_id': body['receive_id'],
+                    'msg_type': body['msg_type'],
+                    'content': json.loads(body['content'])
+                }
+            return self._reply(200, {'code': 0, 'msg': 'success',
+                                     'data': {'message_id': message_id, 'chat_id': body['receive_id']}})
+
+        self._reply(404, {'code': 404, 'msg': 'not found'})
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        body = self._read_body()
+        message_id = url.path.rsplit('/', 1)[-1]
+        if not self._authorized():
+            return self._reply(400, {'code': 99991663, 'msg': 'Invalid access token for authorization.'})
+        if message_id not in self.server.messages:
+            return self._reply(400, {'code': 230001, 'msg': 'message not found'})
+        self.server.messages[message_id]['content'] = json.loads(body['content'])
+        self.server.edits.append(message_id)
+        self._reply(200, {'code': 0, 'msg': 'success', 'data': {}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_open_api_stub(expire: int = 7200) -> ThreadingHTTPServer:
+    """启动本地模拟开放平台"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OpenApiStubHandler)
+    server.lock = threading.Lock()
+    server.expire = expire
+    server.token_requests = 0
+    server.valid_tokens = set()
+    server.messages = {}
+    server.edits = []
+    server.failing_chats = set()
+    server.delay = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_notifier(server: ThreadingHTTPServer, **kwargs) -> FeishuAppNotifier:
+    return FeishuAppNotifier(APP_ID, APP_SECRET, CHAT_IDS,
+                             base_url=f'http://127.0.0.1:{server.server_port}', **kwargs)
+
+
+def test_token_cached():
+    """测试多条消息、多个群共用一个令牌"""
+    server = start_open_api_stub()
+    try:
+        notifier = make_notifier(server)
+        for i in range(3):
+            assert notifier.send_text_message(f'消息{i}')
+
+        assert server.token_requests == 1
+        assert notifier.get_token_stats()['fetches'] == 1
+        assert len(server.messages) == 9
+        assert sorted({message['chat_id'] for message in server.messages.values()}) == CHAT_IDS
+        assert server.messages['om_1']['content'] == {'text': '消息0'}
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_token_refresh():
+    """测试令牌临近过期时主动刷新，失效时刷新后重试"""
+    server = start_open_api_stub(expire=7200)
+    try:
+        notifier = make_notifier(server, token_refresh_margin=300)
+        assert notifier.get_token() == 't-1'
+
+        # 剩余有效期少于刷新余量，下一次取令牌时主动换新
+        notifier._token_expires_at = time.monotonic() + 100
+        assert notifier.get_token() == 't-2'
+        assert notifier.get_token_stats()['expires_in'] > 7000
+
+        # 服务端吊销令牌，发送时刷新后重试成功
+        server.valid_tokens.clear()
+        assert notifier.send_message('text', {'text': '令牌失效重试'}, chat_ids=['oc_chat_a'])['oc_chat_a']
+        assert server.token_requests == 3
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_send_and_edit():
+    """测试文章通知发到全部群，并编辑已发送的消息"""
+    server = start_open_api_stub()
+    try:
+        notifier = make_notifier(server)
+        article = make_article('66001', title='应用机器人文章')
+        assert notifier.send_article_notification(article)
+        assert len(server.messages) == 3
+        assert '应用机器人文章' in server.messages['om_1']['content']['text']
+
+        post = {'zh_cn': {'title': '标题', 'content': [[{'tag': 'text', 'text': '正文'}]]}}
+        message_ids = notifier.send_message('post', post)
+        assert all(message_ids.values()) and list(message_ids) == CHAT_IDS
+
+        message_id = message_ids['oc_chat_b']
+        assert notifier.update_message(message_id, 'post', {'zh_cn': {'title': '标题（已更新）', 'content': []}})
+        assert server.edits == [message_id]
+        assert server.messages[message_id]['content']['zh_cn']['title'] == '标题（已更新）'
+        assert not notifier.update_message('om_missing', 'text', {'text': '不存在'})
+
+        # 补全详情后编辑文章通知的原消息，不再补发新消息
+        article['author'] = '补全后的作者'
+        assert notifier.update_article_notification(article)
+        assert len(server.messages) == 6
+        assert sorted(server.edits[1:]) == ['om_1', 'om_2', 'om_3']
+        assert '补全后的作者' in server.messages['om_2']['content']['text']
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_partial_delivery():
+    """测试部分群发送失败时按群记录送达情况，重试只补发失败的群"""
+    server = start_open_api_stub()
+    try:
+        notifier = make_notifier(server)
+        assert notifier.webhook_url == notifier.messages_url
+        keys = notifier.delivery_keys()
+        assert len(set(keys)) == 3 and notifier.target_key not in keys
+
+        article = make_article('66002', title='部分送达文章')
+        server.failing_chats = {'oc_chat_b'}
+        assert not notifier.send_article_notification(article)
+        server.messages.clear()
+        assert notifier.deliver_article(article, None, keys) == [keys[0], keys[2]]
+
+        server.failing_chats = set()
+        assert notifier.deliver_article(article, None, [keys[1]]) == [keys[1]]
+        chats = [message['chat_id'] for message in server.messages.values()]
+        assert sorted(chats[:2]) == ['oc_chat_a', 'oc_chat_c'] and chats[2:] == ['oc_chat_b']
+
+        # 分两次送达的消息都会被编辑
+        assert notifier.update_article_notification(article)
+        assert len(server.edits) == 3
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_concurrent_chats():
+    """测试一条消息并发发到多个群，返回结果按群的顺序"""
+    server = start_open_api_stub()
+    try:
+        notifier = make_notifier(server)
+        notifier.get_token()
+        server.delay = 0.2
+
+        start = time.perf_counter()
+        message_ids = notifier.send_message('text', {'text': '并发发送'})
+        elapsed = time.perf_counter() - start
+        assert list(message_ids) == CHAT_IDS and all(message_ids.values())
+        assert elapsed < 0.5, f"3个群发送耗时 {elapsed:.2f}s"
+        assert {server.messages[message_id]['chat_id'] for message_id in message_ids.values()} == set(CHAT_IDS)
+
+        # send_workers 为1时依次发送
+        sequential = make_notifier(server, send_workers=1)
+        sequential.get_token()
+        start = time.perf_counter()
+        assert all(sequential.send_message('text', {'text': '依次发送'}).values())
+        assert time.perf_counter() - start >= 0.6
+        notifier.close()
+        sequential.close()
+    finally:
+        server.shutdown()
+
+
+def test_registry_target():
+    """测试应用机器人作为命名通知目标注册"""
+    server = start_open_api_stub()
+    try:
+        registry = NotifierRegistry.from_config({
+            'feishu': {'webhook_url': 'https://open.feishu.cn/open-apis/bot/v2/hook/test', 'secret': ''},
+            'notifiers': {'targets': {'app': {
+                'type': 'feishu_app', 'app_id': APP_ID, 'app_secret': APP_SECRET, 'chat_ids': CHAT_IDS[:2],
+                'base_url': f'http://127.0.0.1:{server.server_port}'
+            }}}
+        })
+        notifier = registry.get('app')
+        assert isinstance(notifier, FeishuAppNotifier)
+        assert notifier.rate_limiter.second_bucket.rate == FeishuAppNotifier.DEFAULT_RATE_PER_SECOND
+        assert notifier.session is registry.get('default').session
+        assert notifier.send_text_message('注册表目标')
+        assert len(server.messages) == 2
+
+        try:
+            registry.register('broken', {'type': 'feishu_app', 'app_id': APP_ID})
+            assert False, "缺少必填配置时应报错"
+        except ValueError as e:
+            assert 'app_secret' in str(e) and 'chat_ids' in str(e)
+        registry.close()
+    finally:
+        server.shutdown()
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("令牌缓存", test_token_cached),
+        ("令牌刷新", test_token_refresh),
+        ("多群发送与编辑", test_send_and_edit),
+        ("按群记录送达", test_partial_delivery),
+        ("多群并发发送", test_concurrent_chats),
+        ("注册为通知目标", test_registry_target),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+飞书通知器测试
+使用本地HTTP服务模拟飞书机器人接口，验证连接复用、超时和耗时统计，无需网络
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hmac
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.feishu_notifier import FeishuNotifier
+from toutiao.monitor import ArticleMonitor
+from toutiao.rate_limit import TokenBucket
+from test_database import make_article
+from test_lazy_components import make_config
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """模拟飞书机器人接口，记录每个请求的客户端端口"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.last_request = (dict(self.headers), body)
+        time.sleep(self.server.delay)
+        status = 200
+        if self.server.rate_limit_remaining > 0:
+            self.server.rate_limit_remaining -= 1
+            status = self.server.rate_limit_status
+            response = json.dumps({'code': 9499, 'msg': 'too many request'}).encode()
+        elif self.server.fail_remaining > 0:
+            self.server.fail_remaining -= 1
+            response = json.dumps({'code': 19021, 'msg': 'sign match fail or timestamp is not within one hour'}).encode()
+        else:
+            self.server.received.append((self.client_address[1], json.loads(body)))
+            response = json.dumps({'StatusCode': 0, 'StatusMessage': 'success'}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """启动本地模拟服务"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.received = []
+    server.fail_remaining = 0
+    server.rate_limit_remaining = 0
+    server.rate_limit_status = 200
+    server.delay = 0
+    server.last_request = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_connection_reuse():
+    """测试连续发送复用同一个连接，并记录耗时"""
+    server = start_stub_server()
+    try:
+        notifier = FeishuNotifier(f'http://127.0.0.1:{server.server_port}/hook', 'secret')
+        for i in range(5):
+            assert notifier.send_text_message(f'消息{i}')
+
+        ports = {port for port, _ in server.received}
+        assert len(server.received) == 5
+        assert len(ports) == 1, f"使用了 {len(ports)} 个连接"
+        assert 'sign' in server.received[0][1]
+
+        # 共享会话的其他机器人也复用连接
+        other = FeishuNotifier(f'http://127.0.0.1:{server.server_port}/other', session=notifier.session)
+        assert other.send_text_message('其他机器人')
+        assert server.received[-1][0] in ports
+
+        stats = notifier.get_latency_stats()
+        assert stats['requests'] == 5 and stats['errors'] == 0
+        assert 0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['max_ms']
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_connect_failure_recorded():
+    """测试连接失败计入错误统计"""
+    server = start_stub_server()
+    port = server.server_port
+    server.shutdown()
+    server.server_close()
+
+    notifier = FeishuNotifier(f'http://127.0.0.1:{port}/hook', connect_timeout=0.5, read_timeout=0.5)
+    assert notifier.timeout == (0.5, 0.5)
+    assert not notifier.send_text_message('无法送达')
+    stats = notifier.get_latency_stats()
+    assert stats['requests'] == 1 and stats['errors'] == 1
+
+
+def test_digest_split():
+    """测试摘要按文章数和请求体大小拆分"""
+    server = start_stub_server()
+    try:
+        notifier = FeishuNotifier(f'http://127.0.0.1:{server.server_port}/hook')
+        groups = [(make_article(f'{60000 + i}', title=f'摘要文章{i}'), []) for i in range(25)]
+        results = notifier.send_digest(groups, max_articles=10)
+        assert results == [True] * 25
+        assert len(server.received) == 3
+        titles = [body['content']['post']['zh_cn']['title'] for _, body in server.received]
+        assert titles == ['📰 发现 10 篇新文章（1/3）', '📰 发现 10 篇新文章（2/3）', '📰 发现 5 篇新文章（3/3）']
+
+        # 标题很长时按请求体大小拆分
+        long_groups = [(make_article(f'{61000 + i}', title='长' * 3000), []) for i in range(6)]
+        chunks = notifier.split_digest(long_groups, max_articles=10)
+        assert len(chunks) > 1 and sum(len(chunk) for chunk in chunks) == 6
+        for chunk in chunks:
+            content = []
+            for index in chunk:
+                content.extend(notifier._build_digest_paragraphs(*long_groups[index]))
+            assert notifier._payload_size('标题', content) <= FeishuNotifier.MAX_PAYLOAD_BYTES
+    finally:
+        server.shutdown()
+
+
+def test_monitor_digest_window():
+    """测试监控服务的摘要等待窗口和批量标记已通知"""
+    server = start_stub_server()
+    try:
+        config_path = make_config(
+            feishu={'webhook_url': f'http://127.0.0.1:{server.server_port}/hook', 'secret': ''},
+            digest={'enabled': True, 'max_articles': 3, 'flush_window_seconds': 3600}
+        )
+        monitor = ArticleMonitor(config_path)
+        articles = [make_article(f'{62000 + i}', title=f'窗口文章{i}') for i in range(4)]
+        for article in articles:
+            monitor.database.add_article(article, monitor.blogger_id)
+
+        # 只有达到3篇的机器人缓存才发送；4篇一起到达时一次发出
+        assert monitor.send_notifications(articles[:2]) == 0
+        assert server.received == []
+        assert monitor.send_notifications(articles[2:]) == 4
+        assert len(server.received) == 2
+        monitor.database.flush()
+        assert monitor.database.get_unnotified_articles() == []
+    finally:
+        server.shutdown()
+
+
+def test_outbox_delivery():
+    """测试发件箱的同事务入队、失败重试、死信和重启恢复"""
+    server = start_stub_server()
+    try:
+        config_path = make_config(
+            feishu={'webhook_url': f'http://127.0.0.1:{server.server_port}/hook', 'secret': ''},
+            outbox={'enabled': True, 'max_attempts': 3, 'base_delay_seconds': 0}
+        )
+        monitor = ArticleMonitor(config_path)
+        database = monitor.database
+        summary = '北京时间7月9日上午，乒乓球WTT美国大满贯继续进行，混双1/4决赛全部结束。'
+        original = make_article('63001', title='WTT美国大满贯9日战报：混双8强出炉！', summary=summary)
+        repost = make_article('63002', title='WTT美国大满贯9日战报：混双8强出炉', summary=summary)
+        assert database.add_article(original, monitor.blogger_id, enqueue_notification=True)
+        assert database.add_article(repost, monitor.blogger_id, enqueue_notification=True)
+        # 转载合并到首发文章的通知中，不单独排队
+        assert original['outbox_queued'] and 'outbox_queued' not in repost
+        assert database.get_outbox_stats()['pending'] == 1
+
+        # 前两次失败，第三次送达
+        server.fail_remaining = 2
+        assert monitor.outbox.run_once() == 3
+        assert len(server.received) == 1
+        assert '另有 1 个来源' in server.received[0][1]['content']['text']
+        assert database.get_unnotified_articles() == []
+
+        # 超过重试次数进入死信，重新排队后可以投递
+        database.add_article(make_article('63003', title='新能源汽车销量创新高'), monitor.blogger_id,
+                             enqueue_notification=True)
+        server.fail_remaining = 3
+        monitor.outbox.run_once()
+        assert database.get_outbox_stats()['dead'] == 1
+        assert database.get_dead_letters()[0]['title'] == '新能源汽车销量创新高'
+        assert database.requeue_dead_letters() == 1
+        assert monitor.outbox.run_once() == 1
+        assert database.get_outbox_stats() == {'pending': 0, 'sending': 0, 'dead': 0, 'oldest_pending': None}
+
+        # 其他进程领取后正在投递：租约内单次投递不会重复发送
+        database.add_article(make_article('63004', title='重启恢复测试'), monitor.blogger_id, enqueue_notification=True)
+        assert len(database.claim_outbox(10)) == 1
+        assert database.claim_outbox(10) == []
+        assert database.reset_stuck_outbox() == 0
+        assert monitor.outbox.run_once() == 0
+        assert len(server.received) == 2
+
+        # 投递方退出，租约过期后重新领取投递
+        assert len(database.claim_outbox(10, lease_timeout=0)) == 1
+        assert database.reset_stuck_outbox(lease_timeout=0) == 1
+        assert monitor.outbox.run_once() == 1
+        assert len(server.received) == 3
+    finally:
+        server.shutdown()
+
+
+def test_outbox_workers():
+    """测试后台投递线程被唤醒后投递，抓取线程不等待"""
+    server = start_stub_server()
+    try:
+        config_path = make_config(
+            feishu={'webhook_url': f'http://127.0.0.1:{server.server_port}/hook', 'secret': ''},
+            outbox={'enabled': True, 'workers': 2, 'poll_interval_seconds': 5}
+        )
+        monitor = ArticleMonitor(config_path)
+        monitor.outbox.start()
+        for i in range(6):
+            monitor.database.add_article(make_article(f'{64000 + i}', title=f'投递线程文章{i}'),
+                                         monitor.blogger_id, enqueue_notification=True)
+        monitor.outbox.wake()
+
+        deadline = time.time() + 5
+        while len(server.received) < 6 and time.time() < deadline:
+            time.sleep(0.05)
+        monitor.outbox.stop()
+        assert len(server.received) == 6
+        assert len({body['content']['text'] for _, body in server.received}) == 6
+    finally:
+        server.shutdown()
+
+
+def test_token_bucket():
+    """测试令牌桶在突发容量用完后按速率放行"""
+    bucket = TokenBucket(rate=20, capacity=5)
+    waits = [bucket.reserve() for _ in range(10)]
+    assert waits[:5] == [0.0] * 5
+    # 之后每个令牌间隔 1/20 秒排队
+    assert abs(waits[-1] - 5 / 20) < 0.02, waits
+    assert all(a < b for a, b in zip(waits[5:], waits[6:]))
+
+
+def test_rate_limited_retry():
+    """测试被飞书限流后降速重试，最终送达"""
+    server = start_stub_server()
+    try:
+        notifier = FeishuNotifier(f'http://127.0.0.1:{server.server_port}/hook')
+        notifier.rate_limiter.cooldown = 0.1
+
+        server.rate_limit_remaining = 1
+        start = time.monotonic()
+        assert notifier.send_text_message('限流后重试')
+        assert time.monotonic() - start >= 0.1
+        assert len(server.received) == 1
+
+        stats = notifier.rate_limiter.get_stats()
+        assert stats['rate_limited'] == 1
+        assert abs(stats['rate_factor'] - 0.55) < 1e-9, stats
+        assert stats['waited'] == 1 and stats['max_wait_ms'] >= 90
+
+        # HTTP 429 同样视为限流，重试次数用完后放弃
+        server.rate_limit_remaining = 10
+        server.rate_limit_status = 429
+        notifier.rate_limit_retries = 1
+        assert not notifier.send_text_message('持续限流')
+        assert notifier.rate_limiter.get_stats()['rate_limited'] == 3
+        notifier.close()
+    finally:
+        server.shutdown()
+
+
+def test_fan_out_targets():
+    """测试路由规则引用命名目标、多目标并发发送和按目标记录投递结果"""
+    servers = {name: start_stub_server() for name in ['default', 'fast', 'hook']}
+    try:
+        url = lambda name: f'http://127.0.0.1:{servers[name].server_port}/{name}'
+        config_path = make_config(
+            feishu={'webhook_url': url('default'), 'secret': ''},
+            notifiers={'max_workers': 4, 'targets': {
+                'fast': {'webhook_url': url('fast')},
+                'hook': {'type': 'webhook', 'webhook_url': url('hook'), 'secret': 'hook-secret'}
+            }},
+            routing={'rules': [
+                {'name': '乒乓球', 'keywords': ['乒乓球'], 'target': 'fast'},
+                {'name': '全部', 'target': 'hook'},
+                {'name': '乒乓球默认群', 'keywords': ['乒乓球'], 'target': 'default'},
+                {'name': '重复目标', 'target': 'fast'},
+                {'name': '不存在的目标', 'target': 'missing'}
+            ]}
+        )
+        monitor = ArticleMonitor(config_path)
+        article = make_article('65001', title='乒乓球大满贯战报')
+        monitor.database.add_article(article, monitor.blogger_id)
+
+        # 两个慢目标并发发送，总耗时接近单个目标
+        servers['default'].delay = servers['hook'].delay = 0.5
+        start = time.monotonic()
+        assert monitor.notify_article(article)
+        assert time.monotonic() - start < 0.9
+        assert [len(server.received) for server in servers.values()] == [1, 1, 1]
+
+        # 通用Webhook收到JSON事件和签名
+        headers, body = servers['hook'].last_request
+        event = json.loads(body)
+        assert event['event'] == 'new_article' and event['article']['article_id'] == '65001'
+        expected = hmac.new(b'hook-secret', headers['X-Signature-Timestamp'].encode() + b'.' + body,
+                            hashlib.sha256).hexdigest()
+        assert headers['X-Signature'] == f'sha256={expected}'
+
+        # 一个目标失败不影响其他目标，失败按目标记录
+        servers['default'].delay = servers['hook'].delay = 0
+        servers['fast'].fail_remaining = 1
+        other = make_article('65002', title='乒乓球混双决赛')
+        monitor.database.add_article(other, monitor.blogger_id)
+        assert not monitor.notify_article(other)
+        assert [len(server.received) for server in servers.values()] == [2, 1, 2]
+
+        monitor.database.flush()
+        stats = monitor.database.get_delivery_stats()
+        assert sorted(stats) == ['default', 'fast', 'hook']
+        assert stats['default']['succeeded'] == 2 and stats['hook']['succeeded'] == 2
+        assert stats['fast']['failed'] == 1 and stats['fast']['last_error'] == '发送失败'
+        assert monitor.get_status()['deliveries'] == stats
+        monitor.notifiers.close()
+
+        # 规则命中次数持久化，另一个进程（新的监控实例）执行 status 时也能看到
+        routing_stats = ArticleMonitor(config_path).get_status()['routing_stats']
+        assert list(routing_stats) == ['乒乓球', '全部', '乒乓球默认群', '重复目标', '不存在的目标']
+        assert all(stats['matches'] == 2 and stats['last_matched_at'] for stats in routing_stats.values())
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+
+def test_trending_routing():
+    """测试热门提醒经通知目标注册表发送，遵循路由规则"""
+    servers = {name: start_stub_server() for name in ['default', 'fast']}
+    try:
+        url = lambda name: f'http://127.0.0.1:{servers[name].server_port}/{name}'
+        config_path = make_config(
+            feishu={'webhook_url': url('default'), 'secret': ''},
+            notifiers={'targets': {'fast': {'webhook_url': url('fast')}}},
+            routing={'fallback_to_default': False,
+                     'rules': [{'name': '乒乓球', 'keywords': ['乒乓球'], 'target': 'fast'}]}
+        )
+        monitor = ArticleMonitor(config_path)
+        trending = []
+        for article_id, title in [('66001', '乒乓球大满贯战报'), ('66002', '财经早报')]:
+            article = make_article(article_id, title=title)
+            monitor.database.add_article(article, monitor.blogger_id)
+            trending.append(dict(article, velocity=8000, acceleration=None))
+
+        alerted = monitor.notify_trending(trending)
+        assert [article['article_id'] for article in alerted] == ['66001']
+        assert len(servers['fast'].received) == 1 and servers['default'].received == []
+        assert '乒乓球大满贯战报' in servers['fast'].received[0][1]['content']['text']
+
+        monitor.database.flush()
+        with sqlite3.connect(monitor.database.db_path) as conn:
+            rows = dict(conn.execute('SELECT article_id, trending_alerted_at IS NOT NULL FROM articles'))
+        assert rows == {'66001': 1, '66002': 0}
+        monitor.notifiers.close()
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+
+class ListOnlyCrawler:
+    """只有列表页数据的模拟爬虫，详情页按文章ID返回补全信息"""
+
+    def __init__(self, articles, details):
+        self.articles = articles
+        self.details = details
+        self.detail_requests = []
+
+    def get_articles_from_url(self, blogger_url, max_count=10):
+        return [dict(article, discovered_at=time.time()) for article in self.articles[:max_count]]
+
+    def get_latest_articles(self, blogger_url, limit=10):
+        raise AssertionError("先通知模式不应在通知前抓取详情")
+
+    def is_alive(self):
+        return True
+
+    def get_article_details(self, article_id):
+        self.detail_requests.append(article_id)
+        time.sleep(0.1)
+        return self.details.get(article_id, {})
+
+
+def test_notify_first():
+    """测试先通知模式：按列表页信息立即通知，后台补全详情后补发更新并记录告警延迟"""
+    server = start_stub_server()
+    try:
+        config_path = make_config(
+            feishu={'webhook_url': f'http://127.0.0.1:{server.server_port}/hook', 'secret': ''},
+            notify_first={'enabled': True},
+            digest={'enabled': True, 'flush_window_seconds': 3600}
+        )
+        monitor = ArticleMonitor(config_path)
+        list_articles = [make_article(f'{67000 + i}', title=f'先通知文章{i}', author='', summary='') for i in range(2)]
+        monitor.crawler = ListOnlyCrawler(list_articles, {
+            '67000': {'author': '详情作者', 'summary': '详情页摘要', 'publish_time': '2025-07-09 10:00'},
+        })
+
+        start = time.monotonic()
+        monitor.run_check_cycle()
+        # 通知在补全详情之前发出，不受摘要等待窗口影响
+        assert len(server.received) == 2
+        assert '未知作者' in server.received[0][1]['content']['text']
+        assert time.monotonic() - start < 0.5
+
+        monitor.wait_for_enrichment()
+        assert monitor.crawler.detail_requests == ['67000', '67001']
+        # 只有详情有变化的文章补发更新
+        assert len(server.received) == 3
+        update = server.received[2][1]['content']['text']
+        assert '文章详情补充' in update and '详情作者' in update and '详情页摘要' in update
+
+        monitor.database.flush()
+        stored = monitor.database.search_articles('详情页摘要')['results']
+        assert [article['article_id'] for article in stored] == ['67000']
+        assert stored[0]['author'] == '详情作者'
+        assert monitor.database.get_unnotified_articles() == []
+
+        latency = monitor.get_alert_latency_stats()
+        assert latency['count'] == 2 and latency['max'] < 0.5
+        stats = monitor.database.get_delivery_stats()['default']
+        assert stats['succeeded'] == 2 and 0 < stats['max_alert_ms'] < 500
+    finally:
+        server.shutdown()
+
+
+def test_notify_replay():
+    """测试分批补发未通知的文章：按入库时间过滤、失败保留、摘要发送"""
+    server = start_stub_server()
+    try:
+        config_path = make_config(feishu={'webhook_url': f'http://127.0.0.1:{server.server_port}/hook', 'secret': ''})
+        monitor = ArticleMonitor(config_path)
+        database = monitor.database
+        for i in range(5):
+            assert database.add_article(make_article(f'{68000 + i}', title=f'补发文章{i}'), monitor.blogger_id)
+        with sqlite3.connect(database.db_path) as conn:
+            conn.execute("UPDATE articles SET created_at = '2000-01-01T00:00:00' WHERE article_id = '68004'")
+        # 发件箱中等待投递的文章由投递线程负责，不补发
+        assert database.add_article(make_article('68005', title='发件箱中的文章'), monitor.blogger_id,
+                                    enqueue_notification=True)
+
+        # 第一篇发送失败，保持未通知；入库时间早于 since 的文章不补发
+        server.fail_remaining = 1
+        progress = []
+        report = monitor.replay_unnotified(since='2001-01-01', batch_size=2,
+                                           progress=lambda *args: progress.append(args))
+        assert (report['articles'], report['sent'], report['failed']) == (4, 3, 1)
+        assert [item[0] for item in progress] == [2, 4]
+        assert report['articles_per_second'] > 0
+        assert len(server.received) == 3
+        assert sorted(article['article_id'] for article in database.get_unnotified_articles()) == ['68000', '68004', '68005']
+
+        # 剩余文章合并为一条摘要发送
+        report = monitor.replay_unnotified(digest=True)
+        assert (report['articles'], report['sent'], report['failed']) == (2, 2, 0)
+        assert len(server.received) == 4
+        assert server.received[3][1]['msg_type'] == 'post'
+        assert [article['article_id'] for article in database.get_unnotified_articles()] == ['68005']
+        assert monitor.replay_unnotified()['articles'] == 0
+
+        database.flush()
+        stats = database.get_delivery_stats()['default']
+        assert stats['succeeded'] == 5 and stats['failed'] == 1
+    finally:
+        server.shutdown()
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("连接复用与耗时统计", test_connection_reuse),
+        ("连接失败统计", test_connect_failure_recorded),
+        ("摘要拆分", test_digest_split),
+        ("摘要等待窗口", test_monitor_digest_window),
+        ("发件箱重试与死信", test_outbox_delivery),
+        ("发件箱投递线程", test_outbox_workers),
+        ("令牌桶", test_token_bucket),
+        ("限流重试", test_rate_limited_retry),
+        ("多目标并发发送", test_fan_out_targets),
+        ("热门提醒路由", test_trending_routing),
+        ("先通知后补全", test_notify_first),
+        ("补发未通知文章", test_notify_replay),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
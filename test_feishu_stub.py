@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地飞书机器人模拟服务测试
+验证签名校验、限流、错误注入和消息记录，以及通知器对这些响应的处理，无需网络
+"""
+
+import os
+import sys
+import json
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.feishu_notifier import FeishuNotifier
+from toutiao.feishu_stub import FeishuWebhookStub, generate_sign
+from test_database import make_article
+
+SECRET = 'stub-test-secret'
+
+
+def test_signature_verification():
+    """测试模拟服务按通知器的签名算法校验请求"""
+    with FeishuWebhookStub(secret=SECRET) as stub:
+        notifier = FeishuNotifier(stub.url, SECRET)
+        assert generate_sign('1700000000', SECRET) == notifier._generate_sign('1700000000')
+        assert notifier.send_text_message('签名正确')
+        assert notifier.send_article_notification(make_article('69001', title='模拟服务文章'))
+
+        # 密钥错误或未签名的请求被拒绝
+        assert not FeishuNotifier(stub.url, 'wrong-secret').send_text_message('签名错误')
+        assert not FeishuNotifier(stub.url).send_text_message('未签名')
+
+        # 时间戳超过一小时的签名无效
+        timestamp = str(int(time.time()) - 7200)
+        status, result, _ = stub.handle('/open-apis/bot/v2/hook/stub', json.dumps({
+            'msg_type': 'text', 'content': {'text': '过期'}, 'timestamp': timestamp,
+            'sign': generate_sign(timestamp, SECRET)
+        }).encode())
+        assert result['code'] == 19021
+
+        stats = stub.get_stats()
+        assert stats['accepted'] == 2 and stats['sign_failed'] == 3
+        assert [message['msg_type'] for message in stub.messages()] == ['text', 'text']
+        assert '模拟服务文章' in stub.messages()[1]['content']['text']
+        assert stub.messages('text')[0]['content'] == {'text': '签名正确'}
+        notifier.close()
+
+
+def test_rate_limit_and_retry():
+    """测试模拟服务限流时通知器降速重试，全部送达"""
+    with FeishuWebhookStub(rate_per_second=3) as stub:
+        notifier = FeishuNotifier(stub.url, rate_per_second=100, rate_per_minute=10000, rate_limit_retries=5)
+        notifier.rate_limiter.cooldown = 0.2
+        assert all(notifier.send_text_message(f'消息{i}') for i in range(8))
+
+        stats = stub.get_stats()
+        assert stats['accepted'] == 8
+        assert stats['rate_limited'] > 0
+        assert stats['requests'] == stats['accepted'] + stats['rate_limited']
+        assert notifier.rate_limiter.get_stats()['rate_limited'] == stats['rate_limited']
+        notifier.close()
+
+
+def test_error_injection_and_latency():
+    """测试错误注入、响应延迟和无效请求"""
+    with FeishuWebhookStub(error_rate=1.0) as stub:
+        notifier = FeishuNotifier(stub.url)
+        assert not notifier.send_text_message('必然失败')
+        assert stub.get_stats()['errors'] == 1 and stub.messages() == []
+        notifier.close()
+
+    with FeishuWebhookStub(latency=0.1) as stub:
+        notifier = FeishuNotifier(stub.url)
+        start = time.perf_counter()
+        assert notifier.send_text_message('延迟响应')
+        assert time.perf_counter() - start >= 0.1
+
+        assert stub.handle('/other', b'{}')[0] == 404
+        assert stub.handle('/open-apis/bot/v2/hook/stub', b'not json')[1]['code'] == 19002
+        assert stub.handle('/open-apis/bot/v2/hook/stub', b'x' * (21 * 1024))[1]['code'] == 19002
+
+        stub.reset()
+        assert stub.get_stats()['requests'] == 0 and stub.messages() == []
+        notifier.close()
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("签名校验", test_signature_verification),
+        ("限流与重试", test_rate_limit_and_retry),
+        ("错误注入与延迟", test_error_injection_and_latency),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
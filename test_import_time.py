@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时测试
+用 python -X importtime 测量冷启动导入开销，防止重量级依赖重新回到 CLI 启动路径
+
+单独运行时会打印自身耗时最多的模块:
+    python test_import_time.py
+"""
+
+import os
+import sys
+import subprocess
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 启动 main.py 时不应导入的重量级依赖，只在对应命令真正需要时导入
+HEAVY_MODULES = ['requests', 'selenium', 'webdriver_manager', 'bs4', 'apscheduler', 'numpy', 'pyarrow']
+
+# import main 的累计耗时上限（秒），拆分后实测约0.03秒，留出慢机器的余量
+MAIN_IMPORT_BUDGET = 0.3
+
+
+def measure_imports(statement: str) -> Dict[str, Tuple[int, int]]:
+    """
+    在新进程中执行导入语句并解析 -X importtime 输出
+
+    Args:
+        statement: 要执行的Python语句
+
+    Returns:
+        Dict[str, Tuple[int, int]]: 模块名到 (自身耗时, 累计耗时) 的映射，单位微秒
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def heavy_modules_imported(timings: Dict[str, Tuple[int, int]]) -> List[str]:
+    """找出被导入的重量级依赖"""
+    return [name for name in HEAVY_MODULES if name in timings]
+
+
+def test_package_import_is_lazy():
+    """测试导入 toutiao 包不加载任何子模块"""
+    timings = measure_imports('import toutiao')
+    submodules = [name for name in timings if name.startswith('toutiao.')]
+    assert submodules == [], f"导入 toutiao 时加载了: {submodules}"
+
+
+def test_main_import():
+    """测试 main.py 启动不导入重量级依赖，且累计耗时在预算内"""
+    timings = measure_imports('import main')
+    heavy = heavy_modules_imported(timings)
+    assert heavy == [], f"启动 main.py 时导入了: {heavy}"
+
+    cumulative = timings['main'][1] / 1e6
+    assert cumulative < MAIN_IMPORT_BUDGET, f"import main 耗时 {cumulative:.3f}s，超过 {MAIN_IMPORT_BUDGET}s"
+
+
+def main():
+    """运行全部测试，并打印耗时最多的模块"""
+    timings = measure_imports('import main')
+    print(f"import main 累计耗时: {timings['main'][1] / 1000:.1f} ms")
+    print("自身耗时最多的模块:")
+    for name, (self_us, _) in sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:10]:
+        print(f"  {self_us / 1000:6.1f} ms  {name}")
+    print()
+
+    tests = [
+        ("导入包不加载子模块", test_package_import_is_lazy),
+        ("main.py 启动导入", test_main_import),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控服务组件延迟创建测试
+验证只读命令不导入Selenium、不启动浏览器，无需网络和浏览器
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.monitor import ArticleMonitor
+from toutiao.database import ArticleDatabase
+
+BLOGGER_URL = "https://www.toutiao.com/c/user/token/TOKEN_LAZY/"
+
+
+def make_config(**sections) -> str:
+    """创建使用临时数据库的配置文件，sections 覆盖或补充配置节"""
+    directory = tempfile.mkdtemp()
+    config = {
+        'toutiao': {'blogger_url': BLOGGER_URL, 'check_interval_minutes': 10},
+        'feishu': {'webhook_url': 'https://open.feishu.cn/open-apis/bot/v2/hook/test', 'secret': ''},
+        'database': {'path': os.path.join(directory, 'articles.db')},
+        'logging': {'level': 'WARNING', 'file': os.path.join(directory, 'monitor.log')}
+    }
+    config.update(sections)
+    path = os.path.join(directory, 'config.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return path
+
+
+def test_status_without_browser():
+    """测试查看状态时不创建爬虫"""
+    start = time.perf_counter()
+    monitor = ArticleMonitor(make_config())
+    status = monitor.get_status()
+    elapsed = time.perf_counter() - start
+
+    assert status['blogger_id'] == monitor.blogger_id is not None
+    assert status['total_count'] == 0
+    assert monitor._crawler_pool is None and monitor._notifier is None
+    assert 'toutiao.crawler_selenium' not in sys.modules
+    assert 'selenium' not in sys.modules
+    assert elapsed < 1.0, f"查看状态耗时 {elapsed:.3f}s"
+
+
+def test_components_created_once():
+    """测试组件首次访问时创建，之后复用"""
+    monitor = ArticleMonitor(make_config())
+    assert monitor._database is None
+    assert monitor.database is monitor.database
+    assert monitor.notifier is monitor.notifier
+
+    class FakeCrawler:
+        pass
+
+    fake = FakeCrawler()
+    monitor.crawler = fake
+    assert monitor.crawler is fake
+
+
+def _dump(db_path: str) -> str:
+    """导出数据库的全部结构和数据"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return '\n'.join(conn.iterdump()) + f"\nuser_version={conn.execute('PRAGMA user_version').fetchone()[0]}"
+    finally:
+        conn.close()
+
+
+def test_status_read_only():
+    """测试查看状态不写数据库：不登记新博主、不归属历史文章，结构版本落后时报错"""
+    import main as cli
+
+    other_url = "https://www.toutiao.com/c/user/token/TOKEN_OTHER/"
+    config_path = make_config(toutiao={'bloggers': [BLOGGER_URL, other_url], 'check_interval_minutes': 10})
+    with open(config_path, 'r', encoding='utf-8') as f:
+        db_path = json.load(f)['database']['path']
+
+    # 只登记第一位博主，并留一篇没有归属的历史文章
+    database = ArticleDatabase(db_path)
+    database.upsert_blogger(BLOGGER_URL)
+    database.add_article({'article_id': '1', 'title': '历史文章', 'url': 'https://www.toutiao.com/article/1/',
+                          'publish_time': '2024-01-01 10:00'})
+    before = _dump(db_path)
+
+    assert cli.cmd_status(argparse.Namespace(config=config_path)) == 0
+    monitor = ArticleMonitor(config_path, read_only=True)
+    status = monitor.get_status()
+    assert status['blogger_count'] == 1 and status['blogger_id'] is not None
+    assert _dump(db_path) == before, "查看状态修改了数据库"
+
+    # 结构版本落后时不迁移，直接报错
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA user_version = 1')
+    conn.close()
+    try:
+        ArticleMonitor(config_path, read_only=True).database
+        assert False, "结构版本落后时应报错"
+    except RuntimeError as e:
+        assert 'db migrate' in str(e)
+    assert cli.cmd_status(argparse.Namespace(config=config_path)) == 1
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+    conn.close()
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("查看状态不启动浏览器", test_status_without_browser),
+        ("组件延迟创建", test_components_created_once),
+        ("查看状态只读数据库", test_status_read_only),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
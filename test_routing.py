@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知路由测试
+验证多模式匹配自动机、规则匹配语义、命中计数和规则热加载
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.routing import AhoCorasick, NotificationRouter
+
+ARTICLE = {
+    'title': 'WTT美国大满贯9日战报：混双8强出炉！国乒6战全胜',
+    'summary': '北京时间7月9日上午，乒乓球WTT美国大满贯继续进行。',
+    'author': '纯侃体育',
+    'read_count': 59000
+}
+
+RULES = [
+    {'name': '乒乓球', 'keywords': ['国乒', '乒乓球'], 'webhook_url': 'https://hook/pingpong'},
+    {'name': '足球', 'keywords': ['足球', '世界杯'], 'webhook_url': 'https://hook/football'},
+    {'name': '大满贯正则', 'regex': [r'wtt.*大满贯'], 'webhook_url': 'https://hook/wtt'},
+    {'name': '作者', 'authors': ['纯侃体育'], 'webhook_url': 'https://hook/pingpong'},
+    {'name': '十万阅读', 'min_reads': 100000, 'webhook_url': 'https://hook/hot'},
+]
+
+
+def test_aho_corasick():
+    """测试自动机匹配重叠和嵌套的关键词"""
+    automaton = AhoCorasick([('he', 1), ('she', 2), ('his', 3), ('hers', 4)])
+    assert sorted(automaton.iter_matches('ushers')) == [1, 2, 4]
+    assert list(AhoCorasick([]).iter_matches('任意文本')) == []
+
+
+def test_route_rules():
+    """测试关键词、正则、作者和阅读数条件"""
+    matches = []
+    router = NotificationRouter(rules=[dict(rule) for rule in RULES], on_match=matches.append)
+    targets = router.route(ARTICLE)
+    # 作者规则与乒乓球规则指向同一webhook，只发送一次；阅读数不足的规则不命中
+    assert [rule['name'] for rule in targets] == ['乒乓球', '大满贯正则']
+
+    stats = router.get_stats()
+    assert stats == {'乒乓球': 1, '足球': 0, '大满贯正则': 1, '作者': 1, '十万阅读': 0}
+
+    # 重试、补发时再次路由不计入命中次数
+    assert router.route(ARTICLE, count=False) == targets
+    assert router.get_stats() == stats
+    # 计数时把全部命中的规则（包括目标重复的）交给 on_match 持久化
+    assert matches == [['乒乓球', '大满贯正则', '作者']]
+
+    # 摘要为NULL时不会当作文本 "None" 匹配
+    router = NotificationRouter(rules=[{'name': 'none', 'keywords': ['none'], 'webhook_url': 'https://hook/none'}])
+    assert router.route({'title': '没有摘要', 'summary': None}) == []
+
+
+def test_hot_reload():
+    """测试规则文件修改后自动重载"""
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'rules': [RULES[1]]}, f, ensure_ascii=False)
+
+    router = NotificationRouter(rules_file=path, reload_interval=0)
+    assert router.route(ARTICLE) == []
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([RULES[0]], f, ensure_ascii=False)
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert [rule['name'] for rule in router.route(ARTICLE)] == ['乒乓球']
+
+    # 规则文件损坏时保留原有规则
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{broken')
+    os.utime(path, (time.time() + 20, time.time() + 20))
+    assert [rule['name'] for rule in router.route(ARTICLE)] == ['乒乓球']
+
+
+def test_many_rules():
+    """测试数千条规则的匹配耗时"""
+    rules = [{'name': f'rule_{i}', 'keywords': [f'关键词{i}'], 'webhook_url': f'https://hook/{i}'}
+             for i in range(5000)]
+    rules.append({'name': 'hit', 'keywords': ['国乒'], 'webhook_url': 'https://hook/hit'})
+    router = NotificationRouter(rules=rules)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        targets = router.route(ARTICLE)
+    elapsed = time.perf_counter() - start
+    assert [rule['name'] for rule in targets] == ['hit']
+    assert elapsed < 1.0, f"1000次匹配耗时 {elapsed:.3f}s"
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("多模式匹配自动机", test_aho_corasick),
+        ("规则匹配", test_route_rules),
+        ("规则热加载", test_hot_reload),
+        ("大量规则", test_many_rules),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
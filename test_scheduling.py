@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检查调度测试
+验证周期耗时统计、超时策略、负载告警，以及调度器在检查超时时不重叠执行，使用模拟爬虫，无需浏览器和网络
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from toutiao.feishu_stub import FeishuWebhookStub
+from toutiao.monitor import ArticleMonitor
+from toutiao.scheduling import CycleTracker
+from test_crawler_pool import FakeCrawler, blogger_url
+from test_database import make_article
+from test_lazy_components import make_config
+
+
+def test_overrun_policies():
+    """测试三种超时策略计算的下一轮时间"""
+    for policy in ('skip', 'coalesce', 'shorten'):
+        tracker = CycleTracker(300, policy=policy, min_gap=60)
+        assert not tracker.record(120) and tracker.next_delay(120) is None
+        assert tracker.record(420)
+
+    assert CycleTracker(300, policy='skip').next_delay(420) is None
+    assert CycleTracker(300, policy='coalesce').next_delay(420) == 0
+    assert CycleTracker(300, policy='coalesce').next_delay(120) is None
+
+    # 超时120秒：间隔 min_gap 补做，落后 180 秒，之后三轮间隔各缩短 60 秒（240秒）
+    tracker = CycleTracker(300, policy='shorten', min_gap=60, payback_cycles=3)
+    starts, now = [0.0], 0.0
+    for duration in (420, 100, 100, 100, 100):
+        delay = tracker.next_delay(duration)
+        now += duration + (delay if delay is not None else 300 - duration)
+        starts.append(now)
+    assert starts == [0, 480, 720, 960, 1200, 1500]
+    assert tracker.get_stats()['lag_seconds'] == 0 and tracker.next_delay(100) is None
+    # 每轮间隔不少于 min_gap，追回需要更多轮
+    tracker = CycleTracker(300, policy='shorten', min_gap=200, payback_cycles=1)
+    assert tracker.next_delay(500) == 200 and tracker.next_delay(50) == 150
+    assert tracker.get_stats()['lag_seconds'] == 300
+
+    try:
+        CycleTracker(300, policy='queue')
+        assert False, "未知策略应报错"
+    except ValueError:
+        pass
+
+    tracker = CycleTracker.from_config(300, {'overrun_policy': 'shorten', 'alert_cooldown_minutes': 5,
+                                             'shorten_cycles': 4})
+    assert tracker.policy == 'shorten' and tracker.alert_cooldown == 300 and tracker.payback_cycles == 4
+
+
+def test_load_alert():
+    """测试平均耗时接近检查间隔时告警，告警有冷却时间"""
+    tracker = CycleTracker(100, alert_ratio=0.8, window=4, alert_cooldown=60)
+    for duration in (90, 85):
+        tracker.record(duration)
+    assert not tracker.should_alert(now=0), "样本不足时不告警"
+
+    tracker.record(40)
+    assert not tracker.should_alert(now=0), "平均 72 秒未达到阈值"
+
+    tracker.record(110)
+    assert tracker.should_alert(now=0)
+    assert not tracker.should_alert(now=30), "冷却时间内不重复告警"
+    assert tracker.should_alert(now=61)
+
+    tracker.record_missed()
+    stats = tracker.get_stats()
+    assert stats['cycles'] == 4 and stats['overruns'] == 1 and stats['missed'] == 1
+    assert stats['max_seconds'] == 110 and stats['last_seconds'] == 110
+    assert abs(stats['avg_seconds'] - 81.25) < 1e-9 and abs(stats['load'] - 0.8125) < 1e-9
+
+
+def make_monitor(stub, interval_seconds, delay, **schedule):
+    """创建检查间隔为 interval_seconds、每轮抓取耗时约 delay 秒的监控服务"""
+    config_path = make_config(
+        toutiao={'blogger_url': blogger_url('S1'), 'check_interval_minutes': interval_seconds / 60},
+        feishu={'webhook_url': stub.url, 'secret': ''},
+        schedule=schedule
+    )
+    monitor = ArticleMonitor(config_path)
+    articles = {'S1': [make_article('S1-0', title='调度测试文章')]}
+    monitor._create_crawler = lambda: FakeCrawler(articles, delays={'S1': delay})
+    return monitor
+
+
+def start_scheduler(monitor: ArticleMonitor, interval_seconds: float) -> BackgroundScheduler:
+    """按 start_monitoring 的方式注册检查任务和事件监听，启动后台调度器"""
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(monitor._run_scheduled_cycle, IntervalTrigger(seconds=interval_seconds), id='article_check',
+                      max_instances=1, coalesce=True, misfire_grace_time=1, next_run_time=datetime.now())
+    scheduler.add_listener(monitor._on_check_missed, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+    scheduler.add_listener(monitor._on_check_executed, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+    monitor._scheduler = scheduler
+    scheduler.start()
+    return scheduler
+
+
+def record_cycles(monitor: ArticleMonitor) -> list:
+    """记录每轮检查的开始和结束时间"""
+    cycles = []
+    run_check_cycle = monitor.run_check_cycle
+
+    def run():
+        start = time.monotonic()
+        try:
+            return run_check_cycle()
+        finally:
+            cycles.append((start, time.monotonic()))
+
+    monitor.run_check_cycle = run
+    return cycles
+
+
+def test_overrun_reschedule_and_alert():
+    """测试调度器中检查超时后按 coalesce 策略立即补做下一轮，错过的检查不重复计数，记录耗时并发出告警"""
+    with FeishuWebhookStub() as stub:
+        monitor = make_monitor(stub, 0.5, 0.7, overrun_policy='coalesce', alert_window=3,
+                               alert_cooldown_minutes=0, alert_notify=True)
+        cycles = record_cycles(monitor)
+        scheduler = start_scheduler(monitor, 0.5)
+        try:
+            time.sleep(1.8)
+        finally:
+            scheduler.shutdown(wait=True)
+
+        # 按原有节奏下一轮要等到下一个整点间隔（结束后0.3秒），coalesce 在上一轮结束后立即开始
+        assert len(cycles) >= 3
+        for (_, end), (start, _) in zip(cycles, cycles[1:]):
+            assert start - end < 0.15, f"上一轮结束 {start - end:.2f} 秒后才开始补做"
+
+        stats = monitor.cycle_tracker.get_stats()
+        assert stats['cycles'] == len(cycles) and stats['overruns'] == len(cycles) and stats['load'] > 1
+        # 每轮只错过运行期间的一个整点间隔，调整下一轮时间本身不算错过
+        assert 1 <= stats['missed'] <= len(cycles)
+
+        # 第三轮时样本足够，告警发到飞书（另有一条文章通知）
+        alerts = [message for message in stub.messages() if '检查耗时接近检查间隔' in message['content']['text']]
+        assert len(alerts) == 1
+
+        monitor.database.flush()
+        recorded = monitor.database.get_check_cycle_stats()
+        assert recorded['count'] == len(cycles) and recorded['overruns'] == len(cycles)
+        assert recorded['avg_ms'] >= 700 and recorded['last_ms'] >= 700
+        assert abs(recorded['interval_seconds'] - 0.5) < 1e-9
+        assert monitor.get_status()['check_cycles']['count'] == len(cycles)
+
+
+def test_no_overlapping_cycles():
+    """测试检查耗时超过间隔时调度器不重叠执行，错过的检查被计数"""
+    with FeishuWebhookStub() as stub:
+        monitor = make_monitor(stub, 0.5, 1.2)
+        FakeCrawler.max_active = 0
+
+        scheduler = start_scheduler(monitor, 0.5)
+        try:
+            time.sleep(2.0)
+        finally:
+            scheduler.shutdown(wait=True)
+
+        stats = monitor.cycle_tracker.get_stats()
+        assert FakeCrawler.max_active == 1, "同一时间只应运行一轮检查"
+        assert stats['cycles'] >= 1 and stats['overruns'] == stats['cycles']
+        assert stats['missed'] >= 1
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("超时策略", test_overrun_policies),
+        ("负载告警", test_load_alert),
+        ("超时后调整下一轮", test_overrun_reschedule_and_alert),
+        ("检查不重叠执行", test_no_overlapping_cycles),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热门文章检测测试
+使用临时数据库验证阅读速度和加速度的计算
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from toutiao.trending import TrendingDetector
+from test_database import make_article, make_database
+
+NOW = 1_700_000_000
+
+
+def build_database():
+    """构造两篇文章：一篇加速上涨，一篇增长缓慢"""
+    db = make_database()
+    db.add_article(make_article('6001', title='快速上涨的文章'))
+    db.add_article(make_article('6002', title='增长缓慢的文章'))
+
+    # 6001: 每小时增长 1000 -> 3000，速度 3000/小时，加速度 2000/小时²
+    for hours_ago, reads in [(2, 1000), (1, 2000), (0, 5000)]:
+        db.record_article_stats([make_article('6001', read_count=reads)], ts=NOW - hours_ago * 3600)
+    for hours_ago, reads in [(2, 100), (1, 150), (0, 200)]:
+        db.record_article_stats([make_article('6002', read_count=reads)], ts=NOW - hours_ago * 3600)
+    return db
+
+
+def test_velocity_and_acceleration():
+    """测试速度与加速度"""
+    detector = TrendingDetector(build_database(), velocity_threshold=1000)
+    trending = detector.detect(now=NOW)
+    assert [a['article_id'] for a in trending] == ['6001']
+    assert trending[0]['velocity'] == 3000
+    assert trending[0]['acceleration'] == 2000
+    assert trending[0]['read_count'] == 5000
+
+
+def test_only_new_skips_alerted():
+    """测试已提醒的文章不再重复提醒"""
+    db = build_database()
+    detector = TrendingDetector(db, velocity_threshold=10)
+    assert len(detector.detect(now=NOW)) == 2
+    db.mark_trending_alerted(['6001'])
+    assert [a['article_id'] for a in detector.detect(only_new=True, now=NOW)] == ['6002']
+
+
+def test_empty_database():
+    """测试没有快照时返回空结果"""
+    detector = TrendingDetector(make_database())
+    assert detector.detect(now=NOW) == []
+
+
+def main():
+    """运行全部测试"""
+    tests = [
+        ("速度与加速度", test_velocity_and_acceleration),
+        ("已提醒文章过滤", test_only_new_skips_alerted),
+        ("空数据库", test_empty_database),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test_name}: {e}")
+
+    print(f"\n测试结果: {passed}/{len(tests)} 通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
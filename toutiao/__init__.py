@@ -16,18 +16,14 @@
     monitor.start_monitoring()
 """
 
-from .monitor import ArticleMonitor
-from .database import ArticleDatabase
-from .feishu_notifier import FeishuNotifier
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-# 优先使用优化后的Selenium爬虫
-try:
+if TYPE_CHECKING:
+    from .monitor import ArticleMonitor
+    from .database import ArticleDatabase
+    from .feishu_notifier import FeishuNotifier
     from .crawler_selenium import ToutiaoSeleniumCrawler as ToutiaoCrawler
-except ImportError:
-    try:
-        from .crawler_new import ToutiaoCrawler
-    except ImportError:
-        from .crawler import ToutiaoCrawler
 
 __version__ = "2.0.0"
 __author__ = "JokerTools"
@@ -37,4 +33,47 @@ __all__ = [
     'ToutiaoCrawler',
     'ArticleDatabase',
     'FeishuNotifier'
-]
\ No newline at end of file
+]
+
+# 公开名称到 (子模块, 属性名) 的映射，首次访问时才导入对应子模块
+_LAZY_ATTRIBUTES = {
+    'ArticleMonitor': ('.monitor', 'ArticleMonitor'),
+    'ArticleDatabase': ('.database', 'ArticleDatabase'),
+    'FeishuNotifier': ('.feishu_notifier', 'FeishuNotifier'),
+}
+
+
+def _import_crawler():
+    """导入爬虫，优先使用优化后的Selenium爬虫"""
+    try:
+        from .crawler_selenium import ToutiaoSeleniumCrawler as ToutiaoCrawler
+    except ImportError:
+        try:
+            from .crawler_new import ToutiaoCrawler
+        except ImportError:
+            from .crawler import ToutiaoCrawler
+    return ToutiaoCrawler
+
+
+def __getattr__(name):
+    """
+    按需导入公开类（PEP 562）
+
+    导入 toutiao 包本身不再加载监控服务、Selenium、requests 等依赖，
+    只有访问对应名称时才导入，CLI 的每条命令只付出自己需要的导入开销。
+    """
+    if name == 'ToutiaoCrawler':
+        value = _import_crawler()
+    elif name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(import_module(module_name, __name__), attribute)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # 缓存到模块命名空间，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,163 @@
+"""
+数据库在线备份模块
+使用SQLite备份API分页复制数据库，页与页之间主动让出，监控服务运行期间也可以安全备份
+"""
+
+import os
+import glob
+import gzip
+import time
+import shutil
+import sqlite3
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+
+class DatabaseBackup:
+    """数据库在线备份"""
+
+    def __init__(self, db_path: str, backup_dir: str = 'backups', compress: bool = True,
+                 keep: int = 7, pages_per_step: int = 256, step_sleep: float = 0.05):
+        """
+        初始化备份
+
+        Args:
+            db_path: 数据库文件路径
+            backup_dir: 备份目录
+            compress: 是否gzip压缩备份文件
+            keep: 保留最近多少个备份，0表示不清理
+            pages_per_step: 每一步复制的页数，每一步只短暂持有读锁
+            step_sleep: 每一步之后休眠的秒数，给写线程让出时间
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.compress = compress
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Dict) -> 'DatabaseBackup':
+        """
+        根据配置创建备份
+
+        Args:
+            db_path: 数据库文件路径
+            config: backup 配置节
+
+        Returns:
+            DatabaseBackup: 备份
+        """
+        return cls(
+            db_path,
+            backup_dir=config.get('dir', 'backups'),
+            compress=config.get('compress', True),
+            keep=config.get('keep', 7),
+            pages_per_step=config.get('pages_per_step', 256),
+            step_sleep=config.get('step_sleep_seconds', 0.05)
+        )
+
+    @property
+    def _prefix(self) -> str:
+        """备份文件名前缀，取数据库文件名"""
+        return os.path.splitext(os.path.basename(self.db_path))[0]
+
+    def list_backups(self) -> List[str]:
+        """
+        列出已有备份，按时间从旧到新
+
+        Returns:
+            List[str]: 备份文件路径
+        """
+        pattern = os.path.join(self.backup_dir, f'{self._prefix}-*.db*')
+        return sorted(path for path in glob.glob(pattern)
+                      if path.endswith('.db') or path.endswith('.db.gz'))
+
+    def _copy(self, target_path: str) -> int:
+        """
+        用备份API把数据库复制到目标文件
+
+        Returns:
+            int: 执行的步数
+        """
+        steps = 0
+
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+            if remaining and self.step_sleep:
+                time.sleep(self.step_sleep)
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=self.pages_per_step, progress=progress)
+            # 备份副本完整性自检，损坏的备份比没有备份更危险
+            result = target.execute('PRAGMA quick_check').fetchone()[0]
+            if result != 'ok':
+                raise sqlite3.DatabaseError(f"备份文件校验失败: {result}")
+        finally:
+            target.close()
+            source.close()
+        return steps
+
+    def rotate(self) -> List[str]:
+        """
+        删除超出保留数量的旧备份
+
+        Returns:
+            List[str]: 被删除的备份文件路径
+        """
+        if not self.keep:
+            return []
+
+        removed = self.list_backups()[:-self.keep]
+        for path in removed:
+            os.remove(path)
+            logging.info(f"删除旧备份: {path}")
+        return removed
+
+    def run(self) -> Dict:
+        """
+        执行一次备份
+
+        Returns:
+            Dict: path、size、elapsed、steps、removed；失败时返回空字典
+        """
+        start = time.monotonic()
+        os.makedirs(self.backup_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        db_backup_path = os.path.join(self.backup_dir, f'{self._prefix}-{timestamp}.db')
+        # 写入临时文件，完成后再改名，不完整的文件不会被当成备份
+        partial_path = db_backup_path + '.partial'
+
+        try:
+            steps = self._copy(partial_path)
+
+            if self.compress:
+                backup_path = db_backup_path + '.gz'
+                with open(partial_path, 'rb') as src, gzip.open(backup_path + '.partial', 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.remove(partial_path)
+                os.replace(backup_path + '.partial', backup_path)
+            else:
+                backup_path = db_backup_path
+                os.replace(partial_path, backup_path)
+
+            report = {
+                'path': backup_path,
+                'size': os.path.getsize(backup_path),
+                'elapsed': time.monotonic() - start,
+                'steps': steps,
+                'removed': self.rotate()
+            }
+            logging.info(f"数据库备份完成: {backup_path}，{report['size'] / 1024:.1f} KB，"
+                         f"{report['steps']} 步，耗时 {report['elapsed']:.2f} 秒")
+            return report
+        except Exception as e:
+            logging.error(f"数据库备份失败: {e}")
+            for path in (partial_path, db_backup_path + '.gz.partial'):
+                if os.path.exists(path):
+                    os.remove(path)
+            return {}
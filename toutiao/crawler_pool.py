@@ -0,0 +1,178 @@
+"""
+爬虫池模块
+管理有限数量的浏览器实例，多个博主并发抓取时每个线程独占一个浏览器，浏览器失效时丢弃并按需重建
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+# 表示 WebDriver 已失效、需要重建浏览器的异常信息
+DRIVER_ERRORS = ('no such window', 'web view not found', 'invalid session id', 'chrome not reachable')
+
+
+def is_driver_error(error: Exception) -> bool:
+    """判断异常是否表示浏览器已失效"""
+    message = str(error)
+    return any(keyword in message for keyword in DRIVER_ERRORS)
+
+
+class CrawlerPool:
+    """爬虫池（线程安全）"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1, crawlers: List[Any] = None):
+        """
+        初始化爬虫池
+
+        Args:
+            factory: 创建爬虫（启动浏览器）的函数，首次借用时才调用
+            size: 最多同时存在的爬虫数，即并发抓取的上限
+            crawlers: 已创建的爬虫（可选），计入 size
+        """
+        self.factory = factory
+        self.size = max(1, size, len(crawlers or []))
+
+        self._crawlers: List[Any] = list(crawlers or [])
+        self._idle: List[Any] = list(self._crawlers)
+        self._creating = 0
+        self._condition = threading.Condition()
+        self._leases = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._replaced = 0
+
+    def first(self) -> Any:
+        """
+        返回一个已创建的爬虫（没有时创建一个），不借出
+
+        用于启动前的连通性测试等单线程场景，并发抓取应使用 lease()。
+        """
+        with self._condition:
+            if self._crawlers:
+                return self._crawlers[0]
+        crawler = self.acquire()
+        self.release(crawler)
+        return crawler
+
+    def acquire(self, timeout: float = None) -> Any:
+        """
+        借出一个爬虫，没有空闲且已达上限时等待归还
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+
+        Returns:
+            爬虫实例
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        start = time.monotonic()
+        with self._condition:
+            while not self._idle and len(self._crawlers) + self._creating >= self.size:
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"等待空闲浏览器超时（{timeout} 秒）")
+                self._condition.wait(remaining)
+
+            waited = time.monotonic() - start
+            self._leases += 1
+            if waited > 0.001:
+                self._waited += 1
+                self._total_wait += waited
+
+            if self._idle:
+                return self._idle.pop()
+            self._creating += 1
+
+        # 启动浏览器较慢，在锁外进行，不阻塞其他线程归还和借用
+        try:
+            crawler = self.factory()
+        except Exception:
+            with self._condition:
+                self._creating -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._creating -= 1
+            self._crawlers.append(crawler)
+        return crawler
+
+    def release(self, crawler: Any, broken: bool = False):
+        """
+        归还爬虫
+
+        Args:
+            crawler: acquire 借出的爬虫
+            broken: 浏览器已失效，关闭并丢弃，下次借用时重建
+        """
+        if broken:
+            with self._condition:
+                if crawler in self._crawlers:
+                    self._crawlers.remove(crawler)
+                self._replaced += 1
+                self._condition.notify()
+            self._close_crawler(crawler)
+            logging.warning("浏览器已失效，已丢弃，下次抓取时重新创建")
+            return
+
+        with self._condition:
+            self._idle.append(crawler)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = None) -> Iterator[Any]:
+        """
+        借用爬虫的上下文，退出时归还；抛出浏览器失效的异常时丢弃该爬虫
+
+        Args:
+            timeout: 最长等待秒数
+        """
+        crawler = self.acquire(timeout)
+        broken = False
+        try:
+            yield crawler
+        except Exception as e:
+            broken = is_driver_error(e)
+            raise
+        finally:
+            self.release(crawler, broken=broken)
+
+    @staticmethod
+    def _close_crawler(crawler: Any):
+        """关闭爬虫的浏览器，忽略关闭时的异常"""
+        close = getattr(crawler, 'close', None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logging.debug(f"关闭浏览器失败: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        获取爬虫池统计
+
+        Returns:
+            Dict: size、created（已创建的浏览器数）、idle、leases（借用次数）、
+                  waited（需要等待空闲浏览器的次数）、avg_wait_ms、replaced（因失效重建的次数）
+        """
+        with self._condition:
+            return {
+                'size': self.size,
+                'created': len(self._crawlers),
+                'idle': len(self._idle),
+                'leases': self._leases,
+                'waited': self._waited,
+                'avg_wait_ms': self._total_wait / self._waited * 1000 if self._waited else 0.0,
+                'replaced': self._replaced
+            }
+
+    def close(self):
+        """关闭所有浏览器"""
+        with self._condition:
+            crawlers, self._crawlers, self._idle = self._crawlers, [], []
+        for crawler in crawlers:
+            self._close_crawler(crawler)
@@ -107,21 +107,33 @@ class ToutiaoSeleniumCrawler:
             except:
                 pass
     
-    def _ensure_driver_alive(self):
-        """确保WebDriver处于活跃状态"""
+    def is_alive(self) -> bool:
+        """
+        检查浏览器是否仍可用（不重建）
+
+        Returns:
+            bool: WebDriver 能正常响应返回True
+        """
+        if self.driver is None:
+            return False
         try:
             # 尝试获取当前窗口句柄来检测driver是否还活着
             self.driver.current_window_handle
             return True
         except Exception as e:
             logging.warning(f"WebDriver已失效: {e}")
+            return False
+
+    def _ensure_driver_alive(self):
+        """确保WebDriver处于活跃状态"""
+        if not self.is_alive():
             try:
                 self.driver.quit()
             except:
                 pass
             self.driver = None
             self.setup_driver()
-            return True
+        return True
 
     def get_articles_from_url(self, blogger_url: str, max_count: int = 10) -> List[Dict]:
         """
@@ -173,8 +185,11 @@ class ToutiaoSeleniumCrawler:
             # 获取页面源码
             html_content = self.driver.page_source
 
-            # 解析文章列表
+            # 解析文章列表，记下发现时间用于统计从发现到通知送达的延迟
             articles = self._parse_articles_from_html(html_content, max_count)
+            discovered_at = time.time()
+            for article in articles:
+                article['discovered_at'] = discovered_at
             logging.info(f"成功从URL获取 {len(articles)} 篇文章")
             return articles
                 
@@ -3,157 +3,1396 @@
 用于存储和管理已监控的文章信息
 """
 
+import os
+import re
+import json
+import time
 import sqlite3
+import hashlib
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Iterator, Callable
+
+from . import migrations
+from . import simhash
+from .db_writer import DatabaseWriter
+
+# IN (...) 列表每块的参数个数，避免超过SQLite的参数个数上限
+IN_CHUNK_SIZE = 500
+
+
+def chunked(items: List, size: int = IN_CHUNK_SIZE) -> Iterator[List]:
+    """把列表按 size 分块"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def extract_blogger_token(blogger_url: str) -> str:
+    """
+    从博主URL中提取用户token
+
+    Args:
+        blogger_url: 博主主页URL，形如 https://www.toutiao.com/c/user/token/<token>/
+
+    Returns:
+        str: 用户token；无法识别时返回URL的摘要，保证同一URL得到同一标识
+    """
+    match = re.search(r'/c/user/token/([^/?#]+)', blogger_url)
+    if match:
+        return match.group(1)
+    normalized = blogger_url.split('?')[0].rstrip('/')
+    return 'url_' + hashlib.md5(normalized.encode('utf-8')).hexdigest()[:16]
 
 
 class ArticleDatabase:
     """文章数据库管理类"""
+
+    # 近似重复判定：SimHash汉明距离上限（需小于指纹分段数），以及只与最近多少天的文章比较
+    DUPLICATE_MAX_DISTANCE = 5
+    DUPLICATE_WINDOW_DAYS = 7
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, async_writes: bool = False, writer_options: Dict = None,
+                 read_only: bool = False):
+        """
+        初始化数据库连接
+        
+        Args:
+            db_path: 数据库文件路径
+            async_writes: 是否启用后台单写线程，所有写操作由该线程分组提交
+            writer_options: 写线程参数（max_queue_size、max_batch_size、max_batch_delay）
+            read_only: 只读打开，不执行迁移，只检查结构版本（供 status、search、export 等查询命令使用）
+        """
+        self.db_path = db_path
+        if read_only:
+            self.check_schema()
+        else:
+            self.init_database()
+
+        self.writer = None
+        if async_writes:
+            self.writer = DatabaseWriter(db_path, **(writer_options or {}))
+
+    def _execute_write(self, operation: Callable, *args):
+        """
+        同步执行写操作
+
+        启用写线程时交给写线程执行并等待事务提交，否则在新连接上直接执行并提交。
+
+        Args:
+            operation: 写操作函数，第一个参数为数据库连接
+            *args: 传给写操作的其余参数
+
+        Returns:
+            写操作的返回值
+        """
+        if self.writer:
+            return self.writer.submit(operation, *args).result()
+
+        with sqlite3.connect(self.db_path) as conn:
+            return operation(conn, *args)
+
+    def _submit_write(self, operation: Callable, *args) -> Future:
+        """
+        异步提交写操作
+
+        启用写线程时立即返回，否则同步执行后返回已完成的Future。
+
+        Args:
+            operation: 写操作函数，第一个参数为数据库连接
+            *args: 传给写操作的其余参数
+
+        Returns:
+            Future: 事务提交后完成，结果为写操作的返回值
+        """
+        if self.writer:
+            return self.writer.submit(operation, *args)
+
+        future = Future()
+        try:
+            future.set_result(self._execute_write(operation, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        等待已提交的写操作全部落盘
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 全部落盘返回True
+        """
+        if self.writer:
+            return self.writer.flush(timeout)
+        return True
+
+    def close(self):
+        """关闭数据库，写完所有排队中的写操作"""
+        if self.writer:
+            self.writer.close()
+    
+    def init_database(self):
+        """初始化数据库表结构，按版本号执行尚未完成的迁移"""
+        try:
+            applied = migrations.migrate(self.db_path)
+            if applied:
+                logging.info(f"数据库初始化完成，执行迁移: {applied}")
+        except Exception as e:
+            logging.error(f"数据库初始化失败: {e}")
+            raise
+
+    def check_schema(self):
+        """
+        检查数据库已存在且结构是最新版本，只读取 user_version，不执行迁移
+
+        Raises:
+            RuntimeError: 数据库不存在或结构版本落后
+        """
+        if not os.path.exists(self.db_path):
+            raise RuntimeError(f"数据库不存在: {self.db_path}，请先运行 python main.py db migrate")
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            version = migrations.get_schema_version(conn)
+        finally:
+            conn.close()
+        if version < migrations.LATEST_VERSION:
+            raise RuntimeError(f"数据库结构版本 {version} 落后于 {migrations.LATEST_VERSION}，"
+                               f"请先运行 python main.py db migrate")
+
+    def upsert_blogger(self, url: str, name: str = None) -> Optional[int]:
+        """
+        登记博主（已存在时更新URL和名称）
+
+        Args:
+            url: 博主主页URL
+            name: 博主名称（可选）
+
+        Returns:
+            Optional[int]: 博主ID，失败返回None
+        """
+        try:
+            return self._execute_write(self._upsert_blogger, url, name)
+        except Exception as e:
+            logging.error(f"登记博主失败: {e}")
+            return None
+
+    @staticmethod
+    def _upsert_blogger(conn: sqlite3.Connection, url: str, name: Optional[str]) -> int:
+        """登记博主的写操作"""
+        token = extract_blogger_token(url)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO bloggers (token, name, url, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(token) DO UPDATE SET
+                url = excluded.url,
+                name = COALESCE(excluded.name, bloggers.name)
+        ''', (token, name, url, datetime.now().isoformat()))
+        cursor.execute('SELECT id FROM bloggers WHERE token = ?', (token,))
+        return cursor.fetchone()[0]
+
+    def get_bloggers(self) -> List[Dict]:
+        """
+        获取所有已登记的博主
+
+        Returns:
+            List[Dict]: 博主列表
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, token, name, url, last_fingerprint, last_crawl_time,
+                           crawl_count, fail_count, article_count
+                    FROM bloggers
+                    ORDER BY id
+                ''')
+
+                columns = ['id', 'token', 'name', 'url', 'last_fingerprint', 'last_crawl_time',
+                           'crawl_count', 'fail_count', 'article_count']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"获取博主列表失败: {e}")
+            return []
+
+    def get_blogger(self, blogger_id: int) -> Optional[Dict]:
+        """
+        获取单个博主信息
+
+        Args:
+            blogger_id: 博主ID
+
+        Returns:
+            Optional[Dict]: 博主信息，不存在返回None
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, token, name, url, last_fingerprint, last_crawl_time,
+                           crawl_count, fail_count, article_count
+                    FROM bloggers
+                    WHERE id = ?
+                ''', (blogger_id,))
+
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                columns = ['id', 'token', 'name', 'url', 'last_fingerprint', 'last_crawl_time',
+                           'crawl_count', 'fail_count', 'article_count']
+                return dict(zip(columns, row))
+        except Exception as e:
+            logging.error(f"获取博主信息失败: {e}")
+            return None
+
+    def record_blogger_crawl(self, blogger_id: int, fingerprint: Optional[str],
+                             new_article_count: int = 0, success: bool = True) -> bool:
+        """
+        记录一次博主抓取结果
+
+        Args:
+            blogger_id: 博主ID
+            fingerprint: 本次列表页的文章指纹（失败时为None，保留上次指纹）
+            new_article_count: 本次新增文章数
+            success: 抓取是否成功
+
+        Returns:
+            bool: 记录成功返回True
+        """
+        try:
+            return self.record_blogger_crawl_async(blogger_id, fingerprint, new_article_count, success).result()
+        except Exception as e:
+            logging.error(f"记录博主抓取结果失败: {e}")
+            return False
+
+    def record_blogger_crawl_async(self, blogger_id: int, fingerprint: Optional[str],
+                                   new_article_count: int = 0, success: bool = True) -> Future:
+        """
+        提交记录博主抓取结果的写操作，不等待落盘
+
+        Returns:
+            Future: 结果为是否记录成功
+        """
+        return self._submit_write(
+            self._record_blogger_crawl, blogger_id, fingerprint, new_article_count, success,
+            datetime.now().isoformat()
+        )
+
+    @staticmethod
+    def _record_blogger_crawl(conn: sqlite3.Connection, blogger_id: int, fingerprint: Optional[str],
+                              new_article_count: int, success: bool, crawl_time: str) -> bool:
+        """记录博主抓取结果的写操作"""
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE bloggers SET
+                last_fingerprint = COALESCE(?, last_fingerprint),
+                last_crawl_time = ?,
+                crawl_count = crawl_count + 1,
+                fail_count = fail_count + ?,
+                article_count = article_count + ?
+            WHERE id = ?
+        ''', (
+            fingerprint,
+            crawl_time,
+            0 if success else 1,
+            new_article_count,
+            blogger_id
+        ))
+        return cursor.rowcount > 0
+
+    @classmethod
+    def _index_simhash(cls, conn: sqlite3.Connection, row_id: int, article_data: Dict,
+                       fingerprint: int, created_at: str):
+        """
+        写入文章指纹并查找近似重复的已有文章
+
+        只在与新指纹至少有一段完全相同的桶里找候选，再精确计算汉明距离，查询代价与文章总数无关。
+        """
+        bands = simhash.split_bands(fingerprint)
+        window_start = (datetime.fromisoformat(created_at) - timedelta(days=cls.DUPLICATE_WINDOW_DAYS)).isoformat()
+
+        conditions = ' OR '.join('(b.band = ? AND b.value = ?)' for _ in bands)
+        params = [value for band, band_value in enumerate(bands) for value in (band, band_value)]
+        candidates = conn.execute(f'''
+            SELECT DISTINCT a.id, a.article_id, a.simhash, a.duplicate_of, a.notified
+            FROM article_simhash_bands b JOIN articles a ON a.id = b.article_id
+            WHERE ({conditions}) AND a.created_at >= ?
+        ''', params + [window_start]).fetchall()
+
+        best = None
+        for candidate_id, candidate_article_id, candidate_hash, duplicate_of, notified in candidates:
+            distance = simhash.hamming_distance(fingerprint, simhash.to_unsigned(candidate_hash))
+            if distance <= cls.DUPLICATE_MAX_DISTANCE and (best is None or distance < best[0]):
+                best = (distance, candidate_id, candidate_article_id, duplicate_of, notified)
+
+        canonical_id = None
+        if best is not None:
+            _, candidate_id, candidate_article_id, duplicate_of, notified = best
+            canonical_id = duplicate_of or candidate_id
+            if duplicate_of:
+                candidate_article_id, notified = conn.execute(
+                    'SELECT article_id, notified FROM articles WHERE id = ?', (canonical_id,)
+                ).fetchone()
+            article_data['duplicate_of'] = candidate_article_id
+            article_data['duplicate_notified'] = bool(notified)
+            logging.info(f"发现近似重复文章: {article_data['title']} -> {candidate_article_id}（汉明距离 {best[0]}）")
+
+        conn.execute(
+            'UPDATE articles SET simhash = ?, duplicate_of = ? WHERE id = ?',
+            (simhash.to_signed(fingerprint), canonical_id, row_id)
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO article_simhash_bands (band, value, article_id) VALUES (?, ?, ?)',
+            [(band, band_value, row_id) for band, band_value in enumerate(bands)]
+        )
+        return canonical_id
+
+    @staticmethod
+    def _enqueue_notification(conn: sqlite3.Connection, row_id: int, article_data: Dict,
+                              canonical_id: Optional[int], created_at: str):
+        """
+        在文章入库的事务中写入通知发件箱
+
+        转载的首发文章已通知时直接标记为已通知；首发文章还在发件箱中等待时不单独排队，
+        投递首发文章时会把它作为其他来源一起列出。
+        """
+        if canonical_id is not None:
+            if article_data.get('duplicate_notified'):
+                conn.execute('UPDATE articles SET notified = TRUE WHERE id = ?', (row_id,))
+                return
+            queued = conn.execute(
+                "SELECT 1 FROM notification_outbox WHERE article_id = ? AND status IN ('pending', 'sending')",
+                (canonical_id,)
+            ).fetchone()
+            if queued:
+                return
+
+        conn.execute('''
+            INSERT OR IGNORE INTO notification_outbox (idempotency_key, article_id, status, next_attempt_at, created_at)
+            VALUES (?, ?, 'pending', ?, ?)
+        ''', (f"article:{article_data['article_id']}", row_id, time.time(), created_at))
+        article_data['outbox_queued'] = True
+
+    def get_duplicate_sources(self, article_id: str) -> List[Dict]:
+        """
+        获取与指定文章内容近似重复的其他来源
+
+        Args:
+            article_id: 首发文章ID
+
+        Returns:
+            List[Dict]: 重复文章列表，按入库时间升序
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT d.article_id, d.title, d.url, d.author, d.blogger_id, d.notified
+                    FROM articles a JOIN articles d ON d.duplicate_of = a.id
+                    WHERE a.article_id = ?
+                    ORDER BY d.created_at
+                ''', (article_id,))
+
+                columns = ['article_id', 'title', 'url', 'author', 'blogger_id', 'notified']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"获取重复文章来源失败: {e}")
+            return []
+
+    def assign_orphan_articles(self, blogger_id: int, batch_size: int = 1000) -> int:
+        """
+        将没有博主归属的历史文章归到指定博主（兼容单博主时代的旧数据）
+
+        分批更新，每批一个短事务，大表回填期间不会长时间占用写锁。
+
+        Args:
+            blogger_id: 博主ID
+            batch_size: 每批更新的文章数
+
+        Returns:
+            int: 更新的文章数量
+        """
+        def assign_batch(conn: sqlite3.Connection) -> int:
+            return conn.execute('''
+                UPDATE articles SET blogger_id = ?
+                WHERE id IN (SELECT id FROM articles WHERE blogger_id IS NULL LIMIT ?)
+            ''', (blogger_id, batch_size)).rowcount
+
+        total = 0
+        try:
+            while True:
+                updated = self._execute_write(assign_batch)
+                total += updated
+                if updated < batch_size:
+                    break
+            if total > 0:
+                logging.info(f"已将 {total} 篇历史文章归属到博主 {blogger_id}")
+            return total
+        except Exception as e:
+            logging.error(f"归属历史文章失败: {e}")
+            return total
+
+    def add_article(self, article_data: Dict, blogger_id: int = None, enqueue_notification: bool = False) -> bool:
+        """
+        添加新文章到数据库
+
+        新文章会根据标题和摘要计算SimHash指纹并查找近似重复的已有文章，
+        找到时在 article_data 中写入 duplicate_of（首发文章ID）和 duplicate_notified（首发文章是否已通知）。
+
+        Args:
+            article_data: 文章数据字典
+            blogger_id: 所属博主ID（可选）
+            enqueue_notification: 是否在同一事务中写入通知发件箱
+
+        Returns:
+            bool: 添加成功返回True，已存在返回False
+        """
+        try:
+            return self.add_article_async(article_data, blogger_id, enqueue_notification).result()
+        except Exception as e:
+            logging.error(f"添加文章到数据库失败: {e}")
+            return False
+
+    def add_article_async(self, article_data: Dict, blogger_id: int = None,
+                          enqueue_notification: bool = False) -> Future:
+        """
+        提交添加文章的写操作，不等待落盘
+
+        Args:
+            article_data: 文章数据字典
+            blogger_id: 所属博主ID（可选）
+            enqueue_notification: 是否在同一事务中写入通知发件箱
+
+        Returns:
+            Future: 结果为添加成功返回True，已存在返回False
+        """
+        fingerprint = simhash.simhash(f"{article_data.get('title', '')}\n{article_data.get('summary', '')}")
+        return self._submit_write(self._add_article, article_data, blogger_id, datetime.now().isoformat(),
+                                  fingerprint, enqueue_notification)
+
+    @classmethod
+    def _add_article(cls, conn: sqlite3.Connection, article_data: Dict, blogger_id: Optional[int],
+                     created_at: str, fingerprint: int, enqueue_notification: bool = False) -> bool:
+        """添加文章的写操作"""
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR IGNORE INTO articles
+            (article_id, blogger_id, title, url, publish_time, author, summary, read_count, comment_count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            article_data['article_id'],
+            blogger_id,
+            article_data['title'],
+            article_data['url'],
+            article_data.get('publish_time', ''),
+            article_data.get('author', ''),
+            article_data.get('summary', ''),
+            article_data.get('read_count', 0),
+            article_data.get('comment_count', 0),
+            created_at
+        ))
+
+        if cursor.rowcount > 0:
+            row_id = cursor.lastrowid
+            canonical_id = None
+            if fingerprint:
+                canonical_id = cls._index_simhash(conn, row_id, article_data, fingerprint, created_at)
+            if enqueue_notification:
+                cls._enqueue_notification(conn, row_id, article_data, canonical_id, created_at)
+            logging.info(f"新文章已添加到数据库: {article_data['title']} (阅读:{article_data.get('read_count', 0)}, 评论:{article_data.get('comment_count', 0)})")
+            return True
+
+        logging.debug(f"文章已存在: {article_data['title']}")
+        return False
+    
+    def record_article_stats(self, articles: List[Dict], ts: int = None) -> int:
+        """
+        批量记录一轮抓取中观察到的阅读数和评论数
+
+        Args:
+            articles: 本轮抓取到的文章列表
+            ts: 观察时间（Unix秒），默认为当前时间
+
+        Returns:
+            int: 写入的快照数量
+        """
+        try:
+            return self.record_article_stats_async(articles, ts).result()
+        except Exception as e:
+            logging.error(f"记录文章统计数据失败: {e}")
+            return 0
+
+    def record_article_stats_async(self, articles: List[Dict], ts: int = None) -> Future:
+        """
+        提交记录统计快照的写操作，不等待落盘
+
+        与上一次记录相同的数值不会重复写入；没有解析到统计数据（均为0）的观察会被忽略。
+        同时把文章表中的阅读数和评论数更新为最新值。
+
+        Args:
+            articles: 本轮抓取到的文章列表
+            ts: 观察时间（Unix秒），默认为当前时间
+
+        Returns:
+            Future: 结果为写入的快照数量
+        """
+        observations = {}
+        for article in articles:
+            reads = int(article.get('read_count') or 0)
+            comments = int(article.get('comment_count') or 0)
+            if article.get('article_id') and (reads > 0 or comments > 0):
+                observations[str(article['article_id'])] = (reads, comments)
+
+        ts = int(ts if ts is not None else time.time())
+        return self._submit_write(self._record_article_stats, observations, ts)
+
+    @staticmethod
+    def _record_article_stats(conn: sqlite3.Connection, observations: Dict[str, tuple], ts: int) -> int:
+        """记录统计快照的写操作"""
+        if not observations:
+            return 0
+
+        cursor = conn.cursor()
+        # 分块查询，一次观察的文章数超过SQLite变量上限时也不会失败
+        row_ids = {}
+        for chunk in chunked(observations, IN_CHUNK_SIZE):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT id, article_id FROM articles WHERE article_id IN ({placeholders})', chunk)
+            row_ids.update((article_id, row_id) for row_id, article_id in cursor.fetchall())
+        if not row_ids:
+            return 0
+
+        last_values = {}
+        for chunk in chunked(row_ids.values(), IN_CHUNK_SIZE):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT s.article_id, s.reads, s.comments
+                FROM article_stats s
+                WHERE s.article_id IN ({placeholders})
+                  AND s.ts = (SELECT MAX(ts) FROM article_stats WHERE article_id = s.article_id)
+            ''', chunk)
+            last_values.update((row_id, (reads, comments)) for row_id, reads, comments in cursor.fetchall())
+
+        snapshots = []
+        for article_id, row_id in row_ids.items():
+            values = observations[article_id]
+            if last_values.get(row_id) != values:
+                snapshots.append((row_id, ts) + values)
+
+        if snapshots:
+            cursor.executemany(
+                'INSERT OR REPLACE INTO article_stats (article_id, ts, reads, comments) VALUES (?, ?, ?, ?)',
+                snapshots
+            )
+            cursor.executemany(
+                'UPDATE articles SET read_count = ?, comment_count = ? WHERE id = ?',
+                [(reads, comments, row_id) for row_id, _, reads, comments in snapshots]
+            )
+
+        logging.debug(f"记录文章统计快照 {len(snapshots)} 条（观察 {len(row_ids)} 篇）")
+        return len(snapshots)
+
+    def compact_article_stats(self, raw_retention_days: int = 7, hourly_retention_days: int = 90) -> int:
+        """
+        对统计时间序列降采样
+
+        最近 raw_retention_days 天保留全部快照；更早的每篇文章每小时只保留最后一个快照；
+        超过 hourly_retention_days 天的每天只保留最后一个快照。保留每个时间桶的最后一个值，
+        阅读数的增长曲线因此得以完整保存。
+
+        Args:
+            raw_retention_days: 保留原始快照的天数
+            hourly_retention_days: 保留小时粒度快照的天数
+
+        Returns:
+            int: 删除的快照数量
+        """
+        now = int(time.time())
+        policies = [
+            (now - raw_retention_days * 86400, 3600),
+            (now - hourly_retention_days * 86400, 86400),
+        ]
+
+        def compact(conn: sqlite3.Connection) -> int:
+            deleted = 0
+            for cutoff, bucket in policies:
+                # 同一时间桶内存在更晚的快照，则删除当前快照
+                deleted += conn.execute('''
+                    DELETE FROM article_stats
+                    WHERE ts < :cutoff
+                      AND EXISTS (
+                          SELECT 1 FROM article_stats later
+                          WHERE later.article_id = article_stats.article_id
+                            AND later.ts > article_stats.ts
+                            AND later.ts < (article_stats.ts / :bucket + 1) * :bucket
+                      )
+                ''', {'cutoff': cutoff, 'bucket': bucket}).rowcount
+            return deleted
+
+        try:
+            deleted = self._execute_write(compact)
+            if deleted:
+                logging.info(f"统计数据降采样完成，删除 {deleted} 条快照")
+            return deleted
+        except Exception as e:
+            logging.error(f"统计数据降采样失败: {e}")
+            return 0
+
+    def get_article_stats(self, article_id: str) -> List[Dict]:
+        """
+        获取单篇文章的统计时间序列
+
+        Args:
+            article_id: 文章ID
+
+        Returns:
+            List[Dict]: 按时间升序的快照列表
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT s.ts, s.reads, s.comments
+                    FROM article_stats s
+                    JOIN articles a ON a.id = s.article_id
+                    WHERE a.article_id = ?
+                    ORDER BY s.ts
+                ''', (article_id,))
+
+                columns = ['ts', 'reads', 'comments']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"获取文章统计数据失败: {e}")
+            return []
+
+    def iter_recent_stats(self, since_ts: int, samples_per_article: int = 3) -> Iterator[tuple]:
+        """
+        流式读取每篇文章最近的若干个统计快照（单次查询）
+
+        Args:
+            since_ts: 只读取该时间（Unix秒）之后的快照
+            samples_per_article: 每篇文章最多返回的快照数
+
+        Yields:
+            tuple: (文章行ID, 时间戳, 阅读数)，按文章行ID和时间升序
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute('''
+                SELECT article_id, ts, reads FROM (
+                    SELECT article_id, ts, reads,
+                           ROW_NUMBER() OVER (PARTITION BY article_id ORDER BY ts DESC) AS rn
+                    FROM article_stats
+                    WHERE ts >= ?
+                )
+                WHERE rn <= ?
+                ORDER BY article_id, ts
+            ''', (since_ts, samples_per_article))
+            yield from cursor
+
+    # 导出的文章字段，顺序即导出文件的列顺序
+    EXPORT_COLUMNS = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary',
+                      'read_count', 'comment_count', 'created_at', 'notified', 'blogger_id', 'duplicate_of']
+
+    def count_articles(self, blogger_id: int = None, since: str = None, until: str = None) -> int:
+        """
+        统计符合条件的文章数
+
+        Args:
+            blogger_id: 只统计该博主的文章
+            since: 入库时间下限（含，ISO格式）
+            until: 入库时间上限（不含，ISO格式）
+
+        Returns:
+            int: 文章数
+        """
+        conditions, params = self._article_filter(blogger_id, since, until)
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(f'SELECT COUNT(*) FROM articles a {conditions}', params).fetchone()[0]
+        except Exception as e:
+            logging.error(f"统计文章数失败: {e}")
+            return 0
+
+    @staticmethod
+    def _article_filter(blogger_id: int = None, since: str = None, until: str = None) -> tuple:
+        """构造按博主和入库时间过滤文章（别名a）的WHERE子句和参数"""
+        conditions, params = [], []
+        if blogger_id is not None:
+            conditions.append('a.blogger_id = ?')
+            params.append(blogger_id)
+        if since:
+            conditions.append('a.created_at >= ?')
+            params.append(since)
+        if until:
+            conditions.append('a.created_at < ?')
+            params.append(until)
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+    def iter_article_batches(self, blogger_id: int = None, since: str = None, until: str = None,
+                             batch_size: int = 1000) -> Iterator[List[tuple]]:
+        """
+        按入库顺序流式读取文章，每次只在内存中保留一批
+
+        Args:
+            blogger_id: 只读取该博主的文章
+            since: 只读取入库时间不早于该时间的文章（ISO格式）
+            until: 只读取入库时间早于该时间的文章（ISO格式）
+            batch_size: 每批行数
+
+        Yields:
+            List[tuple]: 一批文章，字段顺序同 EXPORT_COLUMNS，duplicate_of 为原始文章ID
+        """
+        where, params = self._article_filter(blogger_id, since, until)
+        columns = ', '.join(f'a.{column}' for column in self.EXPORT_COLUMNS[:-1])
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(f'''
+                SELECT {columns}, d.article_id
+                FROM articles a
+                LEFT JOIN articles d ON d.id = a.duplicate_of
+                {where}
+                ORDER BY a.id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    def get_articles_by_row_ids(self, row_ids: List[int], only_not_trending_alerted: bool = False) -> Dict[int, Dict]:
+        """
+        按文章行ID批量获取文章
+
+        Args:
+            row_ids: 文章行ID列表
+            only_not_trending_alerted: 只返回尚未发送过热门提醒的文章
+
+        Returns:
+            Dict[int, Dict]: 行ID到文章信息的映射
+        """
+        if not row_ids:
+            return {}
+        columns = ['id', 'article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count', 'blogger_id']
+        condition = ' AND trending_alerted_at IS NULL' if only_not_trending_alerted else ''
+        try:
+            articles = {}
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                for chunk in chunked(int(row_id) for row_id in row_ids):
+                    cursor.execute(f'''
+                        SELECT {', '.join(columns)}
+                        FROM articles
+                        WHERE id IN ({','.join('?' * len(chunk))}){condition}
+                    ''', chunk)
+                    articles.update((row[0], dict(zip(columns, row))) for row in cursor.fetchall())
+            return articles
+        except Exception as e:
+            logging.error(f"批量获取文章失败: {e}")
+            return {}
+
+    def mark_trending_alerted(self, article_ids: List[str]) -> int:
+        """
+        标记文章已发送热门提醒
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            int: 更新的文章数量
+        """
+        if not article_ids:
+            return 0
+        alerted_at = int(time.time())
+
+        def mark(conn: sqlite3.Connection) -> int:
+            return sum(conn.execute(
+                f"UPDATE articles SET trending_alerted_at = ? WHERE article_id IN ({','.join('?' * len(chunk))})",
+                [alerted_at] + chunk
+            ).rowcount for chunk in chunked(article_ids))
+
+        try:
+            return self._execute_write(mark)
+        except Exception as e:
+            logging.error(f"标记热门提醒失败: {e}")
+            return 0
+
+    def mark_as_notified(self, article_id: str) -> bool:
+        """
+        标记文章为已通知
+        
+        Args:
+            article_id: 文章ID
+            
+        Returns:
+            bool: 标记成功返回True
+        """
+        try:
+            return self.mark_as_notified_async(article_id).result()
+        except Exception as e:
+            logging.error(f"标记文章为已通知失败: {e}")
+            return False
+
+    def mark_as_notified_async(self, article_id: str) -> Future:
+        """
+        提交标记已通知的写操作，不等待落盘
+
+        Args:
+            article_id: 文章ID
+
+        Returns:
+            Future: 结果为是否标记成功
+        """
+        return self._submit_write(
+            lambda conn: conn.execute(
+                'UPDATE articles SET notified = TRUE WHERE article_id = ?',
+                (article_id,)
+            ).rowcount > 0
+        )
+    
+    def mark_many_as_notified(self, article_ids: List[str]) -> int:
+        """
+        批量标记文章为已通知
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            int: 标记的文章数量
+        """
+        try:
+            return self.mark_many_as_notified_async(article_ids).result()
+        except Exception as e:
+            logging.error(f"批量标记文章为已通知失败: {e}")
+            return 0
+
+    def mark_many_as_notified_async(self, article_ids: List[str]) -> Future:
+        """
+        提交批量标记已通知的写操作（一条UPDATE语句），不等待落盘
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            Future: 结果为标记的文章数量
+        """
+        article_ids = list(article_ids)
+
+        def mark(conn: sqlite3.Connection) -> int:
+            updated = 0
+            for chunk in chunked(article_ids):
+                updated += conn.execute(
+                    f"UPDATE articles SET notified = TRUE "
+                    f"WHERE article_id IN ({','.join('?' * len(chunk))}) AND notified = FALSE",
+                    chunk
+                ).rowcount
+            return updated
+
+        return self._submit_write(mark)
+
+    def enqueue_notifications(self, article_ids: List[str]) -> int:
+        """
+        把已入库的文章放入通知发件箱（直接发送失败后交给投递线程重试）
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            int: 新入队的记录数，已在发件箱中的文章会被忽略
         """
-        初始化数据库连接
-        
+        if not article_ids:
+            return 0
+
+        def enqueue(conn: sqlite3.Connection) -> int:
+            now, created_at = time.time(), datetime.now().isoformat()
+            return sum(conn.execute(f'''
+                INSERT OR IGNORE INTO notification_outbox (idempotency_key, article_id, status, next_attempt_at, created_at)
+                SELECT 'article:' || article_id, id, 'pending', ?, ?
+                FROM articles WHERE article_id IN ({','.join('?' * len(chunk))}) AND notified = FALSE
+            ''', [now, created_at] + chunk).rowcount for chunk in chunked(article_ids))
+
+        try:
+            return self._execute_write(enqueue)
+        except Exception as e:
+            logging.error(f"文章放入通知发件箱失败: {e}")
+            return 0
+
+    def update_article_details(self, article_id: str, details: Dict) -> Future:
+        """
+        提交补全文章详情的写操作（作者、摘要、发布时间），不等待落盘
+
         Args:
-            db_path: 数据库文件路径
+            article_id: 文章ID
+            details: 要更新的字段，只接受 author、summary、publish_time
+
+        Returns:
+            Future: 结果为是否更新成功
         """
-        self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """初始化数据库表结构"""
+        fields = {key: value for key, value in details.items() if key in ('author', 'summary', 'publish_time')}
+        if not fields:
+            raise ValueError("没有可更新的文章详情字段")
+        assignments = ', '.join(f'{key} = ?' for key in fields)
+        return self._submit_write(lambda conn: conn.execute(
+            f'UPDATE articles SET {assignments} WHERE article_id = ?',
+            list(fields.values()) + [article_id]
+        ).rowcount > 0)
+
+    # 投递中的记录超过该秒数仍未完成时，视为投递方已退出
+    OUTBOX_LEASE_SECONDS = 300
+
+    def claim_outbox(self, limit: int = 1, now: float = None, lease_timeout: float = OUTBOX_LEASE_SECONDS) -> List[Dict]:
+        """
+        领取到期的待发送通知
+
+        领取在一条 UPDATE ... RETURNING 语句中完成，多个投递线程（包括其他进程）不会领到同一条记录。
+        投递中（sending）的记录超过租约时间仍未完成时视为投递方已退出，可以被重新领取。
+
+        Args:
+            limit: 最多领取的条数
+            now: 当前时间（Unix秒），默认为当前时间
+            lease_timeout: 租约时间（秒）
+
+        Returns:
+            List[Dict]: 发件箱记录，包含 id、idempotency_key、attempts、delivered_targets，
+                        以及 article（文章信息，已删除时为None）和 duplicates（其他来源）
+        """
+        now = now if now is not None else time.time()
+
+        def claim(conn: sqlite3.Connection) -> list:
+            return conn.execute('''
+                UPDATE notification_outbox
+                SET status = 'sending', attempts = attempts + 1, updated_at = ?, claimed_at = ?
+                WHERE id IN (
+                    SELECT id FROM notification_outbox
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = 'sending' AND COALESCE(claimed_at, 0) <= ?)
+                    ORDER BY next_attempt_at, id
+                    LIMIT ?
+                )
+                RETURNING id, idempotency_key, article_id, attempts, delivered_targets
+            ''', (datetime.now().isoformat(), now, now, now - lease_timeout, limit)).fetchall()
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            rows = sorted(self._execute_write(claim))
+        except Exception as e:
+            logging.error(f"领取待发送通知失败: {e}")
+            return []
+        if not rows:
+            return []
 
-                # 创建文章表
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS articles (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        article_id TEXT UNIQUE NOT NULL,
-                        title TEXT NOT NULL,
-                        url TEXT NOT NULL,
-                        publish_time TEXT,
-                        author TEXT,
-                        summary TEXT,
-                        read_count INTEGER DEFAULT 0,
-                        comment_count INTEGER DEFAULT 0,
-                        created_at TEXT NOT NULL,
-                        notified BOOLEAN DEFAULT FALSE
-                    )
-                ''')
+        articles = self.get_articles_by_row_ids([row[2] for row in rows])
+        entries = []
+        for outbox_id, key, row_id, attempts, delivered_targets in rows:
+            article = articles.get(row_id)
+            entries.append({
+                'id': outbox_id,
+                'idempotency_key': key,
+                'attempts': attempts,
+                'delivered_targets': json.loads(delivered_targets),
+                'article': article,
+                'duplicates': self.get_duplicate_sources(article['article_id']) if article else []
+            })
+        return entries
+
+    def complete_outbox(self, outbox_id: int, delivered_targets: List[str]) -> bool:
+        """
+        标记通知已送达，并在同一事务中把文章及其重复来源标记为已通知
+
+        Args:
+            outbox_id: 发件箱记录ID
+            delivered_targets: 已送达的通知目标
 
-                # 检查并添加新字段（兼容旧数据库）
-                self._upgrade_database_schema(cursor)
+        Returns:
+            bool: 标记成功返回True
+        """
+        def complete(conn: sqlite3.Connection) -> bool:
+            updated = conn.execute('''
+                UPDATE notification_outbox
+                SET status = 'sent', delivered_targets = ?, last_error = NULL, updated_at = ?, sent_at = ?
+                WHERE id = ? AND status = 'sending'
+                RETURNING article_id
+            ''', (json.dumps(delivered_targets), datetime.now().isoformat(), datetime.now().isoformat(),
+                  outbox_id)).fetchall()
+            if not updated:
+                return False
+            article_row_id = updated[0][0]
+            conn.execute(
+                'UPDATE articles SET notified = TRUE WHERE (id = ? OR duplicate_of = ?) AND notified = FALSE',
+                (article_row_id, article_row_id)
+            )
+            return True
 
-                conn.commit()
-                logging.info("数据库初始化完成")
+        try:
+            return self._execute_write(complete)
         except Exception as e:
-            logging.error(f"数据库初始化失败: {e}")
-            raise
+            logging.error(f"标记通知已送达失败: {e}")
+            return False
+
+    def fail_outbox(self, outbox_id: int, delivered_targets: List[str], error: str,
+                    next_attempt_at: float = None) -> bool:
+        """
+        记录一次投递失败
+
+        Args:
+            outbox_id: 发件箱记录ID
+            delivered_targets: 已送达的通知目标，重试时跳过
+            error: 失败原因
+            next_attempt_at: 下次重试时间（Unix秒），为None时进入死信状态
+
+        Returns:
+            bool: 记录成功返回True
+        """
+        status = 'pending' if next_attempt_at is not None else 'dead'
+        try:
+            return self._execute_write(lambda conn: conn.execute('''
+                UPDATE notification_outbox
+                SET status = ?, delivered_targets = ?, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at),
+                    updated_at = ?
+                WHERE id = ? AND status = 'sending'
+            ''', (status, json.dumps(delivered_targets), error, next_attempt_at, datetime.now().isoformat(),
+                  outbox_id)).rowcount > 0)
+        except Exception as e:
+            logging.error(f"记录通知投递失败出错: {e}")
+            return False
+
+    def reset_stuck_outbox(self, lease_timeout: float = OUTBOX_LEASE_SECONDS) -> int:
+        """
+        把领取后超过租约时间仍未完成的通知恢复为待发送（启动投递线程前调用）
+
+        租约内的记录可能正由其他进程（例如运行中的监控服务）投递，不会被恢复，避免重复发送。
+
+        Args:
+            lease_timeout: 租约时间（秒）
 
-    def _upgrade_database_schema(self, cursor):
-        """升级数据库结构，添加新字段"""
+        Returns:
+            int: 恢复的记录数
+        """
         try:
-            # 检查是否存在read_count字段
-            cursor.execute("PRAGMA table_info(articles)")
-            columns = [column[1] for column in cursor.fetchall()]
+            return self._execute_write(lambda conn: conn.execute(
+                "UPDATE notification_outbox SET status = 'pending', updated_at = ? "
+                "WHERE status = 'sending' AND COALESCE(claimed_at, 0) <= ?",
+                (datetime.now().isoformat(), time.time() - lease_timeout)
+            ).rowcount)
+        except Exception as e:
+            logging.error(f"恢复投递中的通知失败: {e}")
+            return 0
 
-            if 'read_count' not in columns:
-                cursor.execute('ALTER TABLE articles ADD COLUMN read_count INTEGER DEFAULT 0')
-                logging.info("添加read_count字段")
+    def requeue_dead_letters(self) -> int:
+        """
+        把死信重新放回发件箱，重新计算重试次数
+
+        Returns:
+            int: 重新排队的记录数
+        """
+        try:
+            return self._execute_write(lambda conn: conn.execute('''
+                UPDATE notification_outbox
+                SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ?
+                WHERE status = 'dead'
+            ''', (time.time(), datetime.now().isoformat())).rowcount)
+        except Exception as e:
+            logging.error(f"死信重新排队失败: {e}")
+            return 0
 
-            if 'comment_count' not in columns:
-                cursor.execute('ALTER TABLE articles ADD COLUMN comment_count INTEGER DEFAULT 0')
-                logging.info("添加comment_count字段")
+    def get_outbox_stats(self) -> Dict:
+        """
+        获取发件箱积压情况（只统计未送达的记录，走状态索引）
 
+        Returns:
+            Dict: pending、sending、dead 数量，以及最早一条待发送记录的入库时间 oldest_pending
+        """
+        stats = {'pending': 0, 'sending': 0, 'dead': 0, 'oldest_pending': None}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                for status, count in conn.execute('''
+                    SELECT status, COUNT(*) FROM notification_outbox
+                    WHERE status IN ('pending', 'sending', 'dead')
+                    GROUP BY status
+                '''):
+                    stats[status] = count
+                stats['oldest_pending'] = conn.execute(
+                    "SELECT MIN(created_at) FROM notification_outbox WHERE status = 'pending'"
+                ).fetchone()[0]
         except Exception as e:
-            logging.debug(f"数据库结构升级: {e}")  # 不是致命错误，只记录调试信息
-    
-    def add_article(self, article_data: Dict) -> bool:
+            logging.error(f"获取发件箱状态失败: {e}")
+        return stats
+
+    def get_dead_letters(self, limit: int = 20) -> List[Dict]:
         """
-        添加新文章到数据库
+        获取死信记录
 
         Args:
-            article_data: 文章数据字典
+            limit: 最多返回的条数
 
         Returns:
-            bool: 添加成功返回True，已存在返回False
+            List[Dict]: 死信列表，包含文章标题和最后一次失败原因
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR IGNORE INTO articles
-                    (article_id, title, url, publish_time, author, summary, read_count, comment_count, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article_data['article_id'],
-                    article_data['title'],
-                    article_data['url'],
-                    article_data.get('publish_time', ''),
-                    article_data.get('author', ''),
-                    article_data.get('summary', ''),
-                    article_data.get('read_count', 0),
-                    article_data.get('comment_count', 0),
-                    datetime.now().isoformat()
-                ))
-
-                if cursor.rowcount > 0:
-                    conn.commit()
-                    logging.info(f"新文章已添加到数据库: {article_data['title']} (阅读:{article_data.get('read_count', 0)}, 评论:{article_data.get('comment_count', 0)})")
-                    return True
-                else:
-                    logging.debug(f"文章已存在: {article_data['title']}")
-                    return False
+                cursor = conn.execute('''
+                    SELECT o.id, o.idempotency_key, a.title, o.attempts, o.last_error, o.updated_at
+                    FROM notification_outbox o LEFT JOIN articles a ON a.id = o.article_id
+                    WHERE o.status = 'dead'
+                    ORDER BY o.id DESC
+                    LIMIT ?
+                ''', (limit,))
+                columns = ['id', 'idempotency_key', 'title', 'attempts', 'last_error', 'updated_at']
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"获取死信失败: {e}")
+            return []
+
+    # 投递记录保留的天数
+    DELIVERY_RETENTION_DAYS = 30
+    # 投递统计默认覆盖的小时数
+    DELIVERY_STATS_HOURS = 24
+
+    def record_deliveries_async(self, deliveries: List[tuple]) -> Future:
+        """
+        提交通知投递记录，并删除超过保留天数的旧记录，不等待落盘
+
+        Args:
+            deliveries: [(文章ID, 目标名称, 是否成功, 失败原因, 耗时毫秒, 告警延迟毫秒)] 列表，
+                        告警延迟为从发现文章到送达的时间，未知时为None
 
+        Returns:
+            Future: 结果为写入的记录数
+        """
+        now = datetime.now()
+        created_at = now.isoformat()
+        cutoff = (now - timedelta(days=self.DELIVERY_RETENTION_DAYS)).isoformat()
+        rows = [(article_id, target, bool(success), error, elapsed_ms, alert_latency_ms, created_at)
+                for article_id, target, success, error, elapsed_ms, alert_latency_ms in deliveries]
+
+        def record(conn: sqlite3.Connection) -> int:
+            conn.execute('DELETE FROM notification_deliveries WHERE created_at < ?', (cutoff,))
+            return conn.executemany('''
+                INSERT INTO notification_deliveries
+                    (article_id, target, success, error, elapsed_ms, alert_latency_ms, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows).rowcount
+
+        return self._submit_write(record)
+
+    def get_delivery_stats(self, since: str = None) -> Dict[str, Dict]:
+        """
+        按通知目标统计投递结果
+
+        Args:
+            since: 只统计该时间之后的记录（ISO格式），默认最近 DELIVERY_STATS_HOURS 小时
+
+        Returns:
+            Dict[str, Dict]: 目标名称到 total、succeeded、failed、avg_ms、avg_alert_ms、max_alert_ms、
+                             last_error 的映射（告警延迟只统计送达的记录）
+        """
+        if since is None:
+            since = (datetime.now() - timedelta(hours=self.DELIVERY_STATS_HOURS)).isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute('''
+                    SELECT target, COUNT(*), SUM(success), AVG(elapsed_ms),
+                           AVG(CASE WHEN success THEN alert_latency_ms END),
+                           MAX(CASE WHEN success THEN alert_latency_ms END),
+                           (SELECT error FROM notification_deliveries latest
+                            WHERE latest.target = d.target AND latest.created_at >= :since
+                              AND latest.success = FALSE
+                            ORDER BY latest.created_at DESC, latest.id DESC LIMIT 1)
+                    FROM notification_deliveries d
+                    WHERE created_at >= :since
+                    GROUP BY target
+                    ORDER BY target
+                ''', {'since': since})
+                return {
+                    target: {
+                        'total': total,
+                        'succeeded': succeeded,
+                        'failed': total - succeeded,
+                        'avg_ms': avg_ms,
+                        'avg_alert_ms': avg_alert_ms,
+                        'max_alert_ms': max_alert_ms,
+                        'last_error': last_error
+                    }
+                    for target, total, succeeded, avg_ms, avg_alert_ms, max_alert_ms, last_error in cursor.fetchall()
+                }
         except Exception as e:
-            logging.error(f"添加文章到数据库失败: {e}")
-            return False
-    
-    def mark_as_notified(self, article_id: str) -> bool:
+            logging.error(f"获取通知投递统计失败: {e}")
+            return {}
+
+    def record_rule_matches_async(self, rule_names: List[str]) -> Future:
         """
-        标记文章为已通知
-        
+        累加路由规则的命中次数，不等待落盘
+
         Args:
-            article_id: 文章ID
-            
+            rule_names: 命中的规则名称列表
+
         Returns:
-            bool: 标记成功返回True
+            Future: 结果为更新的规则数
+        """
+        matched_at = datetime.now().isoformat()
+        return self._submit_write(lambda conn: conn.executemany('''
+            INSERT INTO routing_stats (rule_name, matches, last_matched_at) VALUES (?, 1, ?)
+            ON CONFLICT(rule_name) DO UPDATE SET
+                matches = matches + 1,
+                last_matched_at = excluded.last_matched_at
+        ''', [(name, matched_at) for name in rule_names]).rowcount)
+
+    def get_routing_stats(self) -> Dict[str, Dict]:
+        """
+        获取路由规则的累计命中次数
+
+        Returns:
+            Dict[str, Dict]: 规则名称到 matches、last_matched_at 的映射
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'UPDATE articles SET notified = TRUE WHERE article_id = ?',
-                    (article_id,)
-                )
-                conn.commit()
-                return cursor.rowcount > 0
+                rows = conn.execute('SELECT rule_name, matches, last_matched_at FROM routing_stats').fetchall()
+            return {name: {'matches': matches, 'last_matched_at': last_matched_at}
+                    for name, matches, last_matched_at in rows}
         except Exception as e:
-            logging.error(f"标记文章为已通知失败: {e}")
-            return False
-    
-    def get_unnotified_articles(self) -> List[Dict]:
+            logging.error(f"获取路由规则命中次数失败: {e}")
+            return {}
+
+    # 检查周期记录保留的天数
+    CHECK_CYCLE_RETENTION_DAYS = 30
+
+    def record_check_cycle_async(self, started_at: str, duration: float, interval: float = None,
+                                 bloggers: int = None) -> Future:
+        """
+        提交一轮检查的耗时记录，并删除超过保留天数的旧记录，不等待落盘
+
+        Args:
+            started_at: 开始时间（ISO格式）
+            duration: 耗时（秒）
+            interval: 当时的检查间隔（秒），耗时超过间隔时记为超时
+            bloggers: 本轮检查的博主数
+
+        Returns:
+            Future: 结果为是否记录成功
+        """
+        overrun = interval is not None and duration > interval
+        cutoff = (datetime.now() - timedelta(days=self.CHECK_CYCLE_RETENTION_DAYS)).isoformat()
+
+        def record(conn: sqlite3.Connection) -> bool:
+            conn.execute('DELETE FROM check_cycles WHERE started_at < ?', (cutoff,))
+            return conn.execute('''
+                INSERT INTO check_cycles (started_at, duration_ms, interval_seconds, overrun, bloggers)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (started_at, duration * 1000, interval, overrun, bloggers)).rowcount > 0
+
+        return self._submit_write(record)
+
+    def get_check_cycle_stats(self, limit: int = 20) -> Dict:
+        """
+        统计最近几轮检查的耗时
+
+        Args:
+            limit: 统计最近多少轮
+
+        Returns:
+            Dict: count、avg_ms、max_ms、last_ms、overruns（超时轮数）、interval_seconds（最近一轮的检查间隔）、
+                  last_started_at；没有记录时 count 为0
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute('''
+                    SELECT started_at, duration_ms, interval_seconds, overrun
+                    FROM check_cycles
+                    ORDER BY id DESC
+                    LIMIT ?
+                ''', (limit,)).fetchall()
+        except Exception as e:
+            logging.error(f"获取检查周期统计失败: {e}")
+            return {'count': 0}
+
+        if not rows:
+            return {'count': 0}
+        durations = [row[1] for row in rows]
+        return {
+            'count': len(rows),
+            'avg_ms': sum(durations) / len(durations),
+            'max_ms': max(durations),
+            'last_ms': durations[0],
+            'overruns': sum(1 for row in rows if row[3]),
+            'interval_seconds': rows[0][2],
+            'last_started_at': rows[0][0]
+        }
+
+    def get_article_summary(self, blogger_id: int = None) -> Dict:
+        """
+        获取文章计数汇总（读取触发器维护的汇总表，耗时与文章数量无关）
+
+        Args:
+            blogger_id: 只汇总该博主，默认汇总全部博主
+
+        Returns:
+            Dict: total、unnotified、last_article_at、last_crawl_time，以及 bloggers 按博主的明细
+        """
+        summary = {'total': 0, 'unnotified': 0, 'last_article_at': None, 'last_crawl_time': None, 'bloggers': []}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                condition = 'WHERE s.blogger_id = ?' if blogger_id is not None else ''
+                params = (blogger_id,) if blogger_id is not None else ()
+                cursor = conn.execute(f'''
+                    SELECT s.blogger_id, b.name, s.total, s.unnotified, s.last_article_at,
+                           b.last_crawl_time, b.crawl_count, b.fail_count
+                    FROM article_summary s
+                    LEFT JOIN bloggers b ON b.id = s.blogger_id
+                    {condition}
+                    ORDER BY s.blogger_id
+                ''', params)
+
+                columns = ['blogger_id', 'name', 'total', 'unnotified', 'last_article_at',
+                           'last_crawl_time', 'crawl_count', 'fail_count']
+                summary['bloggers'] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+                # 只抓取过、还没有文章的博主也要显示抓取时间
+                crawl_condition = 'WHERE id = ?' if blogger_id is not None else ''
+                summary['last_crawl_time'] = conn.execute(
+                    f'SELECT MAX(last_crawl_time) FROM bloggers {crawl_condition}', params
+                ).fetchone()[0]
+        except Exception as e:
+            logging.error(f"获取文章汇总失败: {e}")
+            return summary
+
+        for row in summary['bloggers']:
+            summary['total'] += row['total']
+            summary['unnotified'] += row['unnotified']
+            if row['last_article_at'] and (summary['last_article_at'] or '') < row['last_article_at']:
+                summary['last_article_at'] = row['last_article_at']
+        return summary
+
+    def get_unnotified_articles(self, blogger_id: int = None) -> List[Dict]:
         """
         获取未通知的文章列表
 
+        Args:
+            blogger_id: 只返回指定博主的文章（可选）
+
         Returns:
             List[Dict]: 未通知的文章列表
         """
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count
-                    FROM articles
-                    WHERE notified = FALSE
-                    ORDER BY created_at DESC
-                ''')
+                if blogger_id is None:
+                    cursor.execute('''
+                        SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count, blogger_id
+                        FROM articles
+                        WHERE notified = FALSE
+                        ORDER BY created_at DESC
+                    ''')
+                else:
+                    cursor.execute('''
+                        SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count, blogger_id
+                        FROM articles
+                        WHERE blogger_id = ? AND notified = FALSE
+                        ORDER BY created_at DESC
+                    ''', (blogger_id,))
 
-                columns = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count']
+                columns = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count', 'blogger_id']
                 articles = []
                 for row in cursor.fetchall():
                     articles.append(dict(zip(columns, row)))
@@ -163,12 +1402,62 @@ class ArticleDatabase:
             logging.error(f"获取未通知文章失败: {e}")
             return []
     
-    def get_latest_articles(self, limit: int = 10) -> List[Dict]:
+    def iter_unnotified_batches(self, blogger_id: int = None, since: str = None, until: str = None,
+                                batch_size: int = 200) -> Iterator[List[Dict]]:
+        """
+        按入库顺序分批读取未通知的文章，用于补发通知
+
+        每批单独查询并从上一批最后一行之后继续（键集分页），调用方在两批之间标记已通知不会打乱读取；
+        发件箱中等待投递的文章由投递线程负责，不会读出。
+
+        Args:
+            blogger_id: 只读取该博主的文章
+            since: 只读取入库时间不早于该时间的文章（ISO格式）
+            until: 只读取入库时间早于该时间的文章（ISO格式）
+            batch_size: 每批行数
+
+        Yields:
+            List[Dict]: 一批文章，近似重复的文章带 duplicate_of（首发文章ID）和 duplicate_notified
+        """
+        where, params = self._article_filter(blogger_id, since, until)
+        conditions = where.replace('WHERE ', 'AND ', 1)
+        columns = ['id', 'article_id', 'title', 'url', 'publish_time', 'author', 'summary',
+                   'read_count', 'comment_count', 'blogger_id', 'created_at']
+        last_id = 0
+        with sqlite3.connect(self.db_path) as conn:
+            while True:
+                rows = conn.execute(f'''
+                    SELECT {', '.join(f'a.{column}' for column in columns)}, d.article_id, d.notified
+                    FROM articles a
+                    LEFT JOIN articles d ON d.id = a.duplicate_of
+                    WHERE a.notified = FALSE AND a.id > ? {conditions}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM notification_outbox o
+                          WHERE o.article_id = a.id AND o.status IN ('pending', 'sending')
+                      )
+                    ORDER BY a.id
+                    LIMIT ?
+                ''', [last_id] + params + [batch_size]).fetchall()
+                if not rows:
+                    break
+
+                batch = []
+                for row in rows:
+                    article = dict(zip(columns, row))
+                    if row[-2]:
+                        article['duplicate_of'] = row[-2]
+                        article['duplicate_notified'] = bool(row[-1])
+                    batch.append(article)
+                last_id = rows[-1][0]
+                yield batch
+
+    def get_latest_articles(self, limit: int = 10, blogger_id: int = None) -> List[Dict]:
         """
         获取最新的文章列表
 
         Args:
             limit: 返回文章数量限制
+            blogger_id: 只返回指定博主的文章（可选）
 
         Returns:
             List[Dict]: 最新文章列表
@@ -176,14 +1465,23 @@ class ArticleDatabase:
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count, notified
-                    FROM articles
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                ''', (limit,))
+                if blogger_id is None:
+                    cursor.execute('''
+                        SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count, notified, blogger_id
+                        FROM articles
+                        ORDER BY created_at DESC
+                        LIMIT ?
+                    ''', (limit,))
+                else:
+                    cursor.execute('''
+                        SELECT article_id, title, url, publish_time, author, summary, read_count, comment_count, notified, blogger_id
+                        FROM articles
+                        WHERE blogger_id = ?
+                        ORDER BY created_at DESC
+                        LIMIT ?
+                    ''', (blogger_id, limit))
 
-                columns = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count', 'notified']
+                columns = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count', 'notified', 'blogger_id']
                 articles = []
                 for row in cursor.fetchall():
                     articles.append(dict(zip(columns, row)))
@@ -193,9 +1491,217 @@ class ArticleDatabase:
             logging.error(f"获取最新文章失败: {e}")
             return []
     
+    def search_articles(self, query: str, limit: int = 20, offset: int = 0, blogger_id: int = None) -> Dict:
+        """
+        全文搜索文章标题、摘要和作者
+
+        多个关键词以空格分隔，需同时匹配。三个字及以上的关键词走全文索引并按BM25相关度排序
+        （标题权重最高）；一两个字的关键词走短关键词索引（article_grams），只含短关键词时按入库时间倒序。
+
+        Args:
+            query: 搜索关键词
+            limit: 每页数量
+            offset: 跳过的结果数
+            blogger_id: 只搜索指定博主的文章（可选）
+
+        Returns:
+            Dict: {'total': 匹配总数, 'results': 当前页文章列表}
+        """
+        terms = query.split()
+        if not terms:
+            return {'total': 0, 'results': []}
+
+        long_terms = [term for term in terms if len(term) >= 3]
+        short_terms = [term for term in terms if len(term) < 3]
+
+        conditions = []
+        params = []
+        if long_terms:
+            conditions.append('articles_fts MATCH ?')
+            params.append(' AND '.join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in short_terms:
+            # 索引中的二元组只转换了ASCII大小写，与SQLite的 lower() 一致
+            term = ''.join(char.lower() if char.isascii() else char for char in term)
+            if len(term) == 2:
+                conditions.append('a.id IN (SELECT article_id FROM article_grams WHERE gram = ?)')
+                params.append(term)
+            else:
+                # 一个字：以它开头的二元组，以及字段末尾的单字
+                conditions.append('a.id IN (SELECT article_id FROM article_grams WHERE gram BETWEEN ? AND ?)')
+                params.extend([term, term + chr(0x10FFFF)])
+        if blogger_id is not None:
+            conditions.append('a.blogger_id = ?')
+            params.append(blogger_id)
+
+        where = ' AND '.join(conditions)
+        source = 'articles_fts JOIN articles a ON a.id = articles_fts.rowid' if long_terms else 'articles a'
+        order = 'bm25(articles_fts, 10.0, 1.0, 2.0)' if long_terms else 'a.created_at DESC'
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT COUNT(*)
+                    FROM {source}
+                    WHERE {where}
+                ''', params)
+                total = cursor.fetchone()[0]
+
+                cursor.execute(f'''
+                    SELECT a.article_id, a.title, a.url, a.publish_time, a.author, a.summary,
+                           a.read_count, a.comment_count, a.blogger_id
+                    FROM {source}
+                    WHERE {where}
+                    ORDER BY {order}
+                    LIMIT ? OFFSET ?
+                ''', params + [limit, offset])
+
+                columns = ['article_id', 'title', 'url', 'publish_time', 'author', 'summary', 'read_count', 'comment_count', 'blogger_id']
+                return {'total': total, 'results': [dict(zip(columns, row)) for row in cursor.fetchall()]}
+        except Exception as e:
+            logging.error(f"搜索文章失败: {e}")
+            return {'total': 0, 'results': []}
+
+    def get_articles_created_before(self, cutoff: str, limit: int = 500) -> List[Dict]:
+        """
+        获取入库时间早于指定时间的文章（含统计时间序列），用于归档
+
+        Args:
+            cutoff: ISO格式时间
+            limit: 最多返回的文章数
+
+        Returns:
+            List[Dict]: 文章列表，按入库顺序；每篇文章的 stats 字段为 [时间戳, 阅读数, 评论数] 列表
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                # 旧文章集中在行ID较小的一端，按行ID扫描可以很快凑满一批
+                rows = conn.execute('''
+                    SELECT * FROM articles
+                    WHERE created_at < ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (cutoff, limit)).fetchall()
+
+                articles = []
+                for row in rows:
+                    article = dict(row)
+                    article['stats'] = [list(stat) for stat in conn.execute(
+                        'SELECT ts, reads, comments FROM article_stats WHERE article_id = ? ORDER BY ts',
+                        (row['id'],)
+                    )]
+                    articles.append(article)
+                return articles
+        except Exception as e:
+            logging.error(f"获取待归档文章失败: {e}")
+            return []
+
+    def delete_articles(self, article_ids: List[str], archived: bool = False) -> int:
+        """
+        删除文章及其统计快照、指纹索引等关联数据
+
+        Args:
+            article_ids: 文章ID列表
+            archived: 文章已归档，在同一事务中保留文章ID，之后再抓到这些文章时仍视为已存在
+
+        Returns:
+            int: 删除的文章数量
+        """
+        if not article_ids:
+            return 0
+
+        archived_at = datetime.now().isoformat()
+
+        def delete(conn: sqlite3.Connection) -> int:
+            deleted = 0
+            for chunk in chunked(article_ids):
+                row_ids = [row[0] for row in conn.execute(
+                    f"SELECT id FROM articles WHERE article_id IN ({','.join('?' * len(chunk))})", chunk
+                )]
+                if not row_ids:
+                    continue
+
+                placeholders = ','.join('?' * len(row_ids))
+                if archived:
+                    conn.execute(f'INSERT OR IGNORE INTO archived_articles (article_id, archived_at) '
+                                 f'SELECT article_id, ? FROM articles WHERE id IN ({placeholders})',
+                                 [archived_at] + row_ids)
+                conn.execute(f'DELETE FROM article_stats WHERE article_id IN ({placeholders})', row_ids)
+                conn.execute(f'DELETE FROM article_simhash_bands WHERE article_id IN ({placeholders})', row_ids)
+                conn.execute(f'DELETE FROM notification_outbox WHERE article_id IN ({placeholders})', row_ids)
+                conn.execute(f'DELETE FROM notification_deliveries WHERE article_id IN '
+                             f'(SELECT article_id FROM articles WHERE id IN ({placeholders}))', row_ids)
+                conn.execute(f'UPDATE articles SET duplicate_of = NULL WHERE duplicate_of IN ({placeholders})', row_ids)
+                deleted += conn.execute(f'DELETE FROM articles WHERE id IN ({placeholders})', row_ids).rowcount
+            return deleted
+
+        try:
+            return self._execute_write(delete)
+        except Exception as e:
+            logging.error(f"删除文章失败: {e}")
+            return 0
+
+    def purge_test_articles(self) -> int:
+        """
+        删除系统自检写入的测试文章（test_ 开头的文章ID）
+
+        Returns:
+            int: 删除的文章数量
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                article_ids = [row[0] for row in conn.execute(
+                    "SELECT article_id FROM articles WHERE article_id LIKE 'test\\_%' ESCAPE '\\'"
+                )]
+        except Exception as e:
+            logging.error(f"查询测试文章失败: {e}")
+            return 0
+
+        deleted = 0
+        for chunk in chunked(article_ids):
+            deleted += self.delete_articles(chunk)
+        return deleted
+
+    def get_storage_info(self) -> Dict:
+        """
+        获取数据库文件的页面使用情况
+
+        Returns:
+            Dict: page_size、page_count、freelist_count、auto_vacuum（0无 1完全 2增量）
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            return {
+                name: conn.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum')
+            }
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """
+        归还最多 pages 个空闲页给文件系统（需要 auto_vacuum=INCREMENTAL）
+
+        Args:
+            pages: 本次最多回收的页数
+
+        Returns:
+            int: 实际回收的页数
+        """
+        def vacuum(conn: sqlite3.Connection) -> int:
+            before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            # Python每次执行只推进一步，每一步回收一页
+            for _ in range(min(pages, before)):
+                conn.execute('PRAGMA incremental_vacuum(1)')
+            return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+        try:
+            return self._execute_write(vacuum)
+        except Exception as e:
+            logging.error(f"增量回收空间失败: {e}")
+            return 0
+
     def article_exists(self, article_id: str) -> bool:
         """
-        检查文章是否已存在
+        检查文章是否已存在（包括已归档删除的文章）
         
         Args:
             article_id: 文章ID
@@ -207,8 +1713,9 @@ class ArticleDatabase:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    'SELECT 1 FROM articles WHERE article_id = ?',
-                    (article_id,)
+                    'SELECT 1 FROM articles WHERE article_id = ? '
+                    'UNION ALL SELECT 1 FROM archived_articles WHERE article_id = ?',
+                    (article_id, article_id)
                 )
                 return cursor.fetchone() is not None
         except Exception as e:
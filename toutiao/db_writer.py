@@ -0,0 +1,215 @@
+"""
+数据库单写线程模块
+所有写操作进入有界队列，由一个专用线程按时间和数量分组提交，避免多个线程争抢SQLite写锁
+"""
+
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+# 队列中的停止标记
+_STOP = object()
+
+
+class DatabaseWriter:
+    """数据库单写线程"""
+
+    def __init__(self, db_path: str, max_queue_size: int = 1000,
+                 max_batch_size: int = 100, max_batch_delay: float = 0.05):
+        """
+        初始化写线程
+
+        Args:
+            db_path: 数据库文件路径
+            max_queue_size: 队列容量，队列满时提交方阻塞（背压）
+            max_batch_size: 单个事务最多包含的写操作数
+            max_batch_delay: 收到第一个写操作后最多等待多久（秒）再提交事务
+        """
+        self.db_path = db_path
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+        # 进程退出前把队列中的写操作全部落盘
+        atexit.register(self.close)
+
+    def submit(self, operation: Callable, *args) -> Future:
+        """
+        提交写操作
+
+        Args:
+            operation: 写操作函数，第一个参数为数据库连接，不要在其中提交事务
+            *args: 传给写操作的其余参数
+
+        Returns:
+            Future: 事务提交后完成，结果为写操作的返回值
+        """
+        future = Future()
+        # 与 close() 持同一把锁：检查和入队之间不会插入停止标记，入队的操作一定会被写线程处理
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("数据库写线程已关闭")
+            self._queue.put((future, operation, args))
+        return future
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        等待此前提交的写操作全部落盘
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 全部落盘返回True
+        """
+        try:
+            self.submit(lambda conn: None).result(timeout)
+            return True
+        except Exception as e:
+            logging.error(f"等待数据库写入完成失败: {e}")
+            return False
+
+    def close(self, timeout: float = None):
+        """
+        关闭写线程，关闭前写完队列中的全部操作
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+
+        self._thread.join(timeout)
+        logging.info("数据库写线程已关闭")
+
+    @property
+    def queue_size(self) -> int:
+        """当前排队的写操作数"""
+        return self._queue.qsize()
+
+    def _run(self):
+        """写线程主循环"""
+        try:
+            self._write_loop()
+        except Exception as e:
+            logging.error(f"数据库写线程异常退出: {e}")
+        finally:
+            self._fail_pending()
+
+    def _write_loop(self):
+        """按批取出写操作并提交，收到停止标记后写完剩余操作"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + self.max_batch_delay
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._execute_batch(conn, batch)
+
+            # 停止标记之后仍可能有并发提交进来的操作，一并写完
+            remaining_items = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    remaining_items.append(item)
+            for start in range(0, len(remaining_items), self.max_batch_size):
+                self._execute_batch(conn, remaining_items[start:start + self.max_batch_size])
+        finally:
+            conn.close()
+
+    def _fail_pending(self):
+        """
+        写线程退出时让队列中剩余的写操作失败，避免等待结果的调用方永远阻塞
+
+        正常关闭时队列已经写完，这里只处理写线程异常退出的情况。
+        """
+        self._closed = True
+        error = RuntimeError("数据库写线程已退出，写操作未执行")
+        self._drain(error)
+        # 等待正在入队的提交方完成入队（之后的提交会看到已关闭），再清理一次
+        with self._close_lock:
+            self._drain(error)
+
+    def _drain(self, error: Exception):
+        """取出队列中的全部写操作并设置异常"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[0].done():
+                item[0].set_exception(error)
+
+    def _execute_batch(self, conn: sqlite3.Connection, batch: list):
+        """
+        在一个事务中执行一组写操作
+
+        每个操作包在保存点中，单个操作失败只回滚它自己，不影响同一事务中的其他操作。
+        """
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for future, operation, args in batch:
+                conn.execute('SAVEPOINT op')
+                try:
+                    results.append((future, operation(conn, *args), None))
+                    conn.execute('RELEASE op')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO op')
+                    conn.execute('RELEASE op')
+                    results.append((future, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            logging.error(f"数据库批量写入失败: {e}")
+            try:
+                conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            for future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # 事务提交后再通知调用方，保证结果已落盘
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        logging.debug(f"数据库写线程提交事务，包含 {len(batch)} 个写操作")
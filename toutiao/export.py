@@ -0,0 +1,160 @@
+"""
+文章导出模块
+按批流式读取文章并写入 JSONL、CSV 或 Parquet 文件，内存占用与表大小无关
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+from typing import Callable, Dict, List
+
+from .database import ArticleDatabase
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMATS = ['jsonl', 'csv', 'parquet']
+
+
+class _JsonlWriter:
+    """JSON Lines 写入器，每行一篇文章"""
+
+    def __init__(self, path: str, columns: List[str]):
+        self.columns = columns
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_batch(self, rows: List[tuple]):
+        self.file.writelines(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n'
+                             for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter:
+    """CSV 写入器，带BOM方便Excel直接打开中文内容"""
+
+    def __init__(self, path: str, columns: List[str]):
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write_batch(self, rows: List[tuple]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """Parquet 写入器，每批写成一个行组"""
+
+    def __init__(self, path: str, columns: List[str]):
+        integer_columns = {'read_count', 'comment_count', 'blogger_id'}
+        self.schema = pa.schema([
+            (column, pa.bool_() if column == 'notified'
+             else pa.int64() if column in integer_columns else pa.string())
+            for column in columns
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write_batch(self, rows: List[tuple]):
+        arrays = []
+        for index, field in enumerate(self.schema):
+            values = [row[index] for row in rows]
+            if field.type == pa.bool_():
+                # SQLite的布尔值以0/1存储
+                values = [None if value is None else bool(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+_WRITERS = {
+    'jsonl': _JsonlWriter,
+    'csv': _CsvWriter,
+    'parquet': _ParquetWriter,
+}
+
+
+def detect_format(path: str) -> str:
+    """
+    根据文件扩展名推断导出格式
+
+    Args:
+        path: 导出文件路径
+
+    Returns:
+        str: 导出格式，无法识别时返回 jsonl
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'json':
+        return 'jsonl'
+    return extension if extension in EXPORT_FORMATS else 'jsonl'
+
+
+def export_articles(database: ArticleDatabase, path: str, fmt: str = None, blogger_id: int = None,
+                    since: str = None, until: str = None, batch_size: int = 1000,
+                    progress: Callable[[int, int, float], None] = None) -> Dict:
+    """
+    导出文章
+
+    先写入临时文件，成功后再改名为目标文件，中途失败不会留下不完整的导出。
+
+    Args:
+        database: 文章数据库
+        path: 导出文件路径
+        fmt: 导出格式（jsonl/csv/parquet），默认按扩展名推断
+        blogger_id: 只导出该博主的文章
+        since: 入库时间下限（含，ISO格式）
+        until: 入库时间上限（不含，ISO格式）
+        batch_size: 每批读取和写入的行数
+        progress: 每写完一批调用一次，参数为 (已导出行数, 总行数, 已用秒数)
+
+    Returns:
+        Dict: path、format、rows、elapsed、rows_per_second
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {fmt}，可选: {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and not PYARROW_AVAILABLE:
+        raise RuntimeError("导出Parquet需要安装pyarrow: pip install pyarrow")
+
+    total = database.count_articles(blogger_id, since, until)
+    start = time.monotonic()
+    exported = 0
+
+    partial_path = path + '.partial'
+    writer = _WRITERS[fmt](partial_path, ArticleDatabase.EXPORT_COLUMNS)
+    try:
+        for rows in database.iter_article_batches(blogger_id, since, until, batch_size):
+            writer.write_batch(rows)
+            exported += len(rows)
+            if progress:
+                progress(exported, total, time.monotonic() - start)
+        writer.close()
+        os.replace(partial_path, path)
+    except BaseException:
+        writer.close()
+        os.remove(partial_path)
+        raise
+
+    elapsed = time.monotonic() - start
+    report = {
+        'path': path,
+        'format': fmt,
+        'rows': exported,
+        'elapsed': elapsed,
+        'rows_per_second': exported / elapsed if elapsed > 0 else 0.0
+    }
+    logging.info(f"导出 {exported} 篇文章到 {path}，耗时 {elapsed:.2f} 秒")
+    return report
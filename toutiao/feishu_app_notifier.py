@@ -0,0 +1,407 @@
+"""
+飞书应用机器人通知模块
+通过开放平台消息接口向多个群发送通知，缓存 tenant_access_token 并在过期前主动刷新，支持编辑已发送的消息
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .feishu_notifier import FeishuNotifier
+
+
+class FeishuAppNotifier(FeishuNotifier):
+    """飞书应用机器人通知器类"""
+
+    # 消息接口表示请求过于频繁的错误码（应用频率限制、群消息频率限制）
+    RATE_LIMIT_CODES = {99991400, 230020}
+    # 表示 tenant_access_token 无效或过期的错误码，刷新令牌后重试一次
+    TOKEN_INVALID_CODES = {99991661, 99991663, 99991668}
+    # 默认限流：应用发送消息接口每秒50次、每分钟1000次
+    DEFAULT_RATE_PER_SECOND = 50
+    DEFAULT_RATE_PER_MINUTE = 1000
+    REQUIRED_CONFIG = ('app_id', 'app_secret', 'chat_ids')
+    # 记住最近多少篇文章通知的消息ID，用于补全详情后编辑
+    ARTICLE_MESSAGE_CACHE = 500
+
+    def __init__(self, app_id: str, app_secret: str, chat_ids: List[str],
+                 base_url: str = 'https://open.feishu.cn', token_refresh_margin: float = 300,
+                 send_workers: int = 4, **kwargs):
+        """
+        初始化飞书应用机器人通知器
+
+        Args:
+            app_id: 应用的 App ID
+            app_secret: 应用的 App Secret
+            chat_ids: 接收通知的群ID（chat_id）列表，机器人需要已加入这些群
+            base_url: 开放平台地址
+            token_refresh_margin: 令牌剩余有效期少于该秒数时主动刷新
+            send_workers: 一条消息发到多个群时并发发送的最大线程数（不超过连接池大小）
+            **kwargs: 超时、连接池和限流参数，同 FeishuNotifier
+        """
+        kwargs.setdefault('rate_per_second', self.DEFAULT_RATE_PER_SECOND)
+        kwargs.setdefault('rate_per_minute', self.DEFAULT_RATE_PER_MINUTE)
+        self.base_url = base_url.rstrip('/')
+        self.messages_url = f'{self.base_url}/open-apis/im/v1/messages'
+        super().__init__(self.messages_url, None, **kwargs)
+
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.chat_ids = list(chat_ids)
+        self.token_refresh_margin = token_refresh_margin
+
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self._token_fetches = 0
+
+        self._article_messages: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+        self._messages_lock = threading.Lock()
+
+        self.send_workers = max(1, min(send_workers, self.pool_maxsize))
+        self._send_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, target_config: Dict, **kwargs) -> 'FeishuAppNotifier':
+        """
+        根据通知目标配置创建通知器
+
+        Args:
+            target_config: 目标配置，包含 app_id、app_secret、chat_ids，可选 base_url
+            **kwargs: 超时、连接池、限流参数和共享会话
+
+        Returns:
+            FeishuAppNotifier: 通知器
+        """
+        return cls(target_config['app_id'], target_config['app_secret'], target_config['chat_ids'],
+                   base_url=target_config.get('base_url', 'https://open.feishu.cn'),
+                   token_refresh_margin=target_config.get('token_refresh_margin', 300),
+                   send_workers=target_config.get('send_workers', 4), **kwargs)
+
+    @property
+    def target_key(self) -> str:
+        """通知目标的标识（开放平台地址和 App ID 的摘要）"""
+        return hashlib.sha1(f'{self.base_url}|{self.app_id}'.encode('utf-8')).hexdigest()[:12]
+
+    def _chat_key(self, chat_id: str) -> str:
+        """一个群的接收方标识"""
+        return hashlib.sha1(f'{self.base_url}|{self.app_id}|{chat_id}'.encode('utf-8')).hexdigest()[:12]
+
+    def delivery_keys(self) -> List[str]:
+        """
+        一条通知需要分别送达的接收方标识，每个群一个
+
+        Returns:
+            List[str]: 各群的接收方标识，顺序同 chat_ids
+        """
+        return [self._chat_key(chat_id) for chat_id in self.chat_ids]
+
+    def deliver_article(self, article: Dict, duplicates: List[Dict], keys: List[str]) -> List[str]:
+        """
+        把文章通知只发送到尚未送达的群
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源
+            keys: delivery_keys 中尚未送达的群的标识
+
+        Returns:
+            List[str]: 本次送达的群的标识
+        """
+        pending = set(keys)
+        chat_ids = [chat_id for chat_id in self.chat_ids if self._chat_key(chat_id) in pending]
+        if not chat_ids:
+            return []
+        try:
+            message_ids = self._send_article(article, duplicates, chat_ids)
+        except Exception as e:
+            logging.error(f"发送飞书应用文章通知失败: {e}")
+            return []
+        return [self._chat_key(chat_id) for chat_id, message_id in message_ids.items() if message_id]
+
+    def _fetch_token(self) -> bool:
+        """请求新的 tenant_access_token，成功后更新缓存"""
+        start = time.perf_counter()
+        success = False
+        try:
+            response = self.session.post(
+                f'{self.base_url}/open-apis/auth/v3/tenant_access_token/internal',
+                data=json.dumps({'app_id': self.app_id, 'app_secret': self.app_secret}),
+                timeout=self.timeout
+            )
+            result = response.json()
+            if result.get('code') != 0:
+                logging.error(f"获取飞书 tenant_access_token 失败: {result.get('code')} {result.get('msg')}")
+                return False
+
+            self._token = result['tenant_access_token']
+            self._token_expires_at = time.monotonic() + result.get('expire', 7200)
+            self._token_fetches += 1
+            success = True
+            logging.info(f"飞书 tenant_access_token 已刷新，有效期 {result.get('expire', 7200)} 秒")
+            return True
+        except Exception as e:
+            logging.error(f"获取飞书 tenant_access_token 异常: {e}")
+            return False
+        finally:
+            self._record_latency(time.perf_counter() - start, success)
+
+    def get_token(self) -> Optional[str]:
+        """
+        获取 tenant_access_token
+
+        令牌缓存到过期前；剩余有效期少于 token_refresh_margin 时由一个线程刷新，
+        其他线程继续使用仍然有效的旧令牌，不会排队等待。
+
+        Returns:
+            Optional[str]: 令牌，获取失败时返回None
+        """
+        now = time.monotonic()
+        if self._token and now < self._token_expires_at - self.token_refresh_margin:
+            return self._token
+
+        if self._token and now < self._token_expires_at:
+            # 即将过期：抢到锁的线程刷新，其他线程直接用旧令牌
+            if self._token_lock.acquire(blocking=False):
+                try:
+                    if time.monotonic() >= self._token_expires_at - self.token_refresh_margin:
+                        self._fetch_token()
+                finally:
+                    self._token_lock.release()
+            return self._token
+
+        with self._token_lock:
+            if not self._token or time.monotonic() >= self._token_expires_at:
+                if not self._fetch_token():
+                    return None
+            return self._token
+
+    def invalidate_token(self):
+        """丢弃缓存的令牌，下次发送时重新获取"""
+        with self._token_lock:
+            self._token = None
+            self._token_expires_at = 0.0
+
+    def get_token_stats(self) -> Dict:
+        """
+        获取令牌缓存状态
+
+        Returns:
+            Dict: fetches（获取令牌的次数）、expires_in（当前令牌剩余秒数）
+        """
+        return {
+            'fetches': self._token_fetches,
+            'expires_in': max(0.0, self._token_expires_at - time.monotonic()) if self._token else 0.0
+        }
+
+    @staticmethod
+    def _to_app_message(data: Dict) -> Tuple[str, Dict]:
+        """
+        把自定义机器人格式的消息转换为消息接口的 msg_type 和 content
+
+        Args:
+            data: send_text_message / send_rich_text_message 构建的消息
+
+        Returns:
+            Tuple[str, Dict]: (msg_type, content)
+        """
+        if data['msg_type'] == 'post':
+            return 'post', data['content']['post']
+        return data['msg_type'], data['content']
+
+    def _request(self, method: str, url: str, body: Dict) -> Tuple[str, Optional[float], Optional[Dict]]:
+        """
+        带令牌请求一次消息接口，令牌失效时刷新后重试一次
+
+        Returns:
+            tuple: (状态 ok/rate_limited/error, 限流时建议的等待秒数, 响应中的 data)
+        """
+        for attempt in range(2):
+            token = self.get_token()
+            if token is None:
+                return 'error', None, None
+
+            start = time.perf_counter()
+            success = False
+            try:
+                response = self.session.request(
+                    method, url, data=json.dumps(body),
+                    headers={'Authorization': f'Bearer {token}'},
+                    timeout=self.timeout
+                )
+                try:
+                    result = response.json()
+                except ValueError:
+                    result = None
+
+                retry_after = self._rate_limit_retry_after(response, result)
+                if retry_after is not None:
+                    return 'rate_limited', retry_after, None
+
+                code = (result or {}).get('code')
+                if code in self.TOKEN_INVALID_CODES and attempt == 0:
+                    logging.warning(f"飞书 tenant_access_token 已失效（{code}），刷新后重试")
+                    self.invalidate_token()
+                    continue
+
+                if response.status_code == 200 and code == 0:
+                    success = True
+                    self.rate_limiter.on_success()
+                    return 'ok', None, result.get('data') or {}
+
+                logging.error(f"飞书消息接口请求失败: {response.status_code}, {result or response.text[:200]}")
+                return 'error', None, None
+
+            except Exception as e:
+                logging.error(f"飞书消息接口请求异常: {e}")
+                return 'error', None, None
+            finally:
+                self._record_latency(time.perf_counter() - start, success)
+        return 'error', None, None
+
+    def _call(self, method: str, url: str, body: Dict) -> Optional[Dict]:
+        """按限流排队请求消息接口，被限流时降速重试，返回响应中的 data，失败返回None"""
+        for attempt in range(self.rate_limit_retries + 1):
+            self.rate_limiter.acquire()
+            status, retry_after, data = self._request(method, url, body)
+            if status != 'rate_limited':
+                return data
+
+            self.rate_limiter.on_rate_limited(retry_after)
+            logging.warning(f"飞书消息接口触发限流，降速后重试（第 {attempt + 1} 次）")
+
+        logging.error(f"飞书消息接口持续限流，放弃发送（已重试 {self.rate_limit_retries} 次）")
+        return None
+
+    def send_message(self, msg_type: str, content: Dict, chat_ids: List[str] = None) -> Dict[str, Optional[str]]:
+        """
+        向多个群发送同一条消息
+
+        所有群共用缓存的令牌和连接池，在 send_workers 个线程上并发发送，每个请求仍按应用的限流排队。
+
+        Args:
+            msg_type: 消息类型（text/post/interactive）
+            content: 消息内容
+            chat_ids: 接收的群ID列表，默认为配置的全部群
+
+        Returns:
+            Dict[str, Optional[str]]: 群ID到消息ID（message_id）的映射，发送失败的群为None
+        """
+        body = {'msg_type': msg_type, 'content': json.dumps(content, ensure_ascii=False)}
+
+        def send(chat_id: str) -> Optional[str]:
+            data = self._call('POST', f'{self.messages_url}?receive_id_type=chat_id',
+                              dict(body, receive_id=chat_id))
+            return data.get('message_id') if data is not None else None
+
+        chat_ids = chat_ids or self.chat_ids
+        if len(chat_ids) <= 1 or self.send_workers <= 1:
+            return {chat_id: send(chat_id) for chat_id in chat_ids}
+
+        with self._executor_lock:
+            if self._send_executor is None:
+                self._send_executor = ThreadPoolExecutor(max_workers=self.send_workers, thread_name_prefix='feishu-app')
+            executor = self._send_executor
+        futures = {chat_id: executor.submit(send, chat_id) for chat_id in chat_ids}
+        return {chat_id: future.result() for chat_id, future in futures.items()}
+
+    def close(self):
+        """停止发送线程池并关闭HTTP会话"""
+        with self._executor_lock:
+            executor, self._send_executor = self._send_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        super().close()
+
+    def update_message(self, message_id: str, msg_type: str, content: Dict) -> bool:
+        """
+        编辑已发送的消息（文本和富文本消息）
+
+        Args:
+            message_id: send_message 返回的消息ID
+            msg_type: 消息类型（text/post）
+            content: 新的消息内容
+
+        Returns:
+            bool: 编辑成功返回True
+        """
+        body = {'msg_type': msg_type, 'content': json.dumps(content, ensure_ascii=False)}
+        return self._call('PUT', f'{self.messages_url}/{message_id}', body) is not None
+
+    def send_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        发送文章通知到全部群，并记住各群的消息ID
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            bool: 所有群都发送成功返回True
+        """
+        try:
+            message_ids = self._send_article(article, duplicates, self.chat_ids)
+        except Exception as e:
+            logging.error(f"发送飞书应用文章通知失败: {e}")
+            return False
+        return all(message_ids.values())
+
+    def _send_article(self, article: Dict, duplicates: List[Dict], chat_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        发送文章通知到指定的群，记住送达的消息ID（与此前送达其他群的消息ID合并）
+
+        Returns:
+            Dict[str, Optional[str]]: 群ID到消息ID的映射，发送失败的群为None
+        """
+        message_ids = self.send_message('text', {'text': self.format_article_text(article, duplicates)}, chat_ids)
+        sent = {chat_id: message_id for chat_id, message_id in message_ids.items() if message_id}
+        with self._messages_lock:
+            article_id = article.get('article_id')
+            sent = dict(self._article_messages.pop(article_id, {}), **sent)
+            self._article_messages[article_id] = sent
+            while len(self._article_messages) > self.ARTICLE_MESSAGE_CACHE:
+                self._article_messages.popitem(last=False)
+        return message_ids
+
+    def update_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        用补全详情后的内容编辑已发送的文章通知，找不到原消息时补发跟进消息
+
+        Args:
+            article: 补全详情后的文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            bool: 所有消息都编辑成功返回True
+        """
+        with self._messages_lock:
+            sent = self._article_messages.get(article.get('article_id'))
+        if not sent:
+            return super().update_article_notification(article, duplicates)
+
+        content = {'text': self.format_article_text(article, duplicates)}
+        results = [self.update_message(message_id, 'text', content) for message_id in sent.values()]
+        return all(results)
+
+    def _send_message(self, data: Dict) -> bool:
+        """
+        把消息发送到全部群
+
+        Args:
+            data: 消息数据
+
+        Returns:
+            bool: 所有群都发送成功返回True
+        """
+        msg_type, content = self._to_app_message(data)
+        message_ids = self.send_message(msg_type, content)
+        failed = [chat_id for chat_id, message_id in message_ids.items() if message_id is None]
+        if failed:
+            logging.error(f"飞书应用消息发送失败的群: {', '.join(failed)}")
+        return not failed
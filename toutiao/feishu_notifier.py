@@ -8,24 +8,162 @@ import time
 import hmac
 import hashlib
 import base64
-import requests
 import logging
-from typing import Dict, List
+import threading
+from collections import deque
+from typing import Dict, List, Tuple
+
+from .rate_limit import WebhookRateLimiter
 
 
 class FeishuNotifier:
     """飞书通知器类"""
     
-    def __init__(self, webhook_url: str, secret: str = None):
+    # 保留最近多少次请求的耗时用于统计
+    LATENCY_SAMPLES = 500
+    # 飞书自定义机器人请求体上限为20KB，留出签名等字段的余量
+    MAX_PAYLOAD_BYTES = 19 * 1024
+    # 摘要中每篇文章最多列出的其他来源数
+    DIGEST_MAX_SOURCES = 5
+    # 飞书表示请求过于频繁的错误码
+    RATE_LIMIT_CODES = {9499, 11232}
+    # 默认限流：飞书自定义机器人每秒5次、每分钟100次
+    DEFAULT_RATE_PER_SECOND = 5
+    DEFAULT_RATE_PER_MINUTE = 100
+    # 注册为通知目标时必填的配置项
+    REQUIRED_CONFIG = ('webhook_url',)
+
+    def __init__(self, webhook_url: str, secret: str = None, connect_timeout: float = 3.05,
+                 read_timeout: float = 10, pool_maxsize: int = 10, session=None,
+                 rate_per_second: float = 5, rate_per_minute: float = 100, rate_limit_retries: int = 3):
         """
         初始化飞书通知器
         
         Args:
             webhook_url: 飞书机器人Webhook URL
             secret: 飞书机器人密钥（可选）
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 等待响应超时（秒）
+            pool_maxsize: 连接池中每个主机保持的最大连接数
+            session: 共享的 requests.Session，多个机器人共用同一主机的长连接
+            rate_per_second: 每秒最多请求数（飞书自定义机器人限制约为5）
+            rate_per_minute: 每分钟最多请求数（飞书自定义机器人限制约为100）
+            rate_limit_retries: 被限流时最多重试的次数
         """
         self.webhook_url = webhook_url
         self.secret = secret
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+
+        self.rate_limiter = WebhookRateLimiter(rate_per_second, rate_per_minute)
+        self.rate_limit_retries = rate_limit_retries
+
+        self._session = session
+        self._session_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self._request_count = 0
+        self._error_count = 0
+
+    @classmethod
+    def from_config(cls, target_config: Dict, **kwargs) -> 'FeishuNotifier':
+        """
+        根据通知目标配置创建通知器
+
+        Args:
+            target_config: 目标配置，包含 webhook_url、secret
+            **kwargs: 超时、连接池、限流参数和共享会话
+
+        Returns:
+            FeishuNotifier: 通知器
+        """
+        return cls(target_config['webhook_url'], target_config.get('secret'), **kwargs)
+
+    @property
+    def target_key(self) -> str:
+        """通知目标的标识（webhook地址的摘要），记录在发件箱中，避免把webhook地址写入数据库"""
+        return hashlib.sha1(self.webhook_url.encode('utf-8')).hexdigest()[:12]
+
+    def delivery_keys(self) -> List[str]:
+        """
+        一条通知需要分别送达的接收方标识
+
+        发件箱按接收方记录已送达的部分，重试时只补发未送达的接收方。自定义机器人只有一个接收方。
+
+        Returns:
+            List[str]: 接收方标识列表
+        """
+        return [self.target_key]
+
+    def deliver_article(self, article: Dict, duplicates: List[Dict], keys: List[str]) -> List[str]:
+        """
+        把文章通知发送到指定的接收方
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源
+            keys: delivery_keys 中尚未送达的接收方标识
+
+        Returns:
+            List[str]: 本次送达的接收方标识
+        """
+        return list(keys) if self.send_article_notification(article, duplicates) else []
+
+    @property
+    def session(self):
+        """
+        HTTP会话，首次发送时创建
+
+        会话复用到 open.feishu.cn 的 TCP/TLS 连接，一轮检查后连续发送多条通知时不必重复握手。
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # requests 导入较慢，只在真正发送时导入
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, pool_block=False)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({'Content-Type': 'application/json'})
+                    self._session = session
+        return self._session
+
+    def close(self):
+        """关闭HTTP会话及其连接池"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _record_latency(self, seconds: float, success: bool):
+        """记录一次请求耗时"""
+        with self._stats_lock:
+            self._latencies.append(seconds)
+            self._request_count += 1
+            if not success:
+                self._error_count += 1
+
+    def get_latency_stats(self) -> Dict:
+        """
+        获取请求耗时统计
+
+        Returns:
+            Dict: requests、errors，以及最近若干次请求的 avg/p50/p95/max 耗时（毫秒）
+        """
+        with self._stats_lock:
+            samples = sorted(self._latencies)
+            stats = {'requests': self._request_count, 'errors': self._error_count}
+
+        if samples:
+            stats.update({
+                'avg_ms': sum(samples) / len(samples) * 1000,
+                'p50_ms': samples[len(samples) // 2] * 1000,
+                'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+                'max_ms': samples[-1] * 1000
+            })
+        return stats
     
     def _generate_sign(self, timestamp: str) -> str:
         """
@@ -108,81 +246,274 @@ class FeishuNotifier:
         
         return self._send_message(data)
     
-    def send_article_notification(self, article: Dict) -> bool:
+    def send_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
         """
         发送文章通知
 
         Args:
             article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选），合并在同一条通知中列出
 
         Returns:
             bool: 发送成功返回True
         """
         try:
             # 先尝试发送简单文本消息，避免富文本格式问题
-            return self._send_simple_article_notification(article)
+            return self._send_simple_article_notification(article, duplicates)
 
         except Exception as e:
             logging.error(f"发送文章通知失败: {e}")
             return False
 
-    def _send_simple_article_notification(self, article: Dict) -> bool:
+    @staticmethod
+    def _format_read_count(read_count: int) -> str:
+        """阅读数格式化，过万显示为x.x万"""
+        return f"{read_count/10000:.1f}万" if read_count >= 10000 else str(read_count)
+
+    def _build_digest_paragraphs(self, article: Dict, duplicates: List[Dict] = None) -> List[List[Dict]]:
+        """
+        构建摘要消息中一篇文章的富文本段落
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            List[List[Dict]]: 富文本段落
+        """
+        meta_parts = [article.get('author') or '未知作者', article.get('publish_time') or '未知时间']
+        if (article.get('read_count') or 0) > 0:
+            meta_parts.append(f"👀 {self._format_read_count(article['read_count'])}阅读")
+        if (article.get('comment_count') or 0) > 0:
+            meta_parts.append(f"💬 {article['comment_count']}评论")
+
+        paragraphs = [
+            [{"tag": "a", "text": f"📄 {article.get('title', '未知标题')}", "href": article.get('url', '')}],
+            [{"tag": "text", "text": f"    {' | '.join(meta_parts)}"}]
+        ]
+
+        summary = article.get('summary')
+        if summary:
+            paragraphs.append([{"tag": "text", "text": f"    📝 {summary[:80] + '...' if len(summary) > 80 else summary}"}])
+
+        if duplicates:
+            line = [{"tag": "text", "text": f"    🔁 另有 {len(duplicates)} 个来源："}]
+            for duplicate in duplicates[:self.DIGEST_MAX_SOURCES]:
+                line.append({"tag": "a", "text": duplicate.get('author') or '未知作者', "href": duplicate.get('url', '')})
+                line.append({"tag": "text", "text": " "})
+            if len(duplicates) > self.DIGEST_MAX_SOURCES:
+                line.append({"tag": "text", "text": "等"})
+            paragraphs.append(line)
+
+        paragraphs.append([{"tag": "text", "text": ""}])
+        return paragraphs
+
+    def _payload_size(self, title: str, content: List[List[Dict]]) -> int:
+        """估算富文本消息请求体的字节数"""
+        post = {"msg_type": "post", "content": {"post": {"zh_cn": {"title": title, "content": content}}}}
+        return len(json.dumps(post).encode('utf-8')) + (128 if self.secret else 0)
+
+    def split_digest(self, groups: List[Tuple[Dict, List[Dict]]], max_articles: int = 10) -> List[List[int]]:
+        """
+        把文章分组切分成若干条摘要消息
+
+        每条消息最多 max_articles 篇文章，且请求体不超过飞书的大小上限。
+
+        Args:
+            groups: [(文章, 其他来源列表)] 列表
+            max_articles: 每条消息最多包含的文章数
+
+        Returns:
+            List[List[int]]: 每条消息包含的分组下标
+        """
+        chunks = []
+        current, content = [], []
+        for index, (article, duplicates) in enumerate(groups):
+            paragraphs = self._build_digest_paragraphs(article, duplicates)
+            if current and (len(current) >= max_articles or
+                            self._payload_size('📰 发现 99 篇新文章（99/99）', content + paragraphs) > self.MAX_PAYLOAD_BYTES):
+                chunks.append(current)
+                current, content = [], []
+            current.append(index)
+            content.extend(paragraphs)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def send_digest(self, groups: List[Tuple[Dict, List[Dict]]], max_articles: int = 10) -> List[bool]:
+        """
+        把多篇文章合并成富文本摘要消息发送
+
+        超过 max_articles 篇或超过请求体大小上限时自动拆分为多条消息。
+
+        Args:
+            groups: [(文章, 其他来源列表)] 列表
+            max_articles: 每条消息最多包含的文章数
+
+        Returns:
+            List[bool]: 每个分组是否发送成功
+        """
+        results = [False] * len(groups)
+        chunks = self.split_digest(groups, max_articles)
+        for number, chunk in enumerate(chunks, 1):
+            title = f"📰 发现 {len(chunk)} 篇新文章"
+            if len(chunks) > 1:
+                title += f"（{number}/{len(chunks)}）"
+
+            content = []
+            for index in chunk:
+                content.extend(self._build_digest_paragraphs(*groups[index]))
+
+            try:
+                success = self.send_rich_text_message(title, content)
+            except Exception as e:
+                logging.error(f"发送文章摘要失败: {e}")
+                success = False
+            for index in chunk:
+                results[index] = success
+        return results
+
+    def _send_simple_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
         """
         发送简单文本格式的文章通知
 
         Args:
             article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
 
         Returns:
             bool: 发送成功返回True
         """
         try:
-            # 构建消息内容
-            title = article.get('title', '未知标题')
-            author = article.get('author', '未知作者')
-            publish_time = article.get('publish_time', '未知时间')
-            url = article.get('url', '')
+            return self.send_text_message(self.format_article_text(article, duplicates))
 
-            # 构建统计信息
-            stats_parts = []
-            read_count = article.get('read_count', 0)
-            comment_count = article.get('comment_count', 0)
+        except Exception as e:
+            logging.error(f"发送简单文本通知失败: {e}")
+            return False
 
-            if read_count > 0:
-                if read_count >= 10000:
-                    read_text = f"{read_count/10000:.1f}万"
-                else:
-                    read_text = str(read_count)
-                stats_parts.append(f"👀 {read_text}阅读")
+    def format_article_text(self, article: Dict, duplicates: List[Dict] = None) -> str:
+        """
+        构建文本格式的文章通知内容
 
-            if comment_count > 0:
-                stats_parts.append(f"💬 {comment_count}评论")
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
 
-            stats_info = ""
-            if stats_parts:
-                stats_info = f"\n📊 数据：{' | '.join(stats_parts)}"
+        Returns:
+            str: 消息文本
+        """
+        # 构建消息内容
+        title = article.get('title', '未知标题')
+        author = article.get('author') or '未知作者'
+        publish_time = article.get('publish_time') or '未知时间'
+        url = article.get('url', '')
 
-            # 构建摘要信息
-            summary_info = ""
-            if article.get('summary'):
-                summary = article['summary']
-                if len(summary) > 150:
-                    summary = summary[:150] + "..."
-                summary_info = f"\n📝 摘要：{summary}"
+        # 构建统计信息
+        stats_parts = []
+        read_count = article.get('read_count') or 0
+        comment_count = article.get('comment_count') or 0
 
-            # 构建完整消息
-            message = f"""📰 发现新文章！
+        if read_count > 0:
+            if read_count >= 10000:
+                read_text = f"{read_count/10000:.1f}万"
+            else:
+                read_text = str(read_count)
+            stats_parts.append(f"👀 {read_text}阅读")
+
+        if comment_count > 0:
+            stats_parts.append(f"💬 {comment_count}评论")
+
+        stats_info = ""
+        if stats_parts:
+            stats_info = f"\n📊 数据：{' | '.join(stats_parts)}"
+
+        # 构建摘要信息
+        summary_info = ""
+        if article.get('summary'):
+            summary = article['summary']
+            if len(summary) > 150:
+                summary = summary[:150] + "..."
+            summary_info = f"\n📝 摘要：{summary}"
+
+        # 构建其他来源信息
+        sources_info = ""
+        if duplicates:
+            sources = '\n'.join(
+                f"  • {d.get('author') or '未知作者'}：{d.get('url', '')}" for d in duplicates
+            )
+            sources_info = f"\n\n🔁 另有 {len(duplicates)} 个来源发布了相同内容：\n{sources}"
+
+        # 构建完整消息
+        return f"""📰 发现新文章！
 
 📄 标题：{title}
 👤 作者：{author}
 ⏰ 时间：{publish_time}{stats_info}{summary_info}
 
+🔗 链接：{url}{sources_info}"""
+
+    def update_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        补发文章详情（先按列表页信息通知、详情补全后调用）
+
+        自定义机器人不能编辑已发送的消息，补发一条包含作者、发布时间和摘要的跟进消息。
+
+        Args:
+            article: 补全详情后的文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        try:
+            summary = article.get('summary') or ''
+            if len(summary) > 150:
+                summary = summary[:150] + "..."
+            message = f"""📝 文章详情补充
+
+📄 标题：{article.get('title', '未知标题')}
+👤 作者：{article.get('author') or '未知作者'}
+⏰ 时间：{article.get('publish_time') or '未知时间'}""" + (f"\n📝 摘要：{summary}" if summary else "") + f"""
+
+🔗 链接：{article.get('url', '')}"""
+            return self.send_text_message(message)
+
+        except Exception as e:
+            logging.error(f"发送文章详情补充失败: {e}")
+            return False
+
+    def send_trending_notification(self, article: Dict) -> bool:
+        """
+        发送热门文章提醒
+
+        Args:
+            article: 文章信息字典，包含 velocity 和 acceleration 字段
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        try:
+            title = article.get('title', '未知标题')
+            url = article.get('url', '')
+            read_count = article.get('read_count', 0)
+            velocity = article.get('velocity', 0)
+            acceleration = article.get('acceleration')
+
+            read_text = f"{read_count/10000:.1f}万" if read_count >= 10000 else str(read_count)
+            trend_info = f"\n📈 加速度：{acceleration:+.0f} 阅读/小时²" if acceleration is not None else ""
+
+            message = f"""🔥 文章阅读量快速上涨！
+
+📄 标题：{title}
+👀 当前阅读：{read_text}
+🚀 阅读速度：{velocity:.0f} 阅读/小时{trend_info}
+
 🔗 链接：{url}"""
 
             return self.send_text_message(message)
 
         except Exception as e:
-            logging.error(f"发送简单文本通知失败: {e}")
+            logging.error(f"发送热门文章提醒失败: {e}")
             return False
 
     def send_rich_article_notification(self, article: Dict) -> bool:
@@ -264,33 +595,77 @@ class FeishuNotifier:
         Returns:
             bool: 发送成功返回True
         """
+        for attempt in range(self.rate_limit_retries + 1):
+            # 按机器人限流：令牌不足或被限流暂停期间在这里排队
+            self.rate_limiter.acquire()
+            status, retry_after = self._post(data)
+            if status != 'rate_limited':
+                return status == 'ok'
+
+            self.rate_limiter.on_rate_limited(retry_after)
+            logging.warning(f"飞书机器人触发限流，降速后重试（第 {attempt + 1} 次）")
+
+        logging.error(f"飞书机器人持续限流，放弃发送（已重试 {self.rate_limit_retries} 次）")
+        return False
+
+    @classmethod
+    def _rate_limit_retry_after(cls, response, result: Dict = None):
+        """
+        判断响应是否为限流
+
+        Returns:
+            限流时返回服务端建议的等待秒数（没有建议时为0），否则返回None
+        """
+        code = (result or {}).get('code', (result or {}).get('StatusCode'))
+        if response.status_code != 429 and code not in cls.RATE_LIMIT_CODES:
+            return None
         try:
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(
+            return float(response.headers.get('Retry-After', 0))
+        except ValueError:
+            return 0.0
+
+    def _post(self, data: Dict) -> tuple:
+        """
+        发送一次请求
+
+        Returns:
+            tuple: (状态 ok/rate_limited/error, 限流时建议的等待秒数)
+        """
+        start = time.perf_counter()
+        success = False
+        try:
+            response = self.session.post(
                 self.webhook_url,
-                headers=headers,
                 data=json.dumps(data),
-                timeout=10
+                timeout=self.timeout
             )
-            
-            if response.status_code == 200:
+
+            try:
                 result = response.json()
-                if result.get('StatusCode') == 0:
+            except ValueError:
+                result = None
+
+            retry_after = self._rate_limit_retry_after(response, result)
+            if retry_after is not None:
+                return 'rate_limited', retry_after
+
+            if response.status_code == 200 and result is not None:
+                if result.get('StatusCode') == 0 or result.get('code') == 0:
                     logging.info("飞书消息发送成功")
-                    return True
-                else:
-                    logging.error(f"飞书消息发送失败: {result}")
-                    return False
-            else:
-                logging.error(f"飞书API请求失败: {response.status_code}, {response.text}")
-                return False
-                
+                    success = True
+                    self.rate_limiter.on_success()
+                    return 'ok', None
+                logging.error(f"飞书消息发送失败: {result}")
+                return 'error', None
+
+            logging.error(f"飞书API请求失败: {response.status_code}, {response.text}")
+            return 'error', None
+
         except Exception as e:
             logging.error(f"发送飞书消息异常: {e}")
-            return False
+            return 'error', None
+        finally:
+            self._record_latency(time.perf_counter() - start, success)
     
     def test_connection(self) -> bool:
         """
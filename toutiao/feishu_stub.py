@@ -0,0 +1,290 @@
+"""
+本地飞书机器人模拟服务
+实现自定义机器人 Webhook 协议（含签名校验），可配置响应延迟、错误率和限流，记录收到的消息，
+用于离线测试通知器和压测，不会向真实的飞书群发送消息
+"""
+
+import sys
+import json
+import time
+import hmac
+import base64
+import random
+import socket
+import hashlib
+import argparse
+import logging
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# 飞书自定义机器人的响应
+SUCCESS_RESPONSE = {'StatusCode': 0, 'StatusMessage': 'success', 'code': 0, 'data': {}, 'msg': 'success'}
+RATE_LIMITED_RESPONSE = {'code': 9499, 'msg': 'too many request', 'data': {}}
+SIGN_FAILED_RESPONSE = {'code': 19021, 'msg': 'sign match fail or timestamp is not within one hour from current time', 'data': {}}
+TOKEN_INVALID_RESPONSE = {'code': 19001, 'msg': 'param invalid: incoming webhook access token invalid', 'data': {}}
+BAD_REQUEST_RESPONSE = {'code': 19002, 'msg': 'params error', 'data': {}}
+
+WEBHOOK_PATH = '/open-apis/bot/v2/hook/'
+
+
+def generate_sign(timestamp: str, secret: str) -> str:
+    """
+    按飞书规则计算签名：以 "<时间戳>\\n<密钥>" 为 HMAC-SHA256 的密钥、空串为消息，结果 Base64 编码
+
+    与 FeishuNotifier._generate_sign 的算法一致，模拟服务用它独立校验通知器的签名。
+    """
+    hmac_code = hmac.new(f"{timestamp}\n{secret}".encode('utf-8'), digestmod=hashlib.sha256).digest()
+    return base64.b64encode(hmac_code).decode('utf-8')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """处理机器人 Webhook 请求"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # 响应头和响应体分两次写出，关闭 Nagle 算法避免与客户端的延迟确认叠加出约40ms的等待
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _reply(self, status: int, result: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub: FeishuWebhookStub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, result, headers = stub.handle(self.path, body)
+        self._reply(status, result, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeishuWebhookStub:
+    """本地飞书机器人模拟服务"""
+
+    # 飞书自定义机器人请求体上限
+    MAX_BODY_BYTES = 20 * 1024
+    # 签名时间戳允许的最大偏差（秒）
+    TIMESTAMP_TOLERANCE = 3600
+
+    def __init__(self, secret: str = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_per_second: float = None, rate_per_minute: float = None,
+                 rate_limit_status: int = 200, retry_after: float = None,
+                 max_records: int = 100000, seed: int = None):
+        """
+        初始化模拟服务
+
+        Args:
+            secret: 机器人密钥，配置后校验请求中的 timestamp 和 sign
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+            latency: 每个请求的固定响应延迟（秒）
+            latency_jitter: 在固定延迟上叠加的随机延迟上限（秒）
+            error_rate: 随机返回 HTTP 500 的比例（0-1）
+            rate_per_second: 每秒最多接受的请求数，超过返回限流错误码，None 表示不限
+            rate_per_minute: 每分钟最多接受的请求数，None 表示不限
+            rate_limit_status: 限流响应的 HTTP 状态码（飞书返回200，可设为429测试通用处理）
+            retry_after: 限流响应带的 Retry-After 秒数（可选）
+            max_records: 最多保留的已接收消息条数
+            seed: 随机数种子，固定后错误注入和延迟抖动可以复现
+        """
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_per_second = rate_per_second
+        self.rate_per_minute = rate_per_minute
+        self.rate_limit_status = rate_limit_status
+        self.retry_after = retry_after
+
+        self.received: deque = deque(maxlen=max_records)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._second_window: deque = deque()
+        self._minute_window: deque = deque()
+        self._counts: Counter = Counter()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        """机器人 Webhook URL"""
+        host, port = self._server.server_address[:2] if self._server else (self.host, self.port)
+        return f'http://{host}:{port}{WEBHOOK_PATH}stub'
+
+    def start(self) -> 'FeishuWebhookStub':
+        """在后台线程启动服务"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, name='feishu-stub', daemon=True).start()
+        logging.info(f"飞书机器人模拟服务已启动: {self.url}")
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FeishuWebhookStub':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _rate_limited(self, now: float) -> bool:
+        """按滑动窗口判断是否超过频率限制，未超过时计入本次请求"""
+        windows = [(self._second_window, 1.0, self.rate_per_second),
+                   (self._minute_window, 60.0, self.rate_per_minute)]
+        for window, span, limit in windows:
+            while window and window[0] <= now - span:
+                window.popleft()
+            if limit is not None and len(window) >= limit:
+                return True
+        for window, _, _ in windows:
+            window.append(now)
+        return False
+
+    def _verify_sign(self, data: Dict) -> bool:
+        """校验签名和时间戳"""
+        timestamp, sign = str(data.get('timestamp', '')), data.get('sign')
+        if not timestamp.isdigit() or not sign:
+            return False
+        if abs(time.time() - int(timestamp)) > self.TIMESTAMP_TOLERANCE:
+            return False
+        return hmac.compare_digest(sign, generate_sign(timestamp, self.secret))
+
+    def handle(self, path: str, body: bytes) -> tuple:
+        """
+        处理一次请求
+
+        Args:
+            path: 请求路径
+            body: 请求体
+
+        Returns:
+            tuple: (HTTP状态码, 响应JSON, 附加响应头)
+        """
+        with self._lock:
+            self._counts['requests'] += 1
+            delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+            inject_error = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+
+        if not path.startswith(WEBHOOK_PATH):
+            return self._count('token_invalid', 404, TOKEN_INVALID_RESPONSE)
+        if inject_error:
+            return self._count('errors', 500, {'code': 500, 'msg': 'injected internal error'})
+        if len(body) > self.MAX_BODY_BYTES:
+            return self._count('bad_request', 400, BAD_REQUEST_RESPONSE)
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return self._count('bad_request', 400, BAD_REQUEST_RESPONSE)
+        if not isinstance(data, dict) or not data.get('msg_type'):
+            return self._count('bad_request', 400, BAD_REQUEST_RESPONSE)
+
+        if self.secret and not self._verify_sign(data):
+            return self._count('sign_failed', 200, SIGN_FAILED_RESPONSE)
+
+        with self._lock:
+            rate_limited = self._rate_limited(time.monotonic())
+        if rate_limited:
+            headers = {'Retry-After': f'{self.retry_after:g}'} if self.retry_after is not None else None
+            return self._count('rate_limited', self.rate_limit_status, RATE_LIMITED_RESPONSE, headers)
+
+        with self._lock:
+            self.received.append({
+                'received_at': time.time(),
+                'msg_type': data['msg_type'],
+                'content': data.get('content', data.get('card')),
+            })
+        return self._count('accepted', 200, SUCCESS_RESPONSE)
+
+    def _count(self, outcome: str, status: int, result: Dict, headers: Dict[str, str] = None) -> tuple:
+        with self._lock:
+            self._counts[outcome] += 1
+        return status, result, headers
+
+    def messages(self, msg_type: str = None) -> List[Dict]:
+        """
+        已接收的消息
+
+        Args:
+            msg_type: 只返回该类型的消息（可选）
+
+        Returns:
+            List[Dict]: 消息列表，包含 received_at、msg_type、content
+        """
+        with self._lock:
+            return [message for message in self.received if msg_type is None or message['msg_type'] == msg_type]
+
+    def get_stats(self) -> Dict:
+        """
+        获取请求统计
+
+        Returns:
+            Dict: requests、accepted、rate_limited、sign_failed、errors、bad_request、token_invalid
+        """
+        with self._lock:
+            return {key: self._counts[key] for key in
+                    ('requests', 'accepted', 'rate_limited', 'sign_failed', 'errors', 'bad_request', 'token_invalid')}
+
+    def reset(self):
+        """清空已接收的消息、统计和限流窗口"""
+        with self._lock:
+            self.received.clear()
+            self._counts.clear()
+            self._second_window.clear()
+            self._minute_window.clear()
+
+
+def main():
+    """命令行启动模拟服务，把配置文件中的 webhook_url 指向输出的地址即可离线联调"""
+    parser = argparse.ArgumentParser(description='本地飞书机器人模拟服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口 (默认: 8765)')
+    parser.add_argument('--secret', help='机器人密钥，配置后校验签名')
+    parser.add_argument('--latency', type=float, default=0.0, help='响应延迟秒数')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='随机附加延迟上限秒数')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机返回500的比例 (0-1)')
+    parser.add_argument('--rate-per-second', type=float, help='每秒最多接受的请求数')
+    parser.add_argument('--rate-per-minute', type=float, help='每分钟最多接受的请求数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stub = FeishuWebhookStub(
+        secret=args.secret, host=args.host, port=args.port, latency=args.latency,
+        latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+        rate_per_second=args.rate_per_second, rate_per_minute=args.rate_per_minute
+    ).start()
+    print(f"Webhook URL: {stub.url}")
+    try:
+        while True:
+            time.sleep(10)
+            stats = stub.get_stats()
+            print(f"请求 {stats['requests']}，接受 {stats['accepted']}，限流 {stats['rate_limited']}，"
+                  f"签名失败 {stats['sign_failed']}，错误 {stats['errors']}")
+    except KeyboardInterrupt:
+        stub.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,570 @@
+"""
+数据库迁移模块
+按 PRAGMA user_version 记录的版本号顺序执行结构迁移，每次升级在一个事务中完成；
+需要扫描整张表的数据回填不放在迁移事务中，提交后分批执行
+"""
+
+import sqlite3
+import logging
+from typing import Callable, Dict, List, Tuple
+
+
+def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, definition: str):
+    """
+    字段不存在时添加字段
+
+    没有版本号的旧数据库可能已经包含部分字段，迁移需要对这种情况保持幂等。
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        logging.info(f"添加{table}.{column}字段")
+
+
+def _schedule_backfill(conn: sqlite3.Connection, name: str):
+    """
+    登记迁移提交后需要分批回填的历史文章
+
+    回填范围是登记时已有的文章（id 不超过 max_id），回填进度记录在 last_id 中，中断后下次启动继续。
+    范围内尚未回填的文章由回填负责，相关触发器通过 _NOT_PENDING 条件跳过它们。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            max_id INTEGER NOT NULL
+        )
+    ''')
+    max_id = conn.execute('SELECT MAX(id) FROM articles').fetchone()[0]
+    if max_id:
+        conn.execute('INSERT OR REPLACE INTO schema_backfills (name, last_id, max_id) VALUES (?, 0, ?)', (name, max_id))
+
+
+def _not_pending(name: str, row: str) -> str:
+    """触发器条件：文章不在尚未回填的范围内"""
+    return (f"NOT EXISTS (SELECT 1 FROM schema_backfills WHERE name = '{name}' "
+            f"AND {row}.id > last_id AND {row}.id <= max_id)")
+
+
+def _create_articles(conn: sqlite3.Connection):
+    """文章表"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            publish_time TEXT,
+            author TEXT,
+            summary TEXT,
+            read_count INTEGER DEFAULT 0,
+            comment_count INTEGER DEFAULT 0,
+            created_at TEXT NOT NULL,
+            notified BOOLEAN DEFAULT FALSE
+        )
+    ''')
+    # 最早版本的文章表没有阅读数和评论数
+    _add_column_if_missing(conn, 'articles', 'read_count', 'INTEGER DEFAULT 0')
+    _add_column_if_missing(conn, 'articles', 'comment_count', 'INTEGER DEFAULT 0')
+
+
+def _create_bloggers(conn: sqlite3.Connection):
+    """博主表，以及文章的博主归属字段和按博主查询的索引"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bloggers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT UNIQUE NOT NULL,
+            name TEXT,
+            url TEXT NOT NULL,
+            last_fingerprint TEXT,
+            last_crawl_time TEXT,
+            crawl_count INTEGER DEFAULT 0,
+            fail_count INTEGER DEFAULT 0,
+            article_count INTEGER DEFAULT 0,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    _add_column_if_missing(conn, 'articles', 'blogger_id', 'INTEGER REFERENCES bloggers(id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_blogger_created ON articles(blogger_id, created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_blogger_notified ON articles(blogger_id, notified, created_at)')
+
+
+def _create_article_stats(conn: sqlite3.Connection):
+    """文章阅读/评论数时间序列表（只追加，数值不变时不写入）"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS article_stats (
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            ts INTEGER NOT NULL,
+            reads INTEGER NOT NULL,
+            comments INTEGER NOT NULL,
+            PRIMARY KEY (article_id, ts)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _add_trending_alerted(conn: sqlite3.Connection):
+    """热门提醒时间字段"""
+    _add_column_if_missing(conn, 'articles', 'trending_alerted_at', 'INTEGER')
+
+
+def _create_articles_fts(conn: sqlite3.Connection):
+    """
+    文章全文索引
+
+    外部内容表，只保存索引不重复存储正文，由触发器与文章表保持同步。
+    中文没有空格分词，使用字符三元组（trigram）分词器；旧版本SQLite（<3.34）不支持时退回unicode61。
+    已有文章的索引在迁移提交后由 _backfill_articles_fts 分批建立。
+    """
+    _schedule_backfill(conn, 'articles_fts')
+    tokenizer = 'trigram' if sqlite3.sqlite_version_info >= (3, 34, 0) else 'unicode61'
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title, summary, author,
+            content='articles', content_rowid='id',
+            tokenize='{tokenizer}'
+        )
+    ''')
+    # 尚未回填的文章不在索引中，不能对它们执行 'delete'，否则会破坏外部内容表的索引
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles
+        WHEN {_not_pending('articles_fts', 'new')} BEGIN
+            INSERT INTO articles_fts (rowid, title, summary, author)
+            VALUES (new.id, new.title, new.summary, new.author);
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles
+        WHEN {_not_pending('articles_fts', 'old')} BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, summary, author)
+            VALUES ('delete', old.id, old.title, old.summary, old.author);
+        END
+    ''')
+    # 只在索引字段变化时更新索引，阅读数等字段的频繁更新不会触发重建
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary, author ON articles
+        WHEN {_not_pending('articles_fts', 'old')} BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, summary, author)
+            VALUES ('delete', old.id, old.title, old.summary, old.author);
+            INSERT INTO articles_fts (rowid, title, summary, author)
+            VALUES (new.id, new.title, new.summary, new.author);
+        END
+    ''')
+
+
+def _backfill_articles_fts(conn: sqlite3.Connection, first_id: int, last_id: int):
+    """为一批已有文章建立全文索引"""
+    conn.execute('''
+        INSERT INTO articles_fts (rowid, title, summary, author)
+        SELECT id, title, summary, author FROM articles WHERE id BETWEEN ? AND ?
+    ''', (first_id, last_id))
+
+
+def _create_simhash_index(conn: sqlite3.Connection):
+    """近似重复检测：文章SimHash指纹、重复归属，以及按指纹分段分桶的LSH索引"""
+    _add_column_if_missing(conn, 'articles', 'simhash', 'INTEGER')
+    _add_column_if_missing(conn, 'articles', 'duplicate_of', 'INTEGER REFERENCES articles(id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS article_simhash_bands (
+            band INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            PRIMARY KEY (band, value, article_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_duplicate_of ON articles(duplicate_of)')
+
+
+def _create_article_summary(conn: sqlite3.Connection):
+    """
+    按博主汇总的文章计数表，由触发器随文章增删改增量维护，查询状态时不再扫描文章表
+
+    没有博主归属的文章记在 blogger_id = 0 下。已有文章的计数在迁移提交后由 _backfill_article_summary 分批累加。
+    """
+    _schedule_backfill(conn, 'article_summary')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS article_summary (
+            blogger_id INTEGER PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            unnotified INTEGER NOT NULL DEFAULT 0,
+            last_article_at TEXT
+        )
+    ''')
+    # 尚未回填的文章由回填计入，触发器跳过它们，避免重复计数或减去未计入的文章
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS article_summary_insert AFTER INSERT ON articles
+        WHEN {_not_pending('article_summary', 'new')} BEGIN
+            INSERT INTO article_summary (blogger_id, total, unnotified, last_article_at)
+            VALUES (COALESCE(new.blogger_id, 0), 1, new.notified IS FALSE, new.created_at)
+            ON CONFLICT(blogger_id) DO UPDATE SET
+                total = total + 1,
+                unnotified = unnotified + excluded.unnotified,
+                last_article_at = MAX(COALESCE(last_article_at, ''), excluded.last_article_at);
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS article_summary_delete AFTER DELETE ON articles
+        WHEN {_not_pending('article_summary', 'old')} BEGIN
+            UPDATE article_summary
+            SET total = total - 1, unnotified = unnotified - (old.notified IS FALSE)
+            WHERE blogger_id = COALESCE(old.blogger_id, 0);
+        END
+    ''')
+    # 通知状态或博主归属变化时，先从旧分组减去再加到新分组
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS article_summary_update AFTER UPDATE OF notified, blogger_id ON articles
+        WHEN (old.notified IS NOT new.notified OR old.blogger_id IS NOT new.blogger_id)
+            AND {_not_pending('article_summary', 'old')} BEGIN
+            UPDATE article_summary
+            SET total = total - 1, unnotified = unnotified - (old.notified IS FALSE)
+            WHERE blogger_id = COALESCE(old.blogger_id, 0);
+            INSERT INTO article_summary (blogger_id, total, unnotified, last_article_at)
+            VALUES (COALESCE(new.blogger_id, 0), 1, new.notified IS FALSE, new.created_at)
+            ON CONFLICT(blogger_id) DO UPDATE SET
+                total = total + 1,
+                unnotified = unnotified + excluded.unnotified,
+                last_article_at = MAX(COALESCE(last_article_at, ''), excluded.last_article_at);
+        END
+    ''')
+
+
+def _backfill_article_summary(conn: sqlite3.Connection, first_id: int, last_id: int):
+    """把一批已有文章的计数累加到汇总表"""
+    conn.execute('''
+        INSERT INTO article_summary (blogger_id, total, unnotified, last_article_at)
+        SELECT COALESCE(blogger_id, 0), COUNT(*), COALESCE(SUM(notified IS FALSE), 0), MAX(created_at)
+        FROM articles
+        WHERE id BETWEEN ? AND ?
+        GROUP BY COALESCE(blogger_id, 0)
+        ON CONFLICT(blogger_id) DO UPDATE SET
+            total = total + excluded.total,
+            unnotified = unnotified + excluded.unnotified,
+            last_article_at = MAX(COALESCE(last_article_at, ''), excluded.last_article_at)
+    ''', (first_id, last_id))
+
+
+def _create_notification_outbox(conn: sqlite3.Connection):
+    """
+    通知发件箱
+
+    文章入库时在同一事务中写入待发送记录，由后台投递线程发送：
+    pending 等待发送，sending 已被投递线程领取，sent 已送达，dead 超过重试次数进入死信。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT UNIQUE NOT NULL,
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            delivered_targets TEXT NOT NULL DEFAULT '[]',
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT,
+            sent_at TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status_due ON notification_outbox(status, next_attempt_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_article ON notification_outbox(article_id)')
+
+
+def _create_notification_deliveries(conn: sqlite3.Connection):
+    """
+    通知投递记录
+
+    每篇文章发送到每个通知目标记录一行，便于按目标统计成功率和耗时、排查某个群没有收到的通知。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS notification_deliveries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id TEXT NOT NULL,
+            target TEXT NOT NULL,
+            success BOOLEAN NOT NULL,
+            error TEXT,
+            elapsed_ms REAL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_deliveries_article ON notification_deliveries(article_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_deliveries_target ON notification_deliveries(target, created_at)')
+
+
+def _add_alert_latency(conn: sqlite3.Connection):
+    """投递记录增加告警延迟：从在列表页发现文章到通知送达该目标的毫秒数"""
+    _add_column_if_missing(conn, 'notification_deliveries', 'alert_latency_ms', 'REAL')
+
+
+def _create_check_cycles(conn: sqlite3.Connection):
+    """
+    检查周期记录
+
+    每轮检查记录一行开始时间、耗时和当时的检查间隔，用于发现耗时超过间隔（超时）的周期和耗时的变化趋势。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS check_cycles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            interval_seconds REAL,
+            overrun BOOLEAN NOT NULL DEFAULT FALSE,
+            bloggers INTEGER
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_check_cycles_started ON check_cycles(started_at)')
+
+
+def _create_archived_articles(conn: sqlite3.Connection):
+    """
+    已归档文章的ID
+
+    文章归档后从文章表删除，只保留ID；博主列表页仍显示旧文章（如置顶文章）时据此识别为已有文章，不会重新入库和通知。
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archived_articles (
+            article_id TEXT PRIMARY KEY,
+            archived_at TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+
+
+def _add_outbox_claimed_at(conn: sqlite3.Connection):
+    """发件箱记录的领取时间（Unix秒），投递中的记录超过租约时间未完成才会被其他投递方重新领取"""
+    _add_column_if_missing(conn, 'notification_outbox', 'claimed_at', 'REAL')
+
+
+def _add_deliveries_created_index(conn: sqlite3.Connection):
+    """投递记录按时间的索引，统计最近一段时间和删除过期记录时不扫描全表"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_deliveries_created ON notification_deliveries(created_at)')
+
+
+def _create_routing_stats(conn: sqlite3.Connection):
+    """路由规则命中次数，监控进程路由文章时累加，status 等命令从数据库读取"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS routing_stats (
+            rule_name TEXT PRIMARY KEY,
+            matches INTEGER NOT NULL DEFAULT 0,
+            last_matched_at TEXT
+        ) WITHOUT ROWID
+    ''')
+
+
+# 短关键词索引只覆盖每个字段的前这么多个字
+GRAM_MAX_POSITION = 4096
+
+# 字段中每个位置起的两个字（最后一个位置只有一个字），转为小写，与 LIKE 一样只忽略ASCII大小写
+_FIELD_GRAMS = '''
+    INSERT OR IGNORE INTO article_grams (gram, article_id)
+    SELECT lower(substr({field}, n, 2)), {row}.id FROM gram_positions WHERE n <= length({field})
+'''
+
+
+def _create_article_grams(conn: sqlite3.Connection):
+    """
+    短关键词索引
+
+    三元组全文索引无法查询一两个字的关键词。这里为标题、摘要和作者记录每个位置起的两个字，
+    两个字的关键词按二元组等值查询，一个字的按前缀范围查询，都走主键索引。
+    触发器中不能用递归CTE拆分文本，用静态的位置表代替；已有文章由 _backfill_article_grams 分批建立索引。
+    """
+    _schedule_backfill(conn, 'article_grams')
+    conn.execute('CREATE TABLE IF NOT EXISTS gram_positions (n INTEGER PRIMARY KEY)')
+    conn.execute(f'''
+        INSERT OR IGNORE INTO gram_positions (n)
+        WITH RECURSIVE positions(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM positions WHERE n < {GRAM_MAX_POSITION})
+        SELECT n FROM positions
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS article_grams (
+            gram TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (gram, article_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_article_grams_article ON article_grams(article_id)')
+
+    insert_grams = ';'.join(_FIELD_GRAMS.format(field=f'new.{field}', row='new')
+                            for field in ('title', 'summary', 'author'))
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS article_grams_insert AFTER INSERT ON articles
+        WHEN {_not_pending('article_grams', 'new')} BEGIN
+            {insert_grams};
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS article_grams_delete AFTER DELETE ON articles BEGIN
+            DELETE FROM article_grams WHERE article_id = old.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS article_grams_update AFTER UPDATE OF title, summary, author ON articles
+        WHEN {_not_pending('article_grams', 'old')} BEGIN
+            DELETE FROM article_grams WHERE article_id = old.id;
+            {insert_grams};
+        END
+    ''')
+
+
+def _backfill_article_grams(conn: sqlite3.Connection, first_id: int, last_id: int):
+    """为一批已有文章建立短关键词索引"""
+    for field in ('title', 'summary', 'author'):
+        conn.execute(f'''
+            INSERT OR IGNORE INTO article_grams (gram, article_id)
+            SELECT lower(substr(a.{field}, p.n, 2)), a.id
+            FROM articles a JOIN gram_positions p ON p.n <= length(a.{field})
+            WHERE a.id BETWEEN ? AND ?
+        ''', (first_id, last_id))
+
+
+# 迁移注册表：(版本号, 说明, 迁移函数)，版本号必须连续递增，已发布的迁移不要修改
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, '创建文章表', _create_articles),
+    (2, '博主表与文章博主归属', _create_bloggers),
+    (3, '文章统计时间序列表', _create_article_stats),
+    (4, '热门提醒字段', _add_trending_alerted),
+    (5, '文章全文索引', _create_articles_fts),
+    (6, '近似重复文章索引', _create_simhash_index),
+    (7, '文章计数汇总表', _create_article_summary),
+    (8, '通知发件箱', _create_notification_outbox),
+    (9, '通知投递记录', _create_notification_deliveries),
+    (10, '告警延迟字段', _add_alert_latency),
+    (11, '检查周期记录', _create_check_cycles),
+    (12, '已归档文章ID', _create_archived_articles),
+    (13, '发件箱领取时间', _add_outbox_claimed_at),
+    (14, '投递记录时间索引', _add_deliveries_created_index),
+    (15, '路由规则命中次数', _create_routing_stats),
+    (16, '短关键词索引', _create_article_grams),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# 回填注册表：名称 -> 回填函数（参数为连接和本批文章的首尾 id），名称与迁移中 _schedule_backfill 登记的一致
+BACKFILLS: Dict[str, Callable[[sqlite3.Connection, int, int], None]] = {
+    'articles_fts': _backfill_articles_fts,
+    'article_summary': _backfill_article_summary,
+    'article_grams': _backfill_article_grams,
+}
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    读取数据库结构版本号
+
+    Args:
+        conn: 数据库连接
+
+    Returns:
+        int: 当前版本号，新数据库为0
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Tuple[int, str]]:
+    """
+    列出尚未执行的迁移
+
+    Args:
+        conn: 数据库连接
+
+    Returns:
+        List[Tuple[int, str]]: (版本号, 说明) 列表
+    """
+    version = get_schema_version(conn)
+    return [(number, description) for number, description, _ in MIGRATIONS if number > version]
+
+
+def run_backfills(db_path: str, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    分批执行迁移登记的数据回填
+
+    按文章 id 分页，每批一个短事务并推进进度，回填期间其他连接仍可写入；中断后下次调用从进度处继续。
+
+    Args:
+        db_path: 数据库文件路径
+        batch_size: 每批回填的文章数
+
+    Returns:
+        Dict[str, int]: 回填名称到本次回填文章数的映射
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_backfills'").fetchone():
+            return {}
+
+        filled = {}
+        for name, last_id, max_id in conn.execute('SELECT name, last_id, max_id FROM schema_backfills').fetchall():
+            backfill = BACKFILLS[name]
+            filled[name] = 0
+            while last_id < max_id:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    ids = [row[0] for row in conn.execute(
+                        'SELECT id FROM articles WHERE id > ? AND id <= ? ORDER BY id LIMIT ?',
+                        (last_id, max_id, batch_size)
+                    )]
+                    # 最后一批之后范围内没有更多文章，进度直接推进到 max_id
+                    end = ids[-1] if len(ids) == batch_size else max_id
+                    if ids:
+                        backfill(conn, ids[0], end)
+                    if end >= max_id:
+                        conn.execute('DELETE FROM schema_backfills WHERE name = ?', (name,))
+                    else:
+                        conn.execute('UPDATE schema_backfills SET last_id = ? WHERE name = ?', (end, name))
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                filled[name] += len(ids)
+                last_id = end
+            logging.info(f"数据回填 {name} 完成，共 {filled[name]} 篇文章")
+        return filled
+    finally:
+        conn.close()
+
+
+def migrate(db_path: str) -> List[int]:
+    """
+    把数据库升级到最新版本
+
+    已是最新版本且没有未完成的回填时只读取 user_version，不执行任何DDL。
+    否则在一个 IMMEDIATE 事务中依次执行未完成的迁移并写入新版本号；
+    任何一步失败都会整体回滚并抛出异常，数据库保持原版本。
+    迁移提交后再分批执行迁移登记的数据回填（见 run_backfills）。
+
+    Args:
+        db_path: 数据库文件路径
+
+    Returns:
+        List[int]: 本次执行的迁移版本号
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        applied = []
+        if get_schema_version(conn) < LATEST_VERSION:
+            # 新数据库启用增量回收，删除数据后可以分批归还空闲页；对已有表的旧数据库不生效，需执行一次 db vacuum
+            if get_schema_version(conn) == 0:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # 拿到写锁后重新读取版本号，其他进程可能已经完成了迁移
+                version = get_schema_version(conn)
+                for number, description, migration in MIGRATIONS:
+                    if number <= version:
+                        continue
+                    logging.info(f"执行数据库迁移 {number}: {description}")
+                    migration(conn)
+                    applied.append(number)
+
+                conn.execute(f'PRAGMA user_version = {LATEST_VERSION}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+            if applied:
+                logging.info(f"数据库已升级到版本 {LATEST_VERSION}")
+    finally:
+        conn.close()
+
+    run_backfills(db_path)
+    return applied
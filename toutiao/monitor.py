@@ -4,51 +4,272 @@
 """
 
 import json
+import hashlib
 import logging
 import time
-from datetime import datetime
-from typing import Dict, List
-from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-
-try:
-    from .crawler_selenium import ToutiaoSeleniumCrawler
-
-    SELENIUM_AVAILABLE = True
-    logging.info("使用优化后的Selenium爬虫")
-except ImportError:
-    pass
-from .database import ArticleDatabase
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .backup import DatabaseBackup
+from .crawler_pool import CrawlerPool, is_driver_error
+from .database import ArticleDatabase, extract_blogger_token
 from .feishu_notifier import FeishuNotifier
+from .notifier_registry import NotifierRegistry
+from .outbox import OutboxDispatcher
+from .retention import RetentionManager
+from .routing import NotificationRouter
+from .scheduling import CycleTracker
 
 
 class ArticleMonitor:
     """文章监控服务类"""
 
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", read_only: bool = False):
         """
         初始化监控服务
         
         Args:
             config_path: 配置文件路径
+            read_only: 只读打开数据库，不迁移、不登记博主、不归属历史文章（status 使用）
         """
         self.config = self._load_config(config_path)
         self.setup_logging()
+        self._read_only = read_only
 
-        # 初始化各个组件
-        self.crawler = ToutiaoSeleniumCrawler()
-        self.database = ArticleDatabase(self.config['database']['path'])
-        self.notifier = FeishuNotifier(
-            self.config['feishu']['webhook_url'],
-            self.config['feishu'].get('secret')
-        )
+        # 爬虫、数据库和通知组件在首次使用时才创建，status 等只读命令不会启动浏览器
+        self._crawler_pool = None
+        self._database = None
+        self._notifier = None
+        self._notifiers = None
+        self._blogger_id = None
+        self._outbox = None
+        self._cycle_tracker = None
+        # 监控运行时的调度器，超时策略通过它调整下一轮检查的时间
+        self._scheduler = None
+        # 本轮检查按超时策略要求的下一轮延迟（秒），检查任务结束后由调度器事件应用
+        self._next_check_delay: Optional[float] = None
+
+        # 通知路由规则（可选），规则在加载配置时编译
+        routing_config = self.config.get('routing')
+        # 命中次数写入数据库，status 命令在另一个进程中也能看到
+        self.router = (NotificationRouter.from_config(routing_config, on_match=self._record_rule_matches)
+                       if routing_config else None)
 
-        # 获取博主URL
-        self.blogger_url = self.config['toutiao']['blogger_url']
-        if not self.blogger_url:
+        # 摘要模式：按通知目标缓存待发送的文章分组，以及每篇文章尚未送达的目标
+        self._digest_pending: Dict[str, Dict] = {}
+        self._digest_outstanding: Dict[str, Dict] = {}
+
+        # 监控的博主；启用 bloggers_from_database 时还包括博主表中已登记的博主，在数据库初始化时加载
+        self._blogger_configs = self.load_blogger_configs(self.config['toutiao'])
+        self._bloggers_from_database = self.config['toutiao'].get('bloggers_from_database', False)
+        if not self._blogger_configs and not self._bloggers_from_database:
             raise ValueError("请在配置中设置博主URL")
+        self._bloggers: List[Dict] = []
+
+        self._last_stats_compaction = 0.0
+        # 抓取周期进行中时，数据维护任务让路
+        self._cycle_running = threading.Event()
+
+        self._enrich_executor: Optional[ThreadPoolExecutor] = None
+        # 从发现文章到通知送达的耗时（秒），以及发件箱模式下等待投递的文章的发现时间
+        self._alert_latencies = deque(maxlen=500)
+        self._discovered_at: 'OrderedDict[str, float]' = OrderedDict()
+        # 本进程最近通知过的文章ID：通知在后台线程发送，同一轮中稍后入库的转载据此识别首发文章已通知
+        self._recently_notified: 'OrderedDict[str, None]' = OrderedDict()
+        # 检查周期中发送通知的线程，入库由调度线程完成，发送不阻塞下一位博主的处理
+        self._notify_executor: Optional[ThreadPoolExecutor] = None
+
+        if len(self._blogger_configs) == 1 and not self._bloggers_from_database:
+            logging.info(f"监控服务初始化完成，博主URL: {self._blogger_configs[0]['url']}")
+        else:
+            logging.info(f"监控服务初始化完成，配置了 {len(self._blogger_configs)} 位博主" +
+                         ("，另加载博主表中登记的博主" if self._bloggers_from_database else ""))
+
+    @staticmethod
+    def load_blogger_configs(toutiao_config: Dict) -> List[Dict]:
+        """
+        读取配置中的博主
+
+        依次合并 blogger_url（单个博主，名称为 blogger_name）、bloggers 列表（URL字符串或 {url, name}）
+        和 bloggers_file 文件（.json 为同格式的列表，其他为每行 "URL [名称]" 的文本，# 开头为注释），
+        同一博主（按URL中的token识别）只保留第一次出现的。
+
+        Args:
+            toutiao_config: toutiao 配置节
+
+        Returns:
+            List[Dict]: [{'url': 博主URL, 'name': 博主名称或None}]
+        """
+        entries = []
+        if toutiao_config.get('blogger_url'):
+            entries.append({'url': toutiao_config['blogger_url'], 'name': toutiao_config.get('blogger_name')})
+        entries.extend(toutiao_config.get('bloggers', []))
+
+        bloggers_file = toutiao_config.get('bloggers_file')
+        if bloggers_file:
+            with open(bloggers_file, 'r', encoding='utf-8') as f:
+                if bloggers_file.endswith('.json'):
+                    entries.extend(json.load(f))
+                else:
+                    for line in f:
+                        fields = line.strip().split(None, 1)
+                        if fields and not fields[0].startswith('#'):
+                            entries.append({'url': fields[0], 'name': fields[1] if len(fields) > 1 else None})
+
+        bloggers, tokens = [], set()
+        for entry in entries:
+            blogger = {'url': entry, 'name': None} if isinstance(entry, str) else \
+                {'url': entry.get('url'), 'name': entry.get('name')}
+            if not blogger['url']:
+                continue
+            token = extract_blogger_token(blogger['url'])
+            if token not in tokens:
+                tokens.add(token)
+                bloggers.append(blogger)
+        return bloggers
+
+    @staticmethod
+    def _create_crawler():
+        """导入Selenium爬虫并启动浏览器"""
+        from .crawler_selenium import ToutiaoSeleniumCrawler
 
-        logging.info(f"监控服务初始化完成，博主URL: {self.blogger_url}")
+        return ToutiaoSeleniumCrawler()
+
+    @property
+    def crawler_pool(self) -> CrawlerPool:
+        """爬虫池，最多 toutiao.crawl_workers 个浏览器（默认1），借用时才启动浏览器"""
+        if self._crawler_pool is None:
+            self._crawler_pool = CrawlerPool(self._create_crawler, self.config['toutiao'].get('crawl_workers', 1))
+        return self._crawler_pool
+
+    @property
+    def crawler(self):
+        """爬虫池中的第一个爬虫，首次访问时才启动浏览器"""
+        return self.crawler_pool.first()
+
+    @crawler.setter
+    def crawler(self, crawler):
+        # 使用给定的爬虫，池中只有这一个浏览器
+        self._crawler_pool = CrawlerPool(self._create_crawler, crawlers=[crawler])
+
+    @property
+    def database(self) -> ArticleDatabase:
+        """数据库，首次访问时执行迁移并登记博主；只读模式下只检查结构版本并读取已登记的博主"""
+        if self._database is None:
+            database_config = self.config['database']
+            database = ArticleDatabase(
+                database_config['path'],
+                async_writes=database_config.get('async_writes', False) and not self._read_only,
+                writer_options={
+                    'max_queue_size': database_config.get('write_queue_size', 1000),
+                    'max_batch_size': database_config.get('write_batch_size', 100),
+                    'max_batch_delay': database_config.get('write_batch_delay', 0.05)
+                },
+                read_only=self._read_only
+            )
+
+            # 登记配置的博主，并把单博主时代没有归属的历史文章归到第一位博主
+            bloggers = []
+            if self._read_only:
+                # 只读模式按token匹配已登记的博主，尚未登记的博主跳过
+                registered = {row['token']: row['id'] for row in database.get_bloggers()}
+                for blogger in self._blogger_configs:
+                    blogger_id = registered.get(extract_blogger_token(blogger['url']))
+                    if blogger_id is not None:
+                        bloggers.append(dict(blogger, id=blogger_id))
+            else:
+                for blogger in self._blogger_configs:
+                    blogger_id = database.upsert_blogger(blogger['url'], blogger['name'])
+                    if blogger_id is not None:
+                        bloggers.append(dict(blogger, id=blogger_id))
+            if self._bloggers_from_database:
+                known = {blogger['id'] for blogger in bloggers}
+                bloggers.extend({'url': row['url'], 'name': row['name'], 'id': row['id']}
+                                for row in database.get_bloggers() if row['id'] not in known)
+
+            self._bloggers = bloggers
+            self._blogger_id = bloggers[0]['id'] if bloggers else None
+            if self._blogger_id is not None and not self._read_only:
+                database.assign_orphan_articles(self._blogger_id)
+            self._database = database
+        return self._database
+
+    @property
+    def bloggers(self) -> List[Dict]:
+        """监控的博主列表 [{'id', 'url', 'name'}]"""
+        if self._database is None:
+            self.database
+        return self._bloggers
+
+    @property
+    def blogger_id(self) -> Optional[int]:
+        """第一位博主在数据库中的ID"""
+        if self._database is None:
+            self.database
+        return self._blogger_id
+
+    @property
+    def blogger_url(self) -> Optional[str]:
+        """第一位博主的URL"""
+        if self._blogger_configs:
+            return self._blogger_configs[0]['url']
+        return self.bloggers[0]['url'] if self.bloggers else None
+
+    @property
+    def notifiers(self) -> NotifierRegistry:
+        """通知目标注册表，feishu 配置节为默认目标，notifiers.targets 为其他命名目标"""
+        if self._notifiers is None:
+            self._notifiers = NotifierRegistry.from_config(self.config)
+        return self._notifiers
+
+    @property
+    def notifier(self) -> FeishuNotifier:
+        """默认飞书通知器"""
+        if self._notifier is None:
+            self._notifier = self.notifiers.get(NotifierRegistry.DEFAULT_TARGET)
+        return self._notifier
+
+    @property
+    def notify_first_enabled(self) -> bool:
+        """是否先按列表页信息立即通知，再在后台补全详情"""
+        return self.config.get('notify_first', {}).get('enabled', False)
+
+    @property
+    def outbox_enabled(self) -> bool:
+        """是否通过通知发件箱异步投递"""
+        return self.config.get('outbox', {}).get('enabled', False)
+
+    @property
+    def outbox(self) -> OutboxDispatcher:
+        """通知发件箱投递器"""
+        if self._outbox is None:
+            outbox_config = self.config.get('outbox', {})
+            digest_config = self.config.get('digest', {})
+            self._outbox = OutboxDispatcher(
+                self.database,
+                self._deliver_outbox,
+                workers=outbox_config.get('workers', 2),
+                # 摘要模式下一个线程一次领取一批，合并为一条消息
+                batch_size=digest_config.get('max_articles', 10) if digest_config.get('enabled', False) else 1,
+                poll_interval=outbox_config.get('poll_interval_seconds', 1.0),
+                max_attempts=outbox_config.get('max_attempts', 8),
+                base_delay=outbox_config.get('base_delay_seconds', 30.0),
+                max_delay=outbox_config.get('max_delay_seconds', 3600.0),
+                lease_timeout=outbox_config.get('lease_seconds', ArticleDatabase.OUTBOX_LEASE_SECONDS)
+            )
+        return self._outbox
+
+    @property
+    def cycle_tracker(self) -> CycleTracker:
+        """检查周期耗时统计，超时策略和告警阈值见 schedule 配置节"""
+        if self._cycle_tracker is None:
+            self._cycle_tracker = CycleTracker.from_config(
+                self.config['toutiao']['check_interval_minutes'] * 60, self.config.get('schedule', {})
+            )
+        return self._cycle_tracker
 
     def _load_config(self, config_path: str) -> Dict:
         """
@@ -82,123 +303,859 @@ class ArticleMonitor:
             ]
         )
 
+    @staticmethod
+    def _articles_fingerprint(articles: List[Dict]) -> str:
+        """
+        计算文章列表的指纹，列表内容不变时指纹不变
+
+        Args:
+            articles: 文章列表
+
+        Returns:
+            str: 指纹字符串
+        """
+        article_ids = ','.join(str(article.get('article_id', '')) for article in articles)
+        return hashlib.md5(article_ids.encode('utf-8')).hexdigest()
+
+    def _record_crawl(self, articles: List[Dict], new_count: int, blogger_id: int = None):
+        """记录本次抓取结果到博主表，默认记到第一位博主"""
+        if blogger_id is None:
+            blogger_id = self.blogger_id
+        if blogger_id is None:
+            return
+        if articles:
+            self.database.record_blogger_crawl_async(
+                blogger_id, self._articles_fingerprint(articles), new_count, success=True
+            )
+        else:
+            self.database.record_blogger_crawl_async(blogger_id, None, 0, success=False)
+
+    def _record_stats(self, articles: List[Dict]):
+        """批量记录本轮观察到的阅读/评论数，并每天降采样一次历史快照"""
+        self.database.record_article_stats_async(articles)
+
+        if time.time() - self._last_stats_compaction >= 86400:
+            stats_config = self.config.get('stats', {})
+            self.database.compact_article_stats(
+                stats_config.get('raw_retention_days', 7),
+                stats_config.get('hourly_retention_days', 90)
+            )
+            self._last_stats_compaction = time.time()
+
     def check_new_articles(self) -> List[Dict]:
         """
-        检查新文章
+        检查第一位博主的新文章：抓取列表页并把新文章入库，不发送通知
 
         Returns:
-            List[Dict]: 新文章列表
+            List[Dict]: 新入库的文章列表
         """
         try:
+            if not self.bloggers:
+                return []
+            blogger = self.bloggers[0]
             logging.info("开始检查新文章...")
 
-            # 获取最新文章
-            latest_articles = self.crawler.get_latest_articles(self.blogger_url, limit=10)
-
+            latest_articles = self._crawl_blogger(blogger)
             if not latest_articles:
-                logging.warning("未获取到任何文章")
+                self._find_new_articles(blogger, latest_articles)
                 return []
-
-            new_articles = []
-
-            # 检查每篇文章是否为新文章
-            for article in latest_articles:
-                if not self.database.article_exists(article['article_id']):
-                    # 添加到数据库
-                    if self.database.add_article(article):
-                        new_articles.append(article)
-                        logging.info(f"发现新文章: {article['title']}")
+            new_articles = [article for article in self._find_new_articles(blogger, latest_articles)
+                            if self.database.add_article(article, blogger['id'])]
+            self._record_stats(latest_articles)
 
             if new_articles:
                 logging.info(f"共发现 {len(new_articles)} 篇新文章")
             else:
                 logging.info("没有发现新文章")
-
             return new_articles
 
         except Exception as e:
             logging.error(f"检查新文章失败: {e}")
             return []
 
-    def send_notifications(self, articles: List[Dict]) -> int:
+    def _route_target_name(self, rule: Dict) -> Optional[str]:
+        """
+        路由规则对应的通知目标名称
+
+        规则用 target 引用 notifiers.targets 中的命名目标；直接写 webhook_url 的规则按地址复用或注册飞书目标。
+        """
+        if rule.get('target'):
+            if rule['target'] in self.notifiers:
+                return rule['target']
+            logging.error(f"路由规则 [{rule['name']}] 引用的通知目标不存在: {rule['target']}")
+            return None
+        return self.notifiers.resolve_url(rule['webhook_url'], rule.get('secret'), rule['name'])
+
+    def _route_targets(self, article: Dict, count: bool = False) -> List[tuple]:
+        """
+        计算文章的通知目标
+
+        未配置路由规则时发送到默认机器人；配置了规则但没有命中时，
+        routing.fallback_to_default 为true（默认）则发送到默认机器人，否则不发送。
+
+        Args:
+            article: 文章信息字典
+            count: 是否计入规则命中统计，只在文章第一次路由时传True（直接发送、放入摘要缓存、发件箱首次投递）
+
+        Returns:
+            List[tuple]: [(规则名称, 目标名称)]，同一目标只出现一次，默认机器人的规则名称为None
+        """
+        default = [(None, NotifierRegistry.DEFAULT_TARGET)]
+        if self.router is None:
+            return default
+
+        rules = self.router.route(article, count=count)
+        if not rules:
+            if self.config['routing'].get('fallback_to_default', True):
+                return default
+            if count:
+                logging.info(f"文章未命中任何路由规则，不发送通知: {article['title']}")
+            return []
+
+        targets = {}
+        for rule in rules:
+            name = self._route_target_name(rule)
+            if name is not None and name not in targets:
+                targets[name] = rule['name']
+        return [(rule_name, name) for name, rule_name in targets.items()]
+
+    def _remember_discovery(self, article: Dict):
+        """记住发件箱模式下文章的发现时间，投递线程送达时计算告警延迟"""
+        if article.get('discovered_at'):
+            self._discovered_at[article['article_id']] = article['discovered_at']
+            while len(self._discovered_at) > 1000:
+                self._discovered_at.popitem(last=False)
+
+    def _remember_notified(self, article_id: str):
+        """记住刚通知过的首发文章，同一轮中稍后入库的转载不再单独通知"""
+        self._recently_notified[article_id] = None
+        while len(self._recently_notified) > 1000:
+            self._recently_notified.popitem(last=False)
+
+    def _record_deliveries(self, articles: List[Dict], target: str, results: List[bool],
+                           error: Optional[str], elapsed: float):
+        """记录一个目标的投递结果，每篇文章一行，送达的记录同时记下从发现文章到送达的告警延迟"""
+        now = time.time()
+        rows = []
+        for article, success in zip(articles, results):
+            discovered_at = article.get('discovered_at') or self._discovered_at.get(article['article_id'])
+            alert_latency = now - discovered_at if success and discovered_at else None
+            if alert_latency is not None:
+                self._alert_latencies.append(alert_latency)
+            rows.append((article['article_id'], target, success, None if success else error or '发送失败',
+                         elapsed * 1000, alert_latency * 1000 if alert_latency is not None else None))
+        self.database.record_deliveries_async(rows)
+
+    def get_alert_latency_stats(self) -> Dict:
+        """
+        获取最近的告警延迟统计（从在列表页发现文章到通知送达）
+
+        Returns:
+            Dict: count，以及 p50/p95/max 延迟（秒）
+        """
+        samples = sorted(self._alert_latencies)
+        if not samples:
+            return {'count': 0}
+        return {
+            'count': len(samples),
+            'p50': samples[len(samples) // 2],
+            'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            'max': samples[-1]
+        }
+
+    def notify_article(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        按路由规则发送文章通知，多个目标并发发送
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选），合并在同一条通知中
+
+        Returns:
+            bool: 所有目标都发送成功返回True
+        """
+        targets = self._route_targets(article, count=True)
+        results = self.notifiers.fan_out(
+            [name for _, name in targets],
+            lambda name, notifier: notifier.send_article_notification(article, duplicates)
+        )
+
+        success = True
+        notified_targets = []
+        for rule_name, name in targets:
+            sent, error, elapsed = results[name]
+            self._record_deliveries([article], name, [bool(sent)], error, elapsed)
+            if sent:
+                notified_targets.append(name)
+                if rule_name:
+                    logging.info(f"文章已按规则 [{rule_name}] 发送到 {name}: {article['title']}")
+            else:
+                success = False
+
+        # 先通知模式补全详情后，向已送达的目标发送更新
+        article['notified_targets'] = notified_targets
+        return success
+
+    def _deliver_outbox(self, entries: List[Dict]) -> List[tuple]:
+        """
+        投递一批发件箱记录
+
+        发件箱按接收方（机器人、应用机器人的每个群）记录已送达的部分，重试时只补发未送达的接收方，
+        同一篇文章不会重复发到同一个机器人或群。
+
+        Args:
+            entries: claim_outbox 领取的记录
+
+        Returns:
+            List[tuple]: 每条记录的 (是否全部送达, 已送达的目标列表, 失败原因)
+        """
+        delivered = [set(entry['delivered_targets']) for entry in entries]
+        errors = [None] * len(entries)
+
+        # 按通知目标归集需要发送的记录，以及每条记录在该目标下尚未送达的接收方
+        by_target: Dict[str, List[int]] = {}
+        pending: Dict[tuple, List[str]] = {}
+        for index, entry in enumerate(entries):
+            # attempts 在领取时已加一，为1表示首次投递
+            for _, name in self._route_targets(entry['article'], count=entry['attempts'] == 1):
+                keys = [key for key in self.notifiers.get(name).delivery_keys() if key not in delivered[index]]
+                if keys:
+                    by_target.setdefault(name, []).append(index)
+                    pending[(name, index)] = keys
+
+        digest_config = self.config.get('digest', {})
+
+        def send(name: str, notifier: FeishuNotifier) -> List[List[str]]:
+            indices = by_target[name]
+            if digest_config.get('enabled', False):
+                groups = [(entries[index]['article'], entries[index]['duplicates']) for index in indices]
+                sent = notifier.send_digest(groups, digest_config.get('max_articles', 10))
+                return [pending[(name, index)] if success else [] for index, success in zip(indices, sent)]
+            return [notifier.deliver_article(entries[index]['article'], entries[index]['duplicates'],
+                                             pending[(name, index)])
+                    for index in indices]
+
+        # 各目标并发发送，一个目标响应慢不影响其他目标
+        results = self.notifiers.fan_out(list(by_target), send)
+        for name, (target_results, error, elapsed) in results.items():
+            indices = by_target[name]
+            target_results = target_results or [[] for _ in indices]
+            successes = []
+            for index, keys in zip(indices, target_results):
+                delivered[index].update(keys)
+                success = set(keys) >= set(pending[(name, index)])
+                successes.append(success)
+                if not success:
+                    errors[index] = f"发送到目标 {name} 失败"
+            self._record_deliveries([entries[index]['article'] for index in indices],
+                                    name, successes, error, elapsed / max(1, len(indices)))
+
+        return [(errors[index] is None, sorted(delivered[index]), errors[index]) for index in range(len(entries))]
+
+    @staticmethod
+    def _group_duplicates(articles: List[Dict], notified_ids=()) -> tuple:
+        """
+        把近似重复的新文章合并到首发文章下
+
+        Args:
+            articles: 新入库的文章列表（add_article 已填写 duplicate_of）
+            notified_ids: 入库后才通知的文章ID，首发文章在其中时同样视为已通知
+
+        Returns:
+            tuple: (通知分组列表 [(首发文章, 其他来源列表)], 首发文章已通知过、无需再通知的重复文章列表)
+        """
+        groups = {}
+        suppressed = []
+        for article in articles:
+            canonical_id = article.get('duplicate_of')
+            if canonical_id in groups:
+                groups[canonical_id][1].append(article)
+            elif canonical_id and (article.get('duplicate_notified') or canonical_id in notified_ids):
+                suppressed.append(article)
+            else:
+                groups[article['article_id']] = (article, [])
+        return list(groups.values()), suppressed
+
+    def send_notifications(self, articles: List[Dict], allow_digest: bool = True) -> int:
         """
         发送文章通知
+
+        近似重复的文章合并为一条通知，列出所有来源；首发文章已经通知过的转载不再重复通知。
         
         Args:
             articles: 文章列表
+            allow_digest: 为False时即使启用了摘要模式也逐篇立即发送（先通知模式）
             
         Returns:
             int: 成功发送的通知数量
         """
         success_count = 0
+        groups, suppressed = self._group_duplicates(articles, self._recently_notified)
 
-        for article in articles:
+        for article in suppressed:
+            self.database.mark_as_notified_async(article['article_id'])
+            logging.info(f"重复文章已合并到已通知的首发文章，不再通知: {article['title']}")
+
+        if allow_digest and self.config.get('digest', {}).get('enabled', False):
+            self._queue_digest(groups)
+            return self.flush_digests()
+
+        for article, duplicates in groups:
             try:
-                if self.notifier.send_article_notification(article):
+                article['alerted'] = self.notify_article(article, duplicates)
+                if article['alerted']:
                     # 标记为已通知
-                    self.database.mark_as_notified(article['article_id'])
+                    for notified in [article] + duplicates:
+                        self.database.mark_as_notified_async(notified['article_id'])
+                    self._remember_notified(article['article_id'])
                     success_count += 1
-                    logging.info(f"文章通知发送成功: {article['title']}")
-
-                    # 发送间隔，避免频繁请求
-                    time.sleep(1)
+                    logging.info(f"文章通知发送成功: {article['title']}" +
+                                 (f"（合并 {len(duplicates)} 个重复来源）" if duplicates else ""))
                 else:
                     logging.error(f"文章通知发送失败: {article['title']}")
 
             except Exception as e:
                 logging.error(f"发送文章通知异常: {e}")
 
+        for name, stats in self.notifiers.get_stats().items():
+            latency, rate = stats['latency'], stats['rate_limit']
+            if latency.get('requests'):
+                logging.info(f"通知目标 {name} 请求耗时 p50 {latency['p50_ms']:.0f}ms / p95 {latency['p95_ms']:.0f}ms，"
+                             f"累计 {latency['requests']} 次，失败 {latency['errors']} 次；"
+                             f"限流排队 {rate['waited']} 次，平均等待 {rate['avg_wait_ms']:.0f}ms，"
+                             f"被限流 {rate['rate_limited']} 次")
         return success_count
 
-    def run_check_cycle(self):
-        """执行一次检查周期"""
+    def _queue_digest(self, groups: List[tuple]):
+        """把文章分组按通知目标放入摘要缓存"""
+        for article, duplicates in groups:
+            targets = self._route_targets(article, count=True)
+            article_ids = [item['article_id'] for item in [article] + duplicates]
+            if not targets:
+                self.database.mark_many_as_notified_async(article_ids)
+                continue
+
+            self._digest_outstanding[article['article_id']] = {
+                'targets': {name for _, name in targets},
+                'failed': False,
+                'article_ids': article_ids
+            }
+            for _, name in targets:
+                pending = self._digest_pending.setdefault(name, {'groups': [], 'since': time.monotonic()})
+                pending['groups'].append((article, duplicates))
+
+    def flush_digests(self, force: bool = False) -> int:
+        """
+        发送到期的文章摘要
+
+        某个目标缓存的文章数达到 digest.max_articles，或最早一篇等待超过
+        digest.flush_window_seconds 时发送，多个目标并发发送；一篇文章发到所有目标后才批量标记为已通知，
+        发送失败的文章保持未通知状态。
+
+        Args:
+            force: 忽略等待窗口，立即发送全部缓存
+
+        Returns:
+            int: 全部目标都发送成功的文章分组数
+        """
+        if not self._digest_pending:
+            return 0
+
+        digest_config = self.config.get('digest', {})
+        max_articles = digest_config.get('max_articles', 10)
+        flush_window = digest_config.get('flush_window_seconds', 0)
+
+        due = {}
+        now = time.monotonic()
+        for name, pending in list(self._digest_pending.items()):
+            if not force and len(pending['groups']) < max_articles and now - pending['since'] < flush_window:
+                continue
+            due[name] = self._digest_pending.pop(name)['groups']
+
+        sent = self.notifiers.fan_out(list(due), lambda name, notifier: notifier.send_digest(due[name], max_articles))
+
+        delivered_ids = []
+        delivered_groups = 0
+        for name, (results, error, elapsed) in sent.items():
+            groups = due[name]
+            results = results or [False] * len(groups)
+            self._record_deliveries([article for article, _ in groups], name, results, error,
+                                    elapsed / max(1, len(groups)))
+            logging.info(f"文章摘要发送到 {name} 完成: {sum(results)}/{len(groups)} 篇成功")
+
+            for (article, _), success in zip(groups, results):
+                outstanding = self._digest_outstanding.get(article['article_id'])
+                if outstanding is None:
+                    continue
+                outstanding['targets'].discard(name)
+                outstanding['failed'] = outstanding['failed'] or not success
+                if not outstanding['targets']:
+                    del self._digest_outstanding[article['article_id']]
+                    if outstanding['failed']:
+                        logging.error(f"文章摘要发送失败，保持未通知状态: {article['title']}")
+                    else:
+                        delivered_ids.extend(outstanding['article_ids'])
+                        delivered_groups += 1
+
+        if delivered_ids:
+            self.database.mark_many_as_notified_async(delivered_ids)
+        return delivered_groups
+
+    def replay_unnotified(self, blogger_id: int = None, since: str = None, until: str = None,
+                          batch_size: int = 200, digest: bool = False, progress=None) -> Dict:
+        """
+        补发未通知的文章（发送失败或进程中断后遗留的）
+
+        分批流式读取未通知的文章，每批按路由规则归集到各通知目标后并发发送，经过各目标的限流；
+        一批中所有目标都送达的文章用一条UPDATE语句批量标记为已通知，失败的保持未通知，下次补发时重试。
+
+        Args:
+            blogger_id: 只补发该博主的文章
+            since: 只补发入库时间不早于该时间的文章（ISO格式）
+            until: 只补发入库时间早于该时间的文章（ISO格式）
+            batch_size: 每批读取的文章数
+            digest: 为True时每个目标把一批文章合并为摘要消息发送
+            progress: 进度回调，参数为 (已处理文章数, 已送达分组数, 失败分组数, 已用秒数)
+
+        Returns:
+            Dict: articles（处理的文章数）、sent、failed（通知分组数）、suppressed（首发已通知的重复文章数）、
+                  elapsed（秒）、articles_per_second
+        """
+        max_articles = self.config.get('digest', {}).get('max_articles', 10)
+        report = {'articles': 0, 'sent': 0, 'failed': 0, 'suppressed': 0}
+        start = time.perf_counter()
+
+        for batch in self.database.iter_unnotified_batches(blogger_id, since, until, batch_size):
+            groups, suppressed = self._group_duplicates(batch)
+            notified_ids = [article['article_id'] for article in suppressed]
+
+            by_target: Dict[str, List[int]] = {}
+            for index, (article, duplicates) in enumerate(groups):
+                targets = self._route_targets(article)
+                if not targets:
+                    notified_ids.extend(item['article_id'] for item in [article] + duplicates)
+                for _, name in targets:
+                    by_target.setdefault(name, []).append(index)
+
+            def send(name: str, notifier: FeishuNotifier) -> List[bool]:
+                chunk = [groups[index] for index in by_target[name]]
+                if digest:
+                    return notifier.send_digest(chunk, max_articles)
+                return [notifier.send_article_notification(article, duplicates) for article, duplicates in chunk]
+
+            routed, failed = set(), set()
+            for name, (results, error, elapsed) in self.notifiers.fan_out(list(by_target), send).items():
+                indices = by_target[name]
+                results = results or [False] * len(indices)
+                self._record_deliveries([groups[index][0] for index in indices], name, results, error,
+                                        elapsed / max(1, len(indices)))
+                routed.update(indices)
+                failed.update(index for index, success in zip(indices, results) if not success)
+
+            for index in routed - failed:
+                article, duplicates = groups[index]
+                notified_ids.extend(item['article_id'] for item in [article] + duplicates)
+            if notified_ids:
+                self.database.mark_many_as_notified(notified_ids)
+
+            report['articles'] += len(batch)
+            report['sent'] += len(routed - failed)
+            report['failed'] += len(failed)
+            report['suppressed'] += len(suppressed)
+            if progress:
+                progress(report['articles'], report['sent'], report['failed'], time.perf_counter() - start)
+
+        report['elapsed'] = time.perf_counter() - start
+        report['articles_per_second'] = report['articles'] / report['elapsed'] if report['elapsed'] > 0 else 0.0
+        return report
+
+    def check_trending(self) -> List[Dict]:
+        """
+        检测阅读量快速上涨的文章并发送提醒（每篇文章只提醒一次）
+
+        Returns:
+            List[Dict]: 本次提醒的热门文章列表
+        """
+        trending_config = self.config.get('trending', {})
+        if not trending_config.get('enabled', False):
+            return []
+
         try:
-            logging.info("开始检查新文章...")
-            
-            # 获取最新文章
-            latest_articles = self.crawler.get_latest_articles(
-                self.config['toutiao']['blogger_url'],
-                limit=10
+            from .trending import TrendingDetector
+
+            # 确保本轮的统计快照已落盘
+            self.database.flush()
+
+            detector = TrendingDetector(
+                self.database,
+                velocity_threshold=trending_config.get('velocity_threshold', 5000),
+                window_hours=trending_config.get('window_hours', 24)
             )
-            
-            if not latest_articles:
-                logging.warning("未获取到任何文章")
-                # 检查是否需要重新初始化爬虫
-                if hasattr(self.crawler, '_ensure_driver_alive'):
-                    self.crawler._ensure_driver_alive()
-                return
-            
-            # 检查新文章并发送通知
-            new_articles = []
-            for article in latest_articles:
-                if not self.database.article_exists(article['article_id']):
-                    new_articles.append(article)
-            
-            if new_articles:
-                logging.info(f"发现 {len(new_articles)} 篇新文章")
-                for article in new_articles:
-                    # 先添加到数据库
-                    if self.database.add_article(article):
-                        # 发送通知
-                        if self.notifier.send_article_notification(article):
-                            self.database.mark_as_notified(article['article_id'])
-                            logging.info(f"已通知新文章: {article['title']}")
-                        else:
-                            logging.error(f"通知发送失败: {article['title']}")
-            else:
-                logging.info("没有发现新文章")
-                
+            return self.notify_trending(detector.detect(only_new=True))
+
+        except Exception as e:
+            logging.error(f"热门文章检测失败: {e}")
+            return []
+
+    def notify_trending(self, trending: List[Dict]) -> List[Dict]:
+        """
+        按路由规则把热门文章提醒发送到通知目标，至少送达一个目标的文章标记为已提醒
+
+        Args:
+            trending: 热门文章列表
+
+        Returns:
+            List[Dict]: 已送达的热门文章列表
+        """
+        alerted = []
+        for article in trending:
+            names = [name for _, name in self._route_targets(article)]
+            results = self.notifiers.fan_out(
+                names, lambda name, notifier: notifier.send_trending_notification(article)
+            )
+            if any(result for result, _, _ in results.values()):
+                alerted.append(article)
+                logging.info(f"已提醒热门文章: {article['title']} ({article['velocity']:.0f} 阅读/小时)")
+
+        self.database.mark_trending_alerted([article['article_id'] for article in alerted])
+        return alerted
+
+    @staticmethod
+    def _blogger_label(blogger: Dict) -> str:
+        """日志中显示的博主名称"""
+        return blogger.get('name') or blogger['url']
+
+    def run_check_cycle(self) -> float:
+        """
+        执行一次检查周期
+
+        所有博主的列表页并发抓取，同时抓取的数量不超过爬虫池的浏览器数；
+        哪位博主先抓取完就先入库哪位的新文章，一位博主抓取慢或失败不影响其他博主。
+        通知交给发送线程按入库顺序发送，发送慢不会推迟其他博主的入库。
+
+        Returns:
+            float: 本轮耗时（秒），已计入周期耗时统计
+        """
+        self._cycle_running.set()
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        bloggers: List[Dict] = []
+        try:
+            bloggers = self.bloggers
+            workers = min(len(bloggers), self.crawler_pool.size)
+            logging.info(f"开始检查新文章（{len(bloggers)} 位博主，{workers} 个浏览器并发）...")
+
+            # 单个发送线程：通知按入库顺序发送，摘要缓存只在这个线程中读写
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='send') as notify_executor:
+                self._notify_executor = notify_executor
+                if bloggers:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crawl') as executor:
+                        futures = {executor.submit(self._crawl_blogger, blogger): blogger for blogger in bloggers}
+                        for future in as_completed(futures):
+                            blogger = futures[future]
+                            try:
+                                self._process_blogger(blogger, future.result())
+                            except Exception as e:
+                                logging.error(f"处理博主 {self._blogger_label(blogger)} 的文章失败: {e}")
+
+                # 等待窗口到期的摘要即使本轮没有新文章也要发送
+                self._submit_notification(self.flush_digests)
+            self._notify_executor = None
+
+            self.check_trending()
+            logging.info(f"本轮检查完成，{len(bloggers)} 位博主，耗时 {time.perf_counter() - start:.1f} 秒")
+
         except Exception as e:
             logging.error(f"检查周期执行失败: {e}")
-            # 如果是WebDriver相关错误，尝试重新初始化爬虫
-            if "no such window" in str(e) or "web view not found" in str(e):
-                logging.info("检测到WebDriver失效，重新初始化爬虫...")
-                try:
-                    self.crawler.close()
-                    self.crawler = ToutiaoSeleniumCrawler()
-                    logging.info("爬虫重新初始化成功")
-                except Exception as init_e:
-                    logging.error(f"爬虫重新初始化失败: {init_e}")
+        finally:
+            self._notify_executor = None
+            self._cycle_running.clear()
+
+        duration = time.perf_counter() - start
+        self._record_cycle(started_at, duration, len(bloggers))
+        return duration
+
+    def _record_cycle(self, started_at: str, duration: float, bloggers: int):
+        """把一轮检查的耗时计入统计并写入检查周期表"""
+        tracker = self.cycle_tracker
+        tracker.record(duration)
+        try:
+            self.database.record_check_cycle_async(started_at, duration, tracker.interval, bloggers)
+        except Exception as e:
+            logging.error(f"记录检查周期失败: {e}")
+
+    def _run_scheduled_cycle(self):
+        """
+        调度器执行的检查任务
+
+        执行一轮检查，按超时策略记下下一轮的延迟，最近几轮的平均耗时接近检查间隔时告警。
+        调整下一轮时间要等本任务结束（见 _on_check_executed），否则 max_instances=1 会丢弃补做的一轮。
+        """
+        duration = self.run_check_cycle()
+        tracker = self.cycle_tracker
+        delay = tracker.next_delay(duration)
+
+        if duration > tracker.interval:
+            if delay is None:
+                action = "跳过错过的检查，按原有节奏执行下一轮"
+            elif delay == 0:
+                action = "立即补做一轮检查"
+            else:
+                action = f"下一轮在 {delay:.0f} 秒后执行"
+            logging.warning(f"本轮检查耗时 {duration:.1f} 秒，超过检查间隔 {tracker.interval:.0f} 秒，{action}")
+        elif delay is not None:
+            logging.info(f"追回超时落后的时间，下一轮在 {delay:.0f} 秒后执行")
+        self._next_check_delay = delay
+
+        if tracker.should_alert():
+            self._alert_cycle_load()
+
+    def _on_check_executed(self, event):
+        """检查任务结束后（实例数已释放）按超时策略调整下一轮检查时间"""
+        if event.job_id != 'article_check':
+            return
+        delay, self._next_check_delay = self._next_check_delay, None
+        # 调度器关闭时持有任务存储的锁等待任务结束，此时不能再调整任务，否则互相等待
+        if delay is not None and self._scheduler is not None and self._scheduler.running:
+            self._reschedule_check(delay)
+
+    def _reschedule_check(self, delay: float):
+        """把下一轮检查调整到 delay 秒后"""
+        if self._scheduler is None:
+            return
+        try:
+            self._scheduler.modify_job('article_check', next_run_time=datetime.now() + timedelta(seconds=delay))
+        except Exception as e:
+            logging.error(f"调整下一轮检查时间失败: {e}")
+
+    def _on_check_missed(self, event):
+        """调度器错过检查任务（上一轮未结束或调度延迟超过宽限时间）时计数"""
+        if event.job_id != 'article_check':
+            return
+        self.cycle_tracker.record_missed()
+        logging.warning("上一轮检查尚未结束或调度延迟过久，本次检查已跳过")
+
+    def _alert_cycle_load(self):
+        """平均耗时接近检查间隔时记录告警，配置 schedule.alert_notify 时同时发送飞书消息"""
+        stats = self.cycle_tracker.get_stats()
+        message = (f"⚠️ 检查耗时接近检查间隔：最近平均 {stats['avg_seconds']:.0f} 秒，"
+                   f"检查间隔 {stats['interval']:.0f} 秒（{stats['load']:.0%}），"
+                   f"已超时 {stats['overruns']} 轮、错过 {stats['missed']} 次。"
+                   f"请增加 crawl_workers、减少博主或调大 check_interval_minutes")
+        logging.warning(message)
+        if self.config.get('schedule', {}).get('alert_notify', False):
+            try:
+                self.notifier.send_text_message(message)
+            except Exception as e:
+                logging.error(f"发送检查耗时告警失败: {e}")
+
+    def _crawl_blogger(self, blogger: Dict) -> List[Dict]:
+        """
+        借用一个浏览器抓取一位博主的列表页（在抓取线程中运行）
+
+        先通知模式只读取列表页，详情留给后台补全。抓取异常只影响这位博主；
+        浏览器失效时爬虫池丢弃该浏览器，下次借用时重建。
+
+        Args:
+            blogger: 博主 {'id', 'url', 'name'}
+
+        Returns:
+            List[Dict]: 最新文章，失败时返回空列表
+        """
+        try:
+            crawler = self.crawler_pool.acquire()
+        except Exception as e:
+            logging.error(f"抓取博主 {self._blogger_label(blogger)} 失败: {e}")
+            return []
+
+        broken = False
+        try:
+            if self.notify_first_enabled:
+                articles = crawler.get_articles_from_url(blogger['url'], max_count=10)
+            else:
+                articles = crawler.get_latest_articles(blogger['url'], limit=10)
+
+            # 没有抓到文章时检查浏览器是否失效，失效的浏览器归还时丢弃，下次借用时重建
+            if not articles:
+                broken = not crawler.is_alive()
+            return articles or []
+        except Exception as e:
+            broken = is_driver_error(e)
+            logging.error(f"抓取博主 {self._blogger_label(blogger)} 失败: {e}")
+            return []
+        finally:
+            self.crawler_pool.release(crawler, broken=broken)
+
+    def _submit_notification(self, send, *args):
+        """
+        把发送通知的操作交给检查周期的发送线程，不在检查周期中时直接执行
+
+        Args:
+            send: 发送函数
+            *args: 发送函数的参数
+        """
+        if self._notify_executor is None:
+            send(*args)
+            return
+
+        def run():
+            try:
+                send(*args)
+            except Exception as e:
+                logging.error(f"发送文章通知失败: {e}")
+
+        self._notify_executor.submit(run)
+
+    def _find_new_articles(self, blogger: Dict, latest_articles: List[Dict]) -> List[Dict]:
+        """
+        找出列表页中尚未入库的文章，并记录本次抓取结果
+
+        Args:
+            blogger: 博主 {'id', 'url', 'name'}
+            latest_articles: 列表页的最新文章
+
+        Returns:
+            List[Dict]: 尚未入库的文章
+        """
+        if not latest_articles:
+            logging.warning(f"博主 {self._blogger_label(blogger)} 未获取到任何文章")
+            self._record_crawl([], 0, blogger['id'])
+            return []
+
+        new_articles = [article for article in latest_articles
+                        if not self.database.article_exists(article['article_id'])]
+        self._record_crawl(latest_articles, len(new_articles), blogger['id'])
+        return new_articles
+
+    def _process_blogger(self, blogger: Dict, latest_articles: List[Dict]):
+        """
+        处理一位博主的抓取结果：入库新文章，通知交给发送线程
+
+        Args:
+            blogger: 博主 {'id', 'url', 'name'}
+            latest_articles: 列表页的最新文章
+        """
+        blogger_id = blogger['id']
+        label = self._blogger_label(blogger)
+        new_articles = self._find_new_articles(blogger, latest_articles)
+        if not latest_articles:
+            return
+
+        if new_articles:
+            logging.info(f"博主 {label} 发现 {len(new_articles)} 篇新文章")
+            if self.notify_first_enabled:
+                added_articles = [article for article in new_articles
+                                  if self.database.add_article(article, blogger_id)]
+                self._submit_notification(self._notify_first, added_articles)
+            elif self.outbox_enabled:
+                # 文章与待发送通知在同一事务中写入，由投递线程发送，抓取不等待飞书
+                for article in new_articles:
+                    self._remember_discovery(article)
+                    self.database.add_article(article, blogger_id, enqueue_notification=True)
+                self.outbox.wake()
+            else:
+                # 先全部添加到数据库，再合并重复来源后发送通知
+                added_articles = [article for article in new_articles
+                                  if self.database.add_article(article, blogger_id)]
+                self._submit_notification(self.send_notifications, added_articles)
+        else:
+            logging.info(f"博主 {label} 没有发现新文章")
+
+        # 新文章入库后再记录统计，本轮的首个快照也能写入
+        self._record_stats(latest_articles)
+
+    def _notify_first(self, added_articles: List[Dict]):
+        """
+        先通知模式：按列表页信息（标题、链接、阅读数）立即发送通知，再在后台补全详情
+
+        直接发送失败的文章在启用发件箱时交给投递线程重试，否则保持未通知状态。
+
+        Args:
+            added_articles: 本轮新入库的文章（只有列表页信息）
+        """
+        self.send_notifications(added_articles, allow_digest=False)
+
+        latency = self.get_alert_latency_stats()
+        if latency['count']:
+            logging.info(f"发现到通知送达耗时 p50 {latency['p50']:.2f}s / p95 {latency['p95']:.2f}s / "
+                         f"最大 {latency['max']:.2f}s（最近 {latency['count']} 次）")
+
+        failed = [article for article in added_articles if article.get('alerted') is False]
+        if failed and self.outbox_enabled:
+            for article in failed:
+                self._remember_discovery(article)
+            queued = self.database.enqueue_notifications([article['article_id'] for article in failed])
+            self.outbox.wake()
+            logging.warning(f"{queued} 篇文章直接通知失败，已交给发件箱重试")
+
+        if added_articles:
+            if self._enrich_executor is None:
+                self._enrich_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='enrich')
+            self._enrich_executor.submit(self._enrich_articles, added_articles)
+
+    def _enrich_articles(self, articles: List[Dict]):
+        """
+        后台补全文章详情（作者、摘要、发布时间），写回数据库并向已通知的目标发送更新
+
+        应用机器人目标直接编辑原消息，自定义机器人和通用Webhook补发一条跟进消息。
+
+        Args:
+            articles: 已按列表页信息通知的文章
+        """
+        send_updates = self.config.get('notify_first', {}).get('send_updates', True)
+        for article in articles:
+            try:
+                with self.crawler_pool.lease() as crawler:
+                    details = crawler.get_article_details(article['article_id'])
+                changes = {key: details[key] for key in ('author', 'summary', 'publish_time')
+                           if details.get(key) and details[key] != article.get(key)}
+                if not changes:
+                    continue
+
+                article.update(changes)
+                self.database.update_article_details(article['article_id'], changes)
+
+                targets = article.get('notified_targets') or []
+                if send_updates and targets:
+                    results = self.notifiers.fan_out(
+                        targets, lambda name, notifier: notifier.update_article_notification(article)
+                    )
+                    failed = [name for name, (sent, _, _) in results.items() if not sent]
+                    if failed:
+                        logging.error(f"文章详情更新发送失败（{', '.join(failed)}）: {article['title']}")
+                    else:
+                        logging.info(f"文章详情已补全并发送更新: {article['title']}")
+            except Exception as e:
+                logging.error(f"补全文章详情失败 {article.get('article_id')}: {e}")
+
+    def wait_for_enrichment(self):
+        """等待已提交的详情补全任务完成，并停止补全线程"""
+        if self._enrich_executor is not None:
+            self._enrich_executor.shutdown(wait=True)
+            self._enrich_executor = None
+
+    def run_maintenance(self) -> Dict:
+        """
+        执行数据维护：清理测试文章、归档过期文章、分片回收空闲页
+
+        只在两次检查周期之间运行，检查周期开始后在当前批次结束时停止。
+
+        Returns:
+            Dict: 维护报告
+        """
+        if self._cycle_running.is_set():
+            logging.debug("检查周期进行中，跳过数据维护")
+            return {}
+
+        retention_config = self.config.get('retention', {})
+        manager = RetentionManager.from_config(self.database, retention_config)
+        report = manager.run(
+            should_stop=self._cycle_running.is_set,
+            purge_test_articles=retention_config.get('purge_test_articles', True)
+        )
+        logging.info(f"数据维护完成: 清理测试文章 {report['purged']} 篇，归档 {report['archived']} 篇，"
+                     f"回收 {report['reclaimed_bytes'] / 1024:.1f} KB")
+        return report
 
     def test_system(self, send_test_notification: bool = True) -> bool:
         """
@@ -232,6 +1189,7 @@ class ArticleMonitor:
             if not self.database.add_article(test_article):
                 logging.error("数据库测试失败")
                 return False
+            self.database.delete_articles([test_article['article_id']])
             logging.info("数据库测试通过")
 
             # 测试飞书通知（可选）
@@ -270,23 +1228,57 @@ class ArticleMonitor:
                 logging.error("系统测试失败，无法启动监控服务")
                 return
 
+            from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+            from apscheduler.schedulers.blocking import BlockingScheduler
+            from apscheduler.triggers.interval import IntervalTrigger
+
             # 创建调度器
             scheduler = BlockingScheduler()
+            self._scheduler = scheduler
 
-            # 添加定时任务
+            # 添加定时任务：同一时间只运行一轮检查，错过的多次检查合并为一次，立即执行第一轮
             interval_minutes = self.config['toutiao'][ 'check_interval_minutes']
+            schedule_config = self.config.get('schedule', {})
             scheduler.add_job(
-                func=self.run_check_cycle,
+                func=self._run_scheduled_cycle,
                 trigger=IntervalTrigger(minutes=interval_minutes),
                 id='article_check',
                 name='文章检查任务',
-                replace_existing=True
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=schedule_config.get('misfire_grace_seconds', 60),
+                next_run_time=datetime.now()
             )
+            scheduler.add_listener(self._on_check_missed, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+            scheduler.add_listener(self._on_check_executed, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+            retention_config = self.config.get('retention', {})
+            if retention_config.get('enabled', False):
+                scheduler.add_job(
+                    func=self.run_maintenance,
+                    trigger=IntervalTrigger(minutes=retention_config.get('interval_minutes', 60)),
+                    id='data_maintenance',
+                    name='数据维护任务',
+                    replace_existing=True
+                )
 
-            logging.info(f"监控服务已启动，检查间隔: {interval_minutes}分钟")
+            backup_config = self.config.get('backup', {})
+            if backup_config.get('enabled', False):
+                backup = DatabaseBackup.from_config(self.config['database']['path'], backup_config)
+                scheduler.add_job(
+                    func=backup.run,
+                    trigger=IntervalTrigger(hours=backup_config.get('interval_hours', 24)),
+                    id='database_backup',
+                    name='数据库备份任务',
+                    replace_existing=True
+                )
 
-            # 立即执行一次检查
-            self.run_check_cycle()
+            logging.info(f"监控服务已启动，检查间隔: {interval_minutes}分钟，"
+                         f"超时策略: {self.cycle_tracker.policy}")
+
+            if self.outbox_enabled:
+                self.outbox.start()
 
             # 启动调度器
             scheduler.start()
@@ -295,6 +1287,30 @@ class ArticleMonitor:
             logging.info("收到停止信号，正在关闭监控服务...")
         except Exception as e:
             logging.error(f"监控服务启动失败: {e}")
+        finally:
+            # 停止投递线程和详情补全线程、发出缓存中的摘要，再写完排队中的数据库写操作
+            self.wait_for_enrichment()
+            if self._outbox is not None:
+                self._outbox.stop()
+            if self._digest_pending:
+                self.flush_digests(force=True)
+            if self._database is not None:
+                self._database.close()
+            if self._notifiers is not None:
+                self._notifiers.close()
+            if self._crawler_pool is not None:
+                self._crawler_pool.close()
+
+    def _record_rule_matches(self, rule_names: List[str]):
+        """把路由规则的命中累加到数据库"""
+        self.database.record_rule_matches_async(rule_names)
+
+    def _get_routing_stats(self) -> Dict[str, Dict]:
+        """当前配置的每条路由规则在数据库中累计的命中次数（matches、last_matched_at）"""
+        if self.router is None:
+            return {}
+        stored = self.database.get_routing_stats()
+        return {name: stored.get(name, {'matches': 0, 'last_matched_at': None}) for name in self.router.get_stats()}
 
     def get_status(self) -> Dict:
         """
@@ -304,15 +1320,27 @@ class ArticleMonitor:
             Dict: 状态信息
         """
         try:
-            latest_articles = self.database.get_latest_articles(5)
-            unnotified_count = len(self.database.get_unnotified_articles())
+            # 监控多位博主时汇总全部博主
+            blogger_id = self.blogger_id if len(self.bloggers) <= 1 else None
+            latest_articles = self.database.get_latest_articles(5, blogger_id=blogger_id)
+            summary = self.database.get_article_summary(blogger_id=blogger_id)
 
             return {
                 'blogger_url': self.blogger_url,
+                'blogger_id': self.blogger_id,
+                'blogger_count': len(self.bloggers),
+                'bloggers': summary['bloggers'] if blogger_id is None else [],
                 'latest_articles_count': len(latest_articles),
-                'unnotified_count': unnotified_count,
+                'total_count': summary['total'],
+                'unnotified_count': summary['unnotified'],
+                'last_crawl_time': summary['last_crawl_time'],
+                'last_article_time': summary['last_article_at'],
                 'latest_articles': latest_articles,
-                'last_check_time': datetime.now().isoformat()
+                'last_check_time': datetime.now().isoformat(),
+                'routing_stats': self._get_routing_stats(),
+                'outbox': self.database.get_outbox_stats() if self.outbox_enabled else {},
+                'deliveries': self.database.get_delivery_stats(),
+                'check_cycles': self.database.get_check_cycle_stats()
             }
         except Exception as e:
             logging.error(f"获取状态失败: {e}")
@@ -0,0 +1,211 @@
+"""
+通知目标注册表
+按名称管理多个飞书机器人和通用Webhook，并在有界线程池中并发地向多个目标发送
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .feishu_notifier import FeishuNotifier
+from .feishu_app_notifier import FeishuAppNotifier
+from .webhook_notifier import WebhookNotifier
+
+NOTIFIER_TYPES = {
+    'feishu': FeishuNotifier,
+    'feishu_app': FeishuAppNotifier,
+    'webhook': WebhookNotifier,
+}
+
+
+class NotifierRegistry:
+    """通知目标注册表"""
+
+    # feishu 配置节对应的默认目标名称
+    DEFAULT_TARGET = 'default'
+
+    def __init__(self, max_workers: int = 4):
+        """
+        初始化注册表
+
+        Args:
+            max_workers: 并发发送的最大线程数
+        """
+        self.max_workers = max_workers
+
+        self._configs: Dict[str, Dict] = {}
+        self._notifiers: Dict[str, FeishuNotifier] = {}
+        self._url_targets: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'NotifierRegistry':
+        """
+        根据完整配置创建注册表
+
+        feishu 配置节注册为 default 目标，notifiers.targets 中的每一项按名称注册。
+
+        Args:
+            config: 完整配置
+
+        Returns:
+            NotifierRegistry: 注册表
+        """
+        notifiers_config = config.get('notifiers', {})
+        registry = cls(max_workers=notifiers_config.get('max_workers', 4))
+        registry.register(cls.DEFAULT_TARGET, dict(config['feishu'], type='feishu'))
+        for name, target_config in notifiers_config.get('targets', {}).items():
+            registry.register(name, target_config)
+        return registry
+
+    @staticmethod
+    def notifier_options(target_config: Dict, notifier_class=FeishuNotifier) -> Dict:
+        """目标的超时、连接池和限流配置，限流默认值取决于通知器类型"""
+        return {
+            'connect_timeout': target_config.get('connect_timeout', 3.05),
+            'read_timeout': target_config.get('read_timeout', 10),
+            'pool_maxsize': target_config.get('pool_maxsize', 10),
+            'rate_per_second': target_config.get('rate_per_second', notifier_class.DEFAULT_RATE_PER_SECOND),
+            'rate_per_minute': target_config.get('rate_per_minute', notifier_class.DEFAULT_RATE_PER_MINUTE),
+            'rate_limit_retries': target_config.get('rate_limit_retries', 3)
+        }
+
+    def register(self, name: str, target_config: Dict):
+        """
+        注册通知目标（通知器在首次使用时创建）
+
+        Args:
+            name: 目标名称
+            target_config: 目标配置，包含 type（feishu/feishu_app/webhook，默认feishu）及该类型的必填项
+        """
+        notifier_type = target_config.get('type', 'feishu')
+        if notifier_type not in NOTIFIER_TYPES:
+            raise ValueError(f"通知目标 {name} 的类型不支持: {notifier_type}，可选: {', '.join(NOTIFIER_TYPES)}")
+        missing = [key for key in NOTIFIER_TYPES[notifier_type].REQUIRED_CONFIG if not target_config.get(key)]
+        if missing:
+            raise ValueError(f"通知目标 {name} 缺少配置: {', '.join(missing)}")
+
+        with self._lock:
+            self._configs[name] = target_config
+            if target_config.get('webhook_url'):
+                self._url_targets.setdefault(target_config['webhook_url'], name)
+
+    def resolve_url(self, webhook_url: str, secret: str = None, name: str = None) -> str:
+        """
+        按webhook地址查找目标，没有注册过时作为飞书机器人注册（兼容直接写 webhook_url 的路由规则）
+
+        Args:
+            webhook_url: 飞书机器人Webhook URL
+            secret: 飞书机器人密钥（可选）
+            name: 新注册时使用的目标名称，默认为 webhook 地址
+
+        Returns:
+            str: 目标名称
+        """
+        with self._lock:
+            existing = self._url_targets.get(webhook_url)
+        if existing:
+            return existing
+
+        name = name if name and name not in self._configs else webhook_url
+        self.register(name, {'type': 'feishu', 'webhook_url': webhook_url, 'secret': secret})
+        return name
+
+    def names(self) -> List[str]:
+        """已注册的目标名称"""
+        with self._lock:
+            return list(self._configs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._configs
+
+    def get(self, name: str) -> FeishuNotifier:
+        """
+        获取目标的通知器
+
+        所有目标共用默认目标的HTTP会话，复用到同一主机的连接。
+
+        Args:
+            name: 目标名称
+
+        Returns:
+            FeishuNotifier: 通知器
+
+        Raises:
+            KeyError: 目标未注册
+        """
+        notifier = self._notifiers.get(name)
+        if notifier is not None:
+            return notifier
+
+        target_config = self._configs[name]
+        session = None
+        if name != self.DEFAULT_TARGET and self.DEFAULT_TARGET in self._configs:
+            session = self.get(self.DEFAULT_TARGET).session
+
+        with self._lock:
+            if name not in self._notifiers:
+                notifier_class = NOTIFIER_TYPES[target_config.get('type', 'feishu')]
+                self._notifiers[name] = notifier_class.from_config(
+                    target_config, session=session, **self.notifier_options(target_config, notifier_class)
+                )
+            return self._notifiers[name]
+
+    def fan_out(self, names: List[str],
+                send: Callable[[str, FeishuNotifier], Any]) -> Dict[str, Tuple[Any, Optional[str], float]]:
+        """
+        并发地向多个目标发送
+
+        每个目标在线程池中独立发送，一个目标响应慢或失败不会拖慢其他目标；只有一个目标时直接在当前线程发送。
+
+        Args:
+            names: 目标名称列表
+            send: 发送函数，参数为目标名称和通知器
+
+        Returns:
+            Dict[str, Tuple]: 目标名称到 (发送函数返回值, 异常信息, 耗时秒数) 的映射，发生异常时返回值为None
+        """
+        def run(name: str) -> Tuple[Any, Optional[str], float]:
+            start = time.perf_counter()
+            try:
+                return send(name, self.get(name)), None, time.perf_counter() - start
+            except Exception as e:
+                logging.error(f"向通知目标 {name} 发送异常: {e}")
+                return None, str(e), time.perf_counter() - start
+
+        if len(names) <= 1:
+            return {name: run(name) for name in names}
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='notify')
+            executor = self._executor
+        futures = {name: executor.submit(run, name) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        获取已创建目标的请求耗时和限流统计
+
+        Returns:
+            Dict[str, Dict]: 目标名称到 latency、rate_limit 统计的映射
+        """
+        with self._lock:
+            notifiers = dict(self._notifiers)
+        return {
+            name: {'latency': notifier.get_latency_stats(), 'rate_limit': notifier.rate_limiter.get_stats()}
+            for name, notifier in notifiers.items()
+        }
+
+    def close(self):
+        """停止发送线程池并关闭HTTP会话"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            notifiers = list(self._notifiers.values())
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for notifier in notifiers:
+            notifier.close()
@@ -0,0 +1,166 @@
+"""
+通知投递模块
+后台线程从通知发件箱领取待发送记录并投递，失败按指数退避重试，超过次数进入死信
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .database import ArticleDatabase
+
+# 投递函数：输入一批发件箱记录，返回每条记录的 (是否全部送达, 已送达的目标列表, 失败原因)
+DeliverFunction = Callable[[List[Dict]], List[Tuple[bool, List[str], Optional[str]]]]
+
+
+class OutboxDispatcher:
+    """通知发件箱投递器"""
+
+    def __init__(self, database: ArticleDatabase, deliver: DeliverFunction, workers: int = 2,
+                 batch_size: int = 1, poll_interval: float = 1.0, max_attempts: int = 8,
+                 base_delay: float = 30.0, max_delay: float = 3600.0,
+                 lease_timeout: float = ArticleDatabase.OUTBOX_LEASE_SECONDS):
+        """
+        初始化投递器
+
+        Args:
+            database: 文章数据库
+            deliver: 投递函数
+            workers: 投递线程数
+            batch_size: 每个线程一次领取的记录数（摘要模式下一批合并为一条消息）
+            poll_interval: 没有到期记录时的轮询间隔（秒）
+            max_attempts: 最多投递次数，超过后进入死信
+            base_delay: 第一次重试的等待时间（秒），之后每次翻倍
+            max_delay: 重试等待时间上限（秒）
+            lease_timeout: 领取后超过该秒数仍未完成的记录视为投递方已退出，重新投递
+        """
+        self.database = database
+        self.deliver = deliver
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_timeout = lease_timeout
+
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+
+    def retry_delay(self, attempts: int) -> float:
+        """
+        计算第 attempts 次失败后的重试等待时间
+
+        指数退避并加入随机抖动，避免大量失败的通知在同一时刻集中重试。
+
+        Args:
+            attempts: 已投递次数
+
+        Returns:
+            float: 等待秒数
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def process_batch(self) -> int:
+        """
+        领取并投递一批到期的通知
+
+        Returns:
+            int: 处理的记录数，0表示当前没有到期记录
+        """
+        entries = self.database.claim_outbox(self.batch_size, lease_timeout=self.lease_timeout)
+        if not entries:
+            return 0
+
+        # 文章已被删除（例如归档）的记录直接进入死信
+        deliverable = [entry for entry in entries if entry['article']]
+        for entry in entries:
+            if not entry['article']:
+                self.database.fail_outbox(entry['id'], entry['delivered_targets'], '文章已删除')
+
+        try:
+            results = self.deliver(deliverable) if deliverable else []
+        except Exception as e:
+            logging.error(f"投递通知异常: {e}")
+            results = [(False, entry['delivered_targets'], str(e)) for entry in deliverable]
+
+        for entry, (success, delivered_targets, error) in zip(deliverable, results):
+            if success:
+                self.database.complete_outbox(entry['id'], delivered_targets)
+            elif entry['attempts'] >= self.max_attempts:
+                self.database.fail_outbox(entry['id'], delivered_targets, error)
+                logging.error(f"通知投递 {entry['attempts']} 次仍失败，进入死信: "
+                              f"{entry['article']['title']}（{error}）")
+            else:
+                delay = self.retry_delay(entry['attempts'])
+                self.database.fail_outbox(entry['id'], delivered_targets, error, time.time() + delay)
+                logging.warning(f"通知投递失败，{delay:.0f} 秒后第 {entry['attempts'] + 1} 次重试: "
+                                f"{entry['article']['title']}（{error}）")
+        return len(entries)
+
+    def run_once(self) -> int:
+        """
+        在当前线程中投递全部到期的通知（供单次检查命令使用）
+
+        监控服务可能同时在运行，不恢复投递中的记录；租约过期的记录由 claim_outbox 重新领取。
+
+        Returns:
+            int: 处理的记录数
+        """
+        processed = 0
+        while True:
+            count = self.process_batch()
+            if not count:
+                return processed
+            processed += count
+
+    def start(self):
+        """恢复上次中断的投递并启动投递线程"""
+        if self._threads:
+            return
+
+        recovered = self.database.reset_stuck_outbox(self.lease_timeout)
+        if recovered:
+            logging.info(f"恢复 {recovered} 条上次退出时未完成的通知投递")
+
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'outbox-{index + 1}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"通知投递线程已启动，线程数: {self.workers}")
+
+    def wake(self):
+        """有新通知入队时唤醒投递线程，不必等到下一次轮询"""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 30.0):
+        """
+        停止投递线程，正在进行的投递会完成
+
+        Args:
+            timeout: 每个线程最长等待时间（秒）
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logging.info("通知投递线程已停止")
+
+    def _run(self):
+        """投递线程主循环"""
+        while not self._stopping.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception as e:
+                logging.error(f"通知投递线程异常: {e}")
+                processed = 0
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
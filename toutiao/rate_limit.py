@@ -0,0 +1,145 @@
+"""
+限流模块
+按webhook限制请求速率：令牌桶控制每秒和每分钟的请求数，被飞书限流时自适应降速
+"""
+
+import time
+import threading
+from typing import Dict
+
+
+class TokenBucket:
+    """令牌桶（线程安全）"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量，即允许的最大突发请求数
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float, rate: float):
+        """按流逝时间补充令牌"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self, factor: float = 1.0) -> float:
+        """
+        预定一个令牌
+
+        令牌不足时也会预定（令牌数变为负数），返回需要等待的时间，调用方等待后即可发送，
+        多个线程按预定顺序排队，不会互相抢占。
+
+        Args:
+            factor: 速率系数，自适应降速时小于1
+
+        Returns:
+            float: 需要等待的秒数
+        """
+        with self._lock:
+            rate = self.rate * factor
+            self._refill(time.monotonic(), rate)
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+
+class WebhookRateLimiter:
+    """单个飞书机器人的限流器"""
+
+    def __init__(self, per_second: float = 5, per_minute: float = 100,
+                 min_factor: float = 0.1, increase_step: float = 0.05, cooldown: float = 5.0):
+        """
+        初始化限流器
+
+        Args:
+            per_second: 每秒最多请求数
+            per_minute: 每分钟最多请求数
+            min_factor: 自适应降速的最低速率系数
+            increase_step: 每次成功后速率系数的增量（加性增）
+            cooldown: 被限流后暂停发送的秒数（响应中没有 Retry-After 时使用）
+        """
+        self.second_bucket = TokenBucket(per_second, per_second)
+        self.minute_bucket = TokenBucket(per_minute / 60.0, per_minute)
+        self.min_factor = min_factor
+        self.increase_step = increase_step
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._factor = 1.0
+        self._paused_until = 0.0
+        self._waiting = 0
+        self._acquired = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._rate_limited = 0
+
+    def acquire(self) -> float:
+        """
+        等待到可以发送下一个请求
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        with self._lock:
+            factor = self._factor
+            pause = max(0.0, self._paused_until - time.monotonic())
+            self._waiting += 1
+
+        wait = max(pause, self.second_bucket.reserve(factor), self.minute_bucket.reserve(factor))
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                self._acquired += 1
+                if wait > 0:
+                    self._waited += 1
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
+        return wait
+
+    def on_success(self):
+        """请求成功，逐步恢复速率（加性增）"""
+        with self._lock:
+            self._factor = min(1.0, self._factor + self.increase_step)
+
+    def on_rate_limited(self, retry_after: float = None):
+        """
+        请求被限流，速率减半并暂停发送（乘性减）
+
+        Args:
+            retry_after: 服务端建议的等待秒数
+        """
+        with self._lock:
+            self._rate_limited += 1
+            self._factor = max(self.min_factor, self._factor / 2)
+            pause = retry_after if retry_after else self.cooldown
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def get_stats(self) -> Dict:
+        """
+        获取限流统计
+
+        Returns:
+            Dict: waiting（正在排队的请求数）、acquired、waited、avg_wait_ms、max_wait_ms、
+                  rate_limited（被限流次数）、rate_factor（当前速率系数）
+        """
+        with self._lock:
+            return {
+                'waiting': self._waiting,
+                'acquired': self._acquired,
+                'waited': self._waited,
+                'avg_wait_ms': self._total_wait / self._waited * 1000 if self._waited else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+                'rate_limited': self._rate_limited,
+                'rate_factor': self._factor
+            }
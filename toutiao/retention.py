@@ -0,0 +1,176 @@
+"""
+数据保留模块
+清理测试文章、把过期文章归档到压缩文件，并在空闲时分片回收数据库空闲页
+"""
+
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from .database import ArticleDatabase
+
+
+class RetentionManager:
+    """数据保留策略执行器"""
+
+    def __init__(self, database: ArticleDatabase, archive_dir: str = 'archive',
+                 max_age_days: int = 180, batch_size: int = 500,
+                 vacuum_pages_per_step: int = 256, vacuum_time_budget: float = 5.0):
+        """
+        初始化保留策略
+
+        Args:
+            database: 文章数据库
+            archive_dir: 归档文件目录
+            max_age_days: 文章入库超过多少天后归档，0表示不归档
+            batch_size: 每批归档/删除的文章数
+            vacuum_pages_per_step: 每一步回收的页数，一步就是一个短事务
+            vacuum_time_budget: 单次回收最长耗时（秒）
+        """
+        self.database = database
+        self.archive_dir = archive_dir
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+        self.vacuum_time_budget = vacuum_time_budget
+
+    @classmethod
+    def from_config(cls, database: ArticleDatabase, config: Dict) -> 'RetentionManager':
+        """
+        根据配置创建保留策略
+
+        Args:
+            database: 文章数据库
+            config: retention 配置节
+
+        Returns:
+            RetentionManager: 保留策略
+        """
+        return cls(
+            database,
+            archive_dir=config.get('archive_dir', 'archive'),
+            max_age_days=config.get('max_age_days', 180),
+            batch_size=config.get('batch_size', 500),
+            vacuum_pages_per_step=config.get('vacuum_pages_per_step', 256),
+            vacuum_time_budget=config.get('vacuum_time_budget_seconds', 5.0)
+        )
+
+    def purge_test_articles(self) -> int:
+        """
+        删除系统自检写入的测试文章
+
+        Returns:
+            int: 删除的文章数量
+        """
+        deleted = self.database.purge_test_articles()
+        if deleted:
+            logging.info(f"已清理 {deleted} 篇测试文章")
+        return deleted
+
+    def _write_archive(self, articles: List[Dict]):
+        """按入库月份追加写入 gzip 压缩的 JSON Lines 归档文件"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        by_month: Dict[str, List[Dict]] = {}
+        for article in articles:
+            by_month.setdefault(article['created_at'][:7], []).append(article)
+
+        for month, month_articles in by_month.items():
+            path = os.path.join(self.archive_dir, f'articles-{month}.jsonl.gz')
+            # 追加模式写入新的gzip成员，解压时各成员会顺序拼接
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for article in month_articles:
+                    f.write(json.dumps(article, ensure_ascii=False) + '\n')
+
+    def archive_old_articles(self, should_stop: Callable[[], bool] = None) -> int:
+        """
+        归档并删除过期文章
+
+        先写归档文件再删除数据库记录；中途中断时最多有一批文章在下次重复归档，不会丢失。
+
+        Args:
+            should_stop: 返回True时在当前批次结束后停止
+
+        Returns:
+            int: 归档的文章数量
+        """
+        if not self.max_age_days:
+            return 0
+
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        archived = 0
+        while not (should_stop and should_stop()):
+            articles = self.database.get_articles_created_before(cutoff, self.batch_size)
+            if not articles:
+                break
+
+            self._write_archive(articles)
+            deleted = self.database.delete_articles([article['article_id'] for article in articles], archived=True)
+            if not deleted:
+                logging.error("删除已归档文章失败，停止归档")
+                break
+            archived += deleted
+
+        if archived:
+            logging.info(f"已归档 {archived} 篇 {self.max_age_days} 天前的文章到 {self.archive_dir}")
+        return archived
+
+    def incremental_vacuum(self, should_stop: Callable[[], bool] = None) -> int:
+        """
+        分片回收空闲页
+
+        每一步只回收少量页面并立即提交，写锁持有时间很短，不会阻塞抓取写入。
+
+        Args:
+            should_stop: 返回True时在当前步骤结束后停止
+
+        Returns:
+            int: 回收的字节数
+        """
+        info = self.database.get_storage_info()
+        if info['auto_vacuum'] != 2:
+            if info['freelist_count']:
+                logging.info("数据库未启用增量回收，执行 main.py db vacuum 后才能回收空闲页")
+            return 0
+
+        reclaimed_pages = 0
+        deadline = time.monotonic() + self.vacuum_time_budget
+        while time.monotonic() < deadline and not (should_stop and should_stop()):
+            pages = self.database.incremental_vacuum(self.vacuum_pages_per_step)
+            if not pages:
+                break
+            reclaimed_pages += pages
+
+        return reclaimed_pages * info['page_size']
+
+    def run(self, should_stop: Callable[[], bool] = None, purge_test_articles: bool = True) -> Dict:
+        """
+        执行一次完整的保留策略
+
+        Args:
+            should_stop: 返回True时尽快停止（例如抓取周期开始了）
+            purge_test_articles: 是否清理测试文章
+
+        Returns:
+            Dict: purged、archived、reclaimed_bytes 以及回收后的 freelist_count
+        """
+        report = {'purged': 0, 'archived': 0, 'reclaimed_bytes': 0}
+        try:
+            if purge_test_articles:
+                report['purged'] = self.purge_test_articles()
+            report['archived'] = self.archive_old_articles(should_stop)
+
+            # 异步写入时等删除落盘后再回收
+            self.database.flush()
+            report['reclaimed_bytes'] = self.incremental_vacuum(should_stop)
+            report['freelist_count'] = self.database.get_storage_info()['freelist_count']
+
+            if report['reclaimed_bytes']:
+                logging.info(f"增量回收释放 {report['reclaimed_bytes'] / 1024:.1f} KB")
+        except Exception as e:
+            logging.error(f"执行数据保留策略失败: {e}")
+        return report
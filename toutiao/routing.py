@@ -0,0 +1,282 @@
+"""
+通知路由模块
+根据关键词、正则、作者和阅读数规则把文章路由到不同的通知目标
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Iterator, Iterable, Tuple
+
+
+class AhoCorasick:
+    """Aho-Corasick多模式匹配自动机，一次扫描文本即可找出所有关键词"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]] = ()):
+        """
+        构建自动机
+
+        Args:
+            patterns: (关键词, 负载) 序列，同一关键词可以对应多个负载
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword, value in patterns:
+            self._add(keyword, value)
+        self._build()
+
+    def _add(self, keyword: str, value: int):
+        """向字典树添加关键词"""
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(value)
+
+    def _build(self):
+        """按广度优先计算失败指针，并把后缀状态的输出合并进来"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """
+        扫描文本
+
+        Args:
+            text: 待匹配的文本
+
+        Yields:
+            int: 命中关键词的负载（同一负载可能出现多次）
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+
+
+class CompiledRules:
+    """编译后的路由规则，加载后只读，重载时整体替换"""
+
+    def __init__(self, rules: List[Dict]):
+        """
+        编译规则
+
+        Args:
+            rules: 规则列表
+        """
+        self.rules = rules
+        self.unconditional = []
+        self.regex_rules = []
+        self.authors: Dict[str, List[int]] = {}
+
+        keywords = []
+        for index, rule in enumerate(rules):
+            rule_keywords = [k.lower() for k in rule.get('keywords', []) if k]
+            rule_regexes = [re.compile(pattern, re.IGNORECASE) for pattern in rule.get('regex', [])]
+            rule_authors = [a for a in rule.get('authors', []) if a]
+
+            keywords.extend((keyword, index) for keyword in rule_keywords)
+            if rule_regexes:
+                self.regex_rules.append((index, rule_regexes))
+            for author in rule_authors:
+                self.authors.setdefault(author, []).append(index)
+            if not (rule_keywords or rule_regexes or rule_authors):
+                self.unconditional.append(index)
+
+        self.automaton = AhoCorasick(keywords)
+
+    def match(self, article: Dict) -> List[int]:
+        """
+        找出文章命中的规则
+
+        规则中的关键词、正则、作者条件满足任意一个即视为内容命中（都没配置时视为命中），
+        并且文章阅读数不低于 min_reads。
+
+        Args:
+            article: 文章信息字典
+
+        Returns:
+            List[int]: 命中规则的下标，按规则顺序
+        """
+        text = f"{article.get('title') or ''}\n{article.get('summary') or ''}".lower()
+
+        candidates = set(self.unconditional)
+        candidates.update(self.automaton.iter_matches(text))
+        candidates.update(self.authors.get(article.get('author', ''), ()))
+        for index, patterns in self.regex_rules:
+            if index not in candidates and any(pattern.search(text) for pattern in patterns):
+                candidates.add(index)
+
+        read_count = article.get('read_count', 0) or 0
+        return sorted(index for index in candidates
+                      if read_count >= self.rules[index].get('min_reads', 0))
+
+
+class NotificationRouter:
+    """通知路由器"""
+
+    def __init__(self, rules: List[Dict] = None, rules_file: str = None, reload_interval: float = 5.0,
+                 on_match: Callable[[List[str]], None] = None):
+        """
+        初始化路由器
+
+        Args:
+            rules: 内联规则列表
+            rules_file: 规则文件路径（JSON数组，或包含rules字段的对象），修改后自动重载
+            reload_interval: 检查规则文件是否修改的最小间隔（秒）
+            on_match: 计数时用命中的规则名称列表调用（可选），用于持久化命中次数
+        """
+        self.rules_file = rules_file
+        self.reload_interval = reload_interval
+        self.on_match = on_match
+
+        self._lock = threading.Lock()
+        self._match_counts: Dict[str, int] = {}
+        self._rules_mtime = None
+        self._last_reload_check = 0.0
+        self._compiled = CompiledRules([])
+
+        if rules_file:
+            self.reload_if_changed(force=True)
+        else:
+            self.load_rules(rules or [])
+
+    @classmethod
+    def from_config(cls, config: Dict, on_match: Callable[[List[str]], None] = None) -> 'NotificationRouter':
+        """
+        根据配置创建路由器
+
+        Args:
+            config: routing 配置节
+            on_match: 计数时用命中的规则名称列表调用（可选）
+
+        Returns:
+            NotificationRouter: 路由器
+        """
+        return cls(
+            rules=config.get('rules', []),
+            rules_file=config.get('rules_file'),
+            reload_interval=config.get('reload_interval_seconds', 5.0),
+            on_match=on_match
+        )
+
+    def load_rules(self, rules: List[Dict]):
+        """
+        编译并替换当前规则
+
+        Args:
+            rules: 规则列表
+        """
+        for index, rule in enumerate(rules):
+            rule.setdefault('name', f'rule_{index + 1}')
+
+        compiled = CompiledRules(rules)
+        self._compiled = compiled
+        logging.info(f"已加载 {len(rules)} 条通知路由规则")
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        规则文件修改后重新加载
+
+        Args:
+            force: 忽略检查间隔和修改时间，强制加载
+
+        Returns:
+            bool: 重新加载了规则返回True
+        """
+        if not self.rules_file:
+            return False
+
+        now = time.monotonic()
+        if not force and now - self._last_reload_check < self.reload_interval:
+            return False
+        self._last_reload_check = now
+
+        try:
+            mtime = os.stat(self.rules_file).st_mtime
+            if not force and mtime == self._rules_mtime:
+                return False
+
+            with open(self.rules_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rules = data.get('rules', []) if isinstance(data, dict) else data
+
+            self.load_rules(rules)
+            self._rules_mtime = mtime
+            return True
+        except Exception as e:
+            # 规则文件有误时保留当前规则继续工作
+            logging.error(f"加载通知路由规则失败: {e}")
+            return False
+
+    def route(self, article: Dict, count: bool = True) -> List[Dict]:
+        """
+        计算文章的通知目标
+
+        Args:
+            article: 文章信息字典
+            count: 是否计入规则命中次数；重试、补发等再次路由同一篇文章时传False，避免重复计数
+
+        Returns:
+            List[Dict]: 命中的规则列表（同一通知目标或webhook只保留第一条）
+        """
+        self.reload_if_changed()
+        compiled = self._compiled
+
+        targets = []
+        seen_destinations = set()
+        matched = compiled.match(article)
+        with self._lock:
+            for index in matched:
+                rule = compiled.rules[index]
+                if count:
+                    self._match_counts[rule['name']] = self._match_counts.get(rule['name'], 0) + 1
+                # 规则用 target 引用命名的通知目标，或直接写 webhook_url
+                destination = rule.get('target') or rule.get('webhook_url')
+                if destination and destination not in seen_destinations:
+                    seen_destinations.add(destination)
+                    targets.append(rule)
+
+        if count and matched and self.on_match is not None:
+            try:
+                self.on_match([compiled.rules[index]['name'] for index in matched])
+            except Exception as e:
+                logging.error(f"记录路由规则命中次数失败: {e}")
+        return targets
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取每条规则的命中次数
+
+        Returns:
+            Dict[str, int]: 规则名称到命中次数的映射
+        """
+        with self._lock:
+            counts = dict(self._match_counts)
+        return {rule['name']: counts.get(rule['name'], 0) for rule in self._compiled.rules}
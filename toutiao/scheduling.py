@@ -0,0 +1,179 @@
+"""
+调度模块
+记录每轮检查的耗时，发现耗时超过检查间隔（超时）的周期，按策略安排下一轮检查，并在平均耗时接近检查间隔时告警
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+# 超时后安排下一轮检查的策略：
+#   skip     跳过超时期间错过的检查，按原有节奏在下一个整点间隔执行
+#   coalesce 错过的检查合并为一次，超时结束后立即补做
+#   shorten  超时结束后间隔 min_gap 补做一轮，之后几轮的间隔各缩短一部分，逐步回到原有节奏，不丢检查
+OVERRUN_POLICIES = ('skip', 'coalesce', 'shorten')
+
+
+class CycleTracker:
+    """检查周期耗时统计（线程安全）"""
+
+    def __init__(self, interval: float, policy: str = 'skip', alert_ratio: float = 0.8,
+                 window: int = 10, min_gap: float = 60.0, alert_cooldown: float = 3600.0,
+                 payback_cycles: int = 3):
+        """
+        初始化统计
+
+        Args:
+            interval: 检查间隔（秒）
+            policy: 超时策略，见 OVERRUN_POLICIES
+            alert_ratio: 最近几轮的平均耗时达到检查间隔的这个比例时告警
+            window: 计算平均耗时的轮数
+            min_gap: shorten 策略下两轮检查之间至少间隔的秒数
+            alert_cooldown: 两次告警之间至少间隔的秒数
+            payback_cycles: shorten 策略下分几轮追回超时落后的时间
+        """
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"未知的超时策略: {policy}，可选 {', '.join(OVERRUN_POLICIES)}")
+        self.interval = interval
+        self.policy = policy
+        self.alert_ratio = alert_ratio
+        self.min_gap = min(min_gap, interval)
+        self.alert_cooldown = alert_cooldown
+        self.payback_cycles = max(1, payback_cycles)
+
+        self._durations = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+        self._count = 0
+        self._overruns = 0
+        self._missed = 0
+        self._max = 0.0
+        self._last_alert: Optional[float] = None
+        # shorten 策略：下一轮开始时间落后原有节奏的秒数，以及每轮追回的秒数
+        self._lag = 0.0
+        self._installment = 0.0
+
+    @classmethod
+    def from_config(cls, interval: float, config: Dict) -> 'CycleTracker':
+        """
+        根据配置创建统计
+
+        Args:
+            interval: 检查间隔（秒）
+            config: schedule 配置节
+
+        Returns:
+            CycleTracker: 周期耗时统计
+        """
+        return cls(
+            interval,
+            policy=config.get('overrun_policy', 'skip'),
+            alert_ratio=config.get('alert_ratio', 0.8),
+            window=config.get('alert_window', 10),
+            min_gap=config.get('min_interval_seconds', 60.0),
+            alert_cooldown=config.get('alert_cooldown_minutes', 60) * 60,
+            payback_cycles=config.get('shorten_cycles', 3)
+        )
+
+    def record(self, duration: float) -> bool:
+        """
+        记录一轮检查的耗时
+
+        Args:
+            duration: 耗时（秒）
+
+        Returns:
+            bool: 是否超时（耗时超过检查间隔）
+        """
+        overrun = duration > self.interval
+        with self._lock:
+            self._durations.append(duration)
+            self._count += 1
+            self._max = max(self._max, duration)
+            if overrun:
+                self._overruns += 1
+        return overrun
+
+    def record_missed(self):
+        """记录一次因上一轮未结束或调度延迟而错过的检查"""
+        with self._lock:
+            self._missed += 1
+
+    def next_delay(self, duration: float) -> Optional[float]:
+        """
+        按超时策略计算下一轮检查距现在的秒数
+
+        shorten 策略下，超时的一轮结束后间隔 min_gap 补做错过的检查，记下落后原有节奏的秒数，
+        之后 payback_cycles 轮每轮的间隔（两轮开始时间之差）缩短落后秒数的 1/payback_cycles，
+        间隔不少于 min_gap，追回后按原有节奏执行。
+
+        Args:
+            duration: 刚结束的一轮的耗时（秒）
+
+        Returns:
+            Optional[float]: 秒数；为 None 时表示按原有节奏执行
+        """
+        if self.policy == 'skip':
+            return None
+        if self.policy == 'coalesce':
+            return 0.0 if duration > self.interval else None
+
+        with self._lock:
+            if duration > self.interval:
+                # 本轮的下一个整点间隔已经错过，间隔 min_gap 后补做
+                self._lag += duration + self.min_gap - self.interval
+                self._installment = self._lag / self.payback_cycles
+                return self.min_gap
+            if self._lag <= 0:
+                return None
+
+            gap = max(self.min_gap, self.interval - min(self._installment, self._lag))
+            self._lag = max(0.0, self._lag - (self.interval - gap))
+            return max(0.0, gap - duration)
+
+    def average(self) -> float:
+        """最近几轮的平均耗时（秒），没有记录时为0"""
+        with self._lock:
+            return sum(self._durations) / len(self._durations) if self._durations else 0.0
+
+    def should_alert(self, now: float = None) -> bool:
+        """
+        判断是否需要发出负载告警：最近几轮（至少3轮）的平均耗时达到检查间隔的 alert_ratio，且距上次告警超过冷却时间
+
+        返回 True 时即视为已告警，冷却时间从此刻开始计算。
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if len(self._durations) < min(3, self._durations.maxlen):
+                return False
+            average = sum(self._durations) / len(self._durations)
+            if average < self.alert_ratio * self.interval:
+                return False
+            if self._last_alert is not None and now - self._last_alert < self.alert_cooldown:
+                return False
+            self._last_alert = now
+            return True
+
+    def get_stats(self) -> Dict:
+        """
+        获取耗时统计
+
+        Returns:
+            Dict: interval、policy、cycles（已记录轮数）、avg_seconds（最近几轮平均）、max_seconds、last_seconds、
+                  overruns（超时轮数）、missed（错过的检查次数）、load（平均耗时与检查间隔之比）、
+                  lag_seconds（shorten 策略下尚未追回的落后秒数）
+        """
+        with self._lock:
+            average = sum(self._durations) / len(self._durations) if self._durations else 0.0
+            return {
+                'interval': self.interval,
+                'policy': self.policy,
+                'cycles': self._count,
+                'avg_seconds': average,
+                'max_seconds': self._max,
+                'last_seconds': self._durations[-1] if self._durations else 0.0,
+                'overruns': self._overruns,
+                'missed': self._missed,
+                'load': average / self.interval if self.interval else 0.0,
+                'lag_seconds': self._lag
+            }
@@ -0,0 +1,98 @@
+"""
+SimHash指纹模块
+用于发现不同博主转载的近似重复文章
+"""
+
+import re
+import hashlib
+from typing import List
+
+# 指纹位数与分段数：汉明距离不超过 BANDS-1 的两个指纹至少有一段完全相同（抽屉原理）
+FINGERPRINT_BITS = 64
+BANDS = 6
+# 各段位宽：64位尽量均分为 11/11/11/11/10/10
+BAND_WIDTHS = [FINGERPRINT_BITS // BANDS + (1 if i < FINGERPRINT_BITS % BANDS else 0) for i in range(BANDS)]
+
+_MASK64 = (1 << FINGERPRINT_BITS) - 1
+_NOISE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+def _features(text: str) -> List[str]:
+    """
+    提取文本特征
+
+    中文没有空格分词，使用去掉标点和空白后的字符二元组作为特征。
+    """
+    normalized = _NOISE.sub('', text.lower())
+    if len(normalized) < 2:
+        return [normalized] if normalized else []
+    return [normalized[i:i + 2] for i in range(len(normalized) - 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    计算文本的64位SimHash指纹
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        int: 无符号64位指纹，文本没有有效内容时返回0
+    """
+    weights = [0] * FINGERPRINT_BITS
+    features = _features(text)
+    if not features:
+        return 0
+
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    计算两个指纹的汉明距离
+
+    Args:
+        a: 指纹a
+        b: 指纹b
+
+    Returns:
+        int: 不同的位数
+    """
+    return bin((a ^ b) & _MASK64).count('1')
+
+
+def split_bands(fingerprint: int) -> List[int]:
+    """
+    把指纹切分成若干段，用于LSH分桶
+
+    Args:
+        fingerprint: 无符号64位指纹
+
+    Returns:
+        List[int]: 每段的值
+    """
+    values = []
+    shift = 0
+    for width in BAND_WIDTHS:
+        values.append((fingerprint >> shift) & ((1 << width) - 1))
+        shift += width
+    return values
+
+
+def to_signed(fingerprint: int) -> int:
+    """无符号64位指纹转为SQLite可存储的有符号整数"""
+    return fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >= 1 << (FINGERPRINT_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    """SQLite中的有符号整数还原为无符号64位指纹"""
+    return value & _MASK64
@@ -0,0 +1,142 @@
+"""
+热门文章检测模块
+基于阅读数时间序列计算阅读速度和加速度，发现正在快速增长的文章
+"""
+
+import time
+import logging
+from itertools import chain
+from typing import Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .database import ArticleDatabase
+
+
+class TrendingDetector:
+    """热门文章检测器"""
+
+    def __init__(self, database: ArticleDatabase, velocity_threshold: float = 5000.0,
+                 window_hours: int = 24, min_interval_seconds: int = 60):
+        """
+        初始化热门文章检测器
+
+        Args:
+            database: 文章数据库
+            velocity_threshold: 阅读速度阈值（阅读数/小时），超过即视为热门
+            window_hours: 只分析最近多少小时内的快照
+            min_interval_seconds: 两个快照之间的最小间隔，过近的快照不参与速度计算
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy未安装，请安装numpy")
+
+        self.database = database
+        self.velocity_threshold = velocity_threshold
+        self.window_hours = window_hours
+        self.min_interval_seconds = min_interval_seconds
+
+    def compute(self, now: int = None) -> Dict[str, "np.ndarray"]:
+        """
+        计算每篇文章的最新阅读速度和加速度
+
+        所有文章最近3个快照通过一次查询读入数组，按文章分组后整体向量化计算，
+        不对单篇文章做Python循环。
+
+        Args:
+            now: 当前时间（Unix秒），默认为系统时间
+
+        Returns:
+            Dict[str, np.ndarray]: 包含 row_id、reads、last_ts、velocity（阅读/小时）、
+            acceleration（阅读/小时²）的等长数组；快照不足时速度或加速度为NaN
+        """
+        now = int(now if now is not None else time.time())
+        since_ts = now - self.window_hours * 3600
+
+        rows = self.database.iter_recent_stats(since_ts, samples_per_article=3)
+        data = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 3)
+
+        if len(data) == 0:
+            empty = np.array([], dtype=np.float64)
+            return {
+                'row_id': np.array([], dtype=np.int64),
+                'reads': np.array([], dtype=np.int64),
+                'last_ts': np.array([], dtype=np.int64),
+                'velocity': empty,
+                'acceleration': empty
+            }
+
+        ids, ts, reads = data[:, 0], data[:, 1], data[:, 2].astype(np.float64)
+
+        # 每篇文章最后一个快照的位置（数据已按文章ID和时间排序）
+        last = np.flatnonzero(np.append(ids[1:] != ids[:-1], True))
+        prev = last - 1
+        prev2 = last - 2
+        has_prev = (prev >= 0) & (ids[np.maximum(prev, 0)] == ids[last])
+        has_prev2 = has_prev & (prev2 >= 0) & (ids[np.maximum(prev2, 0)] == ids[last])
+
+        prev = np.maximum(prev, 0)
+        prev2 = np.maximum(prev2, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dt_last = (ts[last] - ts[prev]).astype(np.float64)
+            dt_prev = (ts[prev] - ts[prev2]).astype(np.float64)
+            valid_last = has_prev & (dt_last >= self.min_interval_seconds)
+            valid_prev = has_prev2 & (dt_prev >= self.min_interval_seconds)
+
+            velocity = np.where(valid_last, (reads[last] - reads[prev]) / dt_last * 3600, np.nan)
+            velocity_prev = np.where(valid_prev, (reads[prev] - reads[prev2]) / dt_prev * 3600, np.nan)
+            # 两段速度中点之间的时间差（小时）
+            dt_mid = (dt_last + dt_prev) / 2 / 3600
+            acceleration = np.where(valid_last & valid_prev, (velocity - velocity_prev) / dt_mid, np.nan)
+
+        return {
+            'row_id': ids[last],
+            'reads': data[last, 2],
+            'last_ts': ts[last],
+            'velocity': velocity,
+            'acceleration': acceleration
+        }
+
+    def detect(self, limit: int = None, only_new: bool = False, now: int = None) -> List[Dict]:
+        """
+        找出阅读速度超过阈值的文章
+
+        Args:
+            limit: 最多返回的文章数量
+            only_new: 只返回尚未发送过热门提醒的文章
+            now: 当前时间（Unix秒），默认为系统时间
+
+        Returns:
+            List[Dict]: 热门文章列表，按阅读速度降序，附带 velocity 和 acceleration 字段
+        """
+        metrics = self.compute(now)
+        velocity = metrics['velocity']
+
+        with np.errstate(invalid='ignore'):
+            hot = np.flatnonzero(velocity >= self.velocity_threshold)
+        hot = hot[np.argsort(-velocity[hot], kind='stable')]
+
+        articles = self.database.get_articles_by_row_ids(
+            metrics['row_id'][hot].tolist(),
+            only_not_trending_alerted=only_new
+        )
+
+        trending = []
+        for index in hot:
+            article = articles.get(int(metrics['row_id'][index]))
+            if article is None:
+                continue
+            acceleration = metrics['acceleration'][index]
+            article['read_count'] = int(metrics['reads'][index])
+            article['velocity'] = float(velocity[index])
+            article['acceleration'] = None if np.isnan(acceleration) else float(acceleration)
+            trending.append(article)
+            if limit and len(trending) >= limit:
+                break
+
+        logging.info(f"热门文章检测完成：分析 {len(velocity)} 篇文章，{len(trending)} 篇超过阈值")
+        return trending
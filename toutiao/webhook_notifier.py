@@ -0,0 +1,212 @@
+"""
+通用Webhook通知模块
+以JSON事件的形式把新文章推送到任意HTTP接口，复用飞书通知器的连接池、限流和耗时统计
+"""
+
+import json
+import time
+import hmac
+import hashlib
+import logging
+from typing import Dict, List, Tuple
+
+from .feishu_notifier import FeishuNotifier
+
+
+class WebhookNotifier(FeishuNotifier):
+    """通用Webhook通知器类"""
+
+    # 推送给接收方的文章字段
+    ARTICLE_FIELDS = ['article_id', 'title', 'url', 'author', 'publish_time', 'read_count', 'comment_count', 'summary']
+
+    def __init__(self, webhook_url: str, secret: str = None, headers: Dict[str, str] = None, **kwargs):
+        """
+        初始化Webhook通知器
+
+        Args:
+            webhook_url: 接收通知的URL
+            secret: 签名密钥（可选），配置后请求头带 X-Signature-Timestamp 和 X-Signature
+            headers: 附加的请求头（可选），例如认证令牌
+            **kwargs: 超时、连接池和限流参数，同 FeishuNotifier
+        """
+        super().__init__(webhook_url, secret, **kwargs)
+        self.headers = headers or {}
+
+    @classmethod
+    def from_config(cls, target_config: Dict, **kwargs) -> 'WebhookNotifier':
+        """根据通知目标配置创建通知器，支持附加请求头 headers"""
+        return cls(target_config['webhook_url'], target_config.get('secret'),
+                   headers=target_config.get('headers'), **kwargs)
+
+    @classmethod
+    def _article_payload(cls, article: Dict) -> Dict:
+        """提取推送给接收方的文章字段"""
+        return {field: article.get(field) for field in cls.ARTICLE_FIELDS}
+
+    def send_text_message(self, content: str) -> bool:
+        """
+        发送文本消息
+
+        Args:
+            content: 消息内容
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        return self._send_message({'event': 'text', 'text': content})
+
+    def send_rich_text_message(self, title: str, content: List[List[Dict]]) -> bool:
+        """
+        发送富文本消息（内容为飞书富文本段落，原样转发）
+
+        Args:
+            title: 消息标题
+            content: 富文本内容
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        return self._send_message({'event': 'rich_text', 'title': title, 'content': content})
+
+    def send_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        发送文章通知
+
+        Args:
+            article: 文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        try:
+            return self._send_message({
+                'event': 'new_article',
+                'article': self._article_payload(article),
+                'duplicates': [self._article_payload(duplicate) for duplicate in duplicates or []]
+            })
+        except Exception as e:
+            logging.error(f"发送Webhook文章通知失败: {e}")
+            return False
+
+    def update_article_notification(self, article: Dict, duplicates: List[Dict] = None) -> bool:
+        """
+        推送补全详情后的文章
+
+        Args:
+            article: 补全详情后的文章信息字典
+            duplicates: 内容近似重复的其他来源（可选）
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        try:
+            return self._send_message({
+                'event': 'article_updated',
+                'article': self._article_payload(article),
+                'duplicates': [self._article_payload(duplicate) for duplicate in duplicates or []]
+            })
+        except Exception as e:
+            logging.error(f"发送Webhook文章更新失败: {e}")
+            return False
+
+    def send_digest(self, groups: List[Tuple[Dict, List[Dict]]], max_articles: int = 10) -> List[bool]:
+        """
+        把多篇文章合并成一个事件发送，每个事件最多 max_articles 篇
+
+        Args:
+            groups: [(文章, 其他来源列表)] 列表
+            max_articles: 每个事件最多包含的文章数
+
+        Returns:
+            List[bool]: 每个分组是否发送成功
+        """
+        results = []
+        for start in range(0, len(groups), max_articles):
+            chunk = groups[start:start + max_articles]
+            try:
+                success = self._send_message({
+                    'event': 'digest',
+                    'articles': [
+                        dict(self._article_payload(article),
+                             duplicates=[self._article_payload(duplicate) for duplicate in duplicates])
+                        for article, duplicates in chunk
+                    ]
+                })
+            except Exception as e:
+                logging.error(f"发送Webhook文章摘要失败: {e}")
+                success = False
+            results.extend([success] * len(chunk))
+        return results
+
+    def send_trending_notification(self, article: Dict) -> bool:
+        """
+        发送热门文章提醒
+
+        Args:
+            article: 文章信息字典，包含 velocity 和 acceleration 字段
+
+        Returns:
+            bool: 发送成功返回True
+        """
+        try:
+            return self._send_message({
+                'event': 'trending',
+                'article': self._article_payload(article),
+                'velocity': article.get('velocity'),
+                'acceleration': article.get('acceleration')
+            })
+        except Exception as e:
+            logging.error(f"发送Webhook热门提醒失败: {e}")
+            return False
+
+    def _sign_headers(self, body: bytes) -> Dict[str, str]:
+        """
+        生成签名请求头
+
+        签名为 HMAC-SHA256(secret, "<时间戳>.<请求体>") 的十六进制串，接收方可据此校验来源和防重放。
+        """
+        if not self.secret:
+            return {}
+        timestamp = str(int(time.time()))
+        signature = hmac.new(self.secret.encode('utf-8'), timestamp.encode('utf-8') + b'.' + body,
+                             hashlib.sha256).hexdigest()
+        return {'X-Signature-Timestamp': timestamp, 'X-Signature': f'sha256={signature}'}
+
+    def _post(self, data: Dict) -> tuple:
+        """
+        发送一次请求，2xx 视为成功，429 视为限流
+
+        Returns:
+            tuple: (状态 ok/rate_limited/error, 限流时建议的等待秒数)
+        """
+        start = time.perf_counter()
+        success = False
+        try:
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            response = self.session.post(
+                self.webhook_url,
+                data=body,
+                headers={**self.headers, **self._sign_headers(body)},
+                timeout=self.timeout
+            )
+
+            if response.status_code == 429:
+                try:
+                    return 'rate_limited', float(response.headers.get('Retry-After', 0))
+                except ValueError:
+                    return 'rate_limited', 0.0
+
+            if 200 <= response.status_code < 300:
+                success = True
+                self.rate_limiter.on_success()
+                return 'ok', None
+
+            logging.error(f"Webhook请求失败: {response.status_code}, {response.text[:200]}")
+            return 'error', None
+
+        except Exception as e:
+            logging.error(f"发送Webhook请求异常: {e}")
+            return 'error', None
+        finally:
+            self._record_latency(time.perf_counter() - start, success)